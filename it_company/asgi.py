@@ -11,6 +11,7 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "it_company.settings.py")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "it_company.settings")
+os.environ.setdefault("DJANGO_SERVING_MODE", "asgi")
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -22,10 +23,21 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = "django-insecure-^@(xi@a(*6l5!h+5)m$=*0cip_0my$)uqum8xzntox%dyw(hsg"
 
+# "asgi" serves the async views of task_manager.async_views under an ASGI
+# server, with debugging and the debug toolbar off.  it_company/asgi.py
+# selects it by default.
+SERVING_MODE = os.environ.get("DJANGO_SERVING_MODE", "development")
+
+ASYNC_VIEWS = SERVING_MODE == "asgi"
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = not ASYNC_VIEWS
 
 ALLOWED_HOSTS = []
+if ASYNC_VIEWS:
+    ALLOWED_HOSTS = os.environ.get(
+        "DJANGO_ALLOWED_HOSTS", "localhost,127.0.0.1"
+    ).split(",")
 
 
 # Application definition
@@ -51,10 +63,24 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "task_manager.routers.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "task_manager.query_budget.QueryBudgetMiddleware",
 ]
 
+if ASYNC_VIEWS:
+    # Development tooling only; the query budget middleware is also
+    # sync-only and would force every async view onto a thread.
+    INSTALLED_APPS.remove("debug_toolbar")
+    MIDDLEWARE = [
+        middleware for middleware in MIDDLEWARE
+        if middleware not in (
+            "debug_toolbar.middleware.DebugToolbarMiddleware",
+            "task_manager.query_budget.QueryBudgetMiddleware",
+        )
+    ]
+
 ROOT_URLCONF = "it_company.urls"
 
 TEMPLATES = [
@@ -68,7 +94,8 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 # my processors
-                "task_manager.context_processors.pending_tasks"
+                "task_manager.context_processors.pending_tasks",
+                "task_manager.context_processors.fragment_cache",
             ],
         },
     },
@@ -87,6 +114,76 @@ DATABASES = {
     }
 }
 
+# Production tuning for SQLite, selected with DJANGO_DATABASE_PROFILE=tuned.
+# Connections are kept across requests and write transactions take the
+# write lock up front, so concurrent writers wait on the busy timeout
+# instead of failing with "database is locked".  PRAGMAS are run on every
+# new connection by task_manager.sqlite.apply_pragmas.
+SQLITE_TUNED_PROFILE = {
+    "CONN_MAX_AGE": 600,
+    "CONN_HEALTH_CHECKS": True,
+    "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+    "PRAGMAS": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 20000,
+        "mmap_size": 256 * 1024 * 1024,
+        # Negative sizes are in KiB: a 64 MiB page cache.
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+DATABASE_PROFILE = os.environ.get("DJANGO_DATABASE_PROFILE", "default")
+
+if DATABASE_PROFILE == "tuned":
+    DATABASES["default"].update(SQLITE_TUNED_PROFILE)
+
+
+# Read replicas: DJANGO_READ_REPLICA=/path/to/copy.sqlite3 adds one, which
+# read-only views then read task_manager data from; see
+# task_manager.routers.  Keeping the copy up to date is up to deployment.
+if os.environ.get("DJANGO_READ_REPLICA"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ["DJANGO_READ_REPLICA"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+
+DATABASE_ROUTERS = ["task_manager.routers.ReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "it-company",
+    }
+}
+
+
+# Sessions, selected with DJANGO_SESSION_PROFILE.  Unchanged sessions are
+# never saved, and visit counts live in task_manager.activity rather than
+# the session, so read-only pages do not write.  "cached_db" also serves
+# session reads from the cache; "signed_cookies" keeps sessions out of the
+# database altogether.
+SESSION_PROFILES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+SESSION_PROFILE = os.environ.get("DJANGO_SESSION_PROFILE", "db")
+
+SESSION_ENGINE = SESSION_PROFILES[SESSION_PROFILE]
+
+# Seconds between batched writes of in-memory visit counts.
+ACTIVITY_FLUSH_INTERVAL = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -132,6 +229,30 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# Production asset pipeline, on by default outside DEBUG: collectstatic
+# bundles, fingerprints and precompresses the files, and
+# task_manager.assets.StaticAssetMiddleware serves them with immutable
+# caching.  Run collectstatic before starting the server.
+STATIC_PIPELINE = os.environ.get(
+    "DJANGO_STATIC_PIPELINE", "0" if DEBUG else "1"
+) == "1"
+
+if STATIC_PIPELINE:
+    STORAGES = {
+        "default": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+        },
+        "staticfiles": {
+            "BACKEND": "task_manager.assets.PipelineStaticFilesStorage",
+        },
+    }
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "task_manager.assets.StaticAssetMiddleware",
+    )
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
@@ -140,4 +261,7 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
-LOGIN_REDIRECT_URL = "/"
\ No newline at end of file
+LOGIN_REDIRECT_URL = "/"
+
+# Uploads handed to a background job wait here until a worker runs it.
+JOB_FILES_ROOT = BASE_DIR / "job_files"
@@ -14,12 +14,20 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+task_manager_urls = (
+    "task_manager.async_urls" if settings.ASYNC_VIEWS
+    else "task_manager.urls"
+)
+
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("", include("task_manager.urls", namespace="task_manager")),
+    path("", include(task_manager_urls, namespace="task_manager")),
     path("accounts/", include("django.contrib.auth.urls")),
-    path("__debug__/", include("debug_toolbar.urls")),
 ]
+
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
@@ -0,0 +1,137 @@
+// Typeahead for selects rendered by task_manager.forms.TypeaheadMixin.
+//
+// The select only holds the chosen options; matches are fetched page by
+// page from its data-typeahead-url as the user types.
+(function () {
+  "use strict";
+
+  function debounce(fn, wait) {
+    let timer;
+    return function () {
+      const args = arguments;
+      clearTimeout(timer);
+      timer = setTimeout(function () { fn.apply(null, args); }, wait);
+    };
+  }
+
+  function setup(select) {
+    const url = select.dataset.typeaheadUrl;
+    const multiple = select.multiple;
+
+    const wrapper = document.createElement("div");
+    wrapper.className = "position-relative mb-2";
+    const chips = document.createElement("div");
+    chips.className = "d-flex flex-wrap gap-1 mb-1";
+    const input = document.createElement("input");
+    input.type = "search";
+    input.className = "form-control border px-2";
+    input.placeholder = "Type to search...";
+    input.autocomplete = "off";
+    const menu = document.createElement("div");
+    menu.className = "list-group position-absolute w-100 shadow z-index-3";
+    menu.style.maxHeight = "16rem";
+    menu.style.overflowY = "auto";
+
+    select.hidden = true;
+    select.parentNode.insertBefore(wrapper, select);
+    wrapper.append(chips, input, menu);
+
+    function renderChips() {
+      chips.replaceChildren();
+      Array.from(select.selectedOptions).forEach(function (option) {
+        if (!option.value) {
+          return;
+        }
+        const chip = document.createElement("span");
+        chip.className = "badge bg-gradient-dark d-inline-flex align-items-center";
+        chip.textContent = option.textContent;
+        const remove = document.createElement("button");
+        remove.type = "button";
+        remove.className = "btn-close btn-close-white ms-1";
+        remove.setAttribute("aria-label", "Remove");
+        remove.addEventListener("click", function () {
+          option.remove();
+          renderChips();
+        });
+        chip.append(remove);
+        chips.append(chip);
+      });
+    }
+
+    function choose(result) {
+      let option = select.querySelector(`option[value="${result.id}"]`);
+      if (!multiple) {
+        select.querySelectorAll("option").forEach(function (other) {
+          if (other.value) {
+            other.remove();
+          }
+        });
+        option = null;
+      }
+      if (!option) {
+        option = new Option(result.text, result.id);
+        select.append(option);
+      }
+      option.selected = true;
+      input.value = "";
+      menu.replaceChildren();
+      renderChips();
+    }
+
+    function load(cursor) {
+      const params = new URLSearchParams({q: input.value.trim()});
+      if (cursor) {
+        params.set("cursor", cursor);
+      }
+      return fetch(`${url}?${params}`, {
+        headers: {"X-Requested-With": "XMLHttpRequest"},
+      }).then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.statusText);
+        }
+        return response.json();
+      }).then(function (data) {
+        if (!cursor) {
+          menu.replaceChildren();
+        }
+        data.results.forEach(function (result) {
+          const item = document.createElement("button");
+          item.type = "button";
+          item.className = "list-group-item list-group-item-action text-sm";
+          item.textContent = result.text;
+          item.addEventListener("click", function () { choose(result); });
+          menu.append(item);
+        });
+        if (data.next) {
+          const more = document.createElement("button");
+          more.type = "button";
+          more.className = "list-group-item list-group-item-action text-xs text-secondary";
+          more.textContent = "More results...";
+          more.addEventListener("click", function () {
+            more.remove();
+            load(data.next);
+          });
+          menu.append(more);
+        }
+      }).catch(function () {
+        menu.replaceChildren();
+      });
+    }
+
+    input.addEventListener("input", debounce(function () { load(); }, 250));
+    input.addEventListener("focus", function () {
+      if (!menu.children.length) {
+        load();
+      }
+    });
+    document.addEventListener("click", function (event) {
+      if (!wrapper.contains(event.target)) {
+        menu.replaceChildren();
+      }
+    });
+
+    renderChips();
+  }
+
+  document.querySelectorAll("select[data-typeahead-url]").forEach(setup);
+})();
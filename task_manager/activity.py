@@ -0,0 +1,119 @@
+"""
+Visit and activity counters that stay off the request's write path.
+
+``record`` only bumps an in-memory tally of the current process.  The
+tallies are written to ``ActivityCounter`` in one batched upsert when
+``FLUSH_INTERVAL`` has passed, from a ``request_finished`` receiver, so
+the response is already on its way, and once more when the process
+exits.  ``get_count`` adds the stored value to what this process has not
+flushed yet; other processes' unflushed hits show up after their next
+flush.
+"""
+
+import atexit
+import threading
+import time
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from task_manager.models import ActivityCounter
+
+
+FLUSH_INTERVAL = 30
+# Keys per UPDATE statement.
+FLUSH_BATCH_SIZE = 200
+
+_lock = threading.Lock()
+_pending = Counter()
+_last_flush = time.monotonic()
+
+
+def get_flush_interval() -> float:
+    return getattr(settings, "ACTIVITY_FLUSH_INTERVAL", FLUSH_INTERVAL)
+
+
+def visits_key(user) -> str:
+    return f"dashboard-visits:{user.pk}"
+
+
+def record(key, amount=1) -> None:
+    with _lock:
+        _pending[key] += amount
+
+
+def _pending_count(key) -> int:
+    with _lock:
+        return _pending.get(key, 0)
+
+
+def get_count(key) -> int:
+    stored = ActivityCounter.objects.filter(key=key).values_list(
+        "value", flat=True
+    ).first()
+    return (stored or 0) + _pending_count(key)
+
+
+async def aget_count(key) -> int:
+    stored = await ActivityCounter.objects.filter(key=key).values_list(
+        "value", flat=True
+    ).afirst()
+    return (stored or 0) + _pending_count(key)
+
+
+def _write(counts) -> None:
+    ActivityCounter.objects.bulk_create(
+        [ActivityCounter(key=key) for key in counts], ignore_conflicts=True
+    )
+    ActivityCounter.objects.filter(key__in=counts).update(
+        value=F("value") + Case(
+            *(When(key=key, then=Value(n)) for key, n in counts.items()),
+            default=Value(0),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def flush() -> int:
+    """Write this process's pending counts; returns the keys written."""
+    global _last_flush
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+    try:
+        with transaction.atomic():
+            items = iter(pending.items())
+            while batch := dict(islice(items, FLUSH_BATCH_SIZE)):
+                _write(batch)
+    except DatabaseError:
+        # Keep the hits for the next flush rather than losing them.
+        with _lock:
+            _pending.update(pending)
+        raise
+    return len(pending)
+
+
+def discard() -> None:
+    """Forget this process's pending counts without writing them."""
+    with _lock:
+        _pending.clear()
+
+
+def flush_if_due() -> None:
+    if time.monotonic() - _last_flush >= get_flush_interval():
+        flush()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush()
+    except DatabaseError:
+        pass
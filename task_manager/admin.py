@@ -1,6 +1,10 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
+from task_manager import search
 from task_manager.models import (
+    ArchivedTask,
+    Job,
     Tag,
     TaskType,
     Position,
@@ -11,6 +15,40 @@ from task_manager.models import (
 )
 
 
+# Index matches a changelist search lists at most.
+ADMIN_SEARCH_LIMIT = 1000
+
+
+def get_admin_search_limit() -> int:
+    return getattr(settings, "ADMIN_SEARCH_LIMIT", ADMIN_SEARCH_LIMIT)
+
+
+class IndexedSearchMixin:
+    """
+    Answer the changelist search box from the full-text index.
+
+    The index yields the best ``ADMIN_SEARCH_LIMIT`` matches, and the
+    changelist says so when a search reaches that cap.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search.terms(search_term):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        kind = search.KINDS[self.model]
+        limit = get_admin_search_limit()
+        ids = search.search_ids(kind, search_term, limit=limit)
+        if len(ids) >= limit:
+            self.message_user(
+                request,
+                f"Only the best {limit} index matches are listed; "
+                f"refine the search to see others.",
+                messages.WARNING,
+            )
+        return queryset.filter(pk__in=ids), False
+
+
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
     list_display = ("name",)
@@ -33,7 +71,7 @@ class PositionAdmin(admin.ModelAdmin):
 
 
 @admin.register(Worker)
-class WorkerAdmin(UserAdmin):
+class WorkerAdmin(IndexedSearchMixin, UserAdmin):
      list_display = UserAdmin.list_display + ("position", )
      search_fields = UserAdmin.search_fields + ("position__name", ) # foreign key
 
@@ -51,7 +89,7 @@ class WorkerAdmin(UserAdmin):
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         "name", "description",
         "deadline", "is_completed",
@@ -108,10 +146,37 @@ class TeamAdmin(admin.ModelAdmin):
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ("name", "get_teams")
     search_fields = ("name", "tasks__name", "teams__name")
 
     @admin.display(description="Teams")
     def get_teams(self, obj):
         return ", ".join([team.name for team in obj.teams.all()])
+
+    def get_queryset(self, request):
+        # Archived projects stay reachable here.
+        queryset = Project.all_objects.all()
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "project", "deadline", "archived_at")
+    list_select_related = ("project",)
+    search_fields = ("name",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "name", "status", "progress", "total", "attempts", "created_at"
+    )
+    list_filter = ("status", "name")
+    readonly_fields = (
+        "progress", "total", "result", "error", "attempts",
+        "locked_by", "locked_at", "created_at", "finished_at",
+    )
@@ -0,0 +1,278 @@
+"""
+Read-only JSON API (v1) for tasks, projects, teams and workers.
+
+Every list and detail endpoint accepts:
+
+* ``?fields=a,b,c`` -- sparse fieldsets; only the requested columns are
+  selected and only the requested relations are looked up.
+* ``?ids=1,2,3`` -- batched lookup of up to ``MAX_PAGE_SIZE`` rows.
+* ``?cursor=...&limit=N`` -- keyset pagination (list endpoints).
+* ``If-None-Match`` -- answered with ``304`` when the ETag still matches.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    JsonResponse,
+)
+from django.utils.http import parse_etags, quote_etag
+from django.views import generic
+
+from task_manager.models import Project, Task, Team, Worker
+from task_manager.pagination import KeysetPaginator
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Resource:
+    """
+    Describes how one model is exposed.
+
+    ``columns`` maps API field names to model attnames, ``relations`` maps
+    API field names to ``(through model, own column, other column)`` and
+    is rendered as a list of related ids.
+    """
+
+    model = None
+    columns = {}
+    relations = {}
+    ordering = ("pk",)
+
+    @property
+    def field_names(self):
+        return list(self.columns) + list(self.relations)
+
+    def parse_fields(self, raw):
+        if not raw:
+            return self.field_names
+        fields = [name.strip() for name in raw.split(",") if name.strip()]
+        unknown = sorted(set(fields) - set(self.field_names))
+        if unknown:
+            raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+        return fields
+
+    def get_queryset(self, fields):
+        opts = self.model._meta
+        attnames = {opts.pk.attname}
+        attnames.update(
+            self.columns[name] for name in fields if name in self.columns
+        )
+        # Keyset ordering columns are needed to build cursors.
+        for name in self.ordering:
+            name = name.lstrip("-")
+            if name != "pk":
+                attnames.add(opts.get_field(name).attname)
+        return self.model.objects.values(*attnames)
+
+    def serialize(self, rows, fields):
+        pk_name = self.model._meta.pk.attname
+        ids = [row[pk_name] for row in rows]
+        related = {
+            name: self.load_relation(name, ids)
+            for name in fields if name in self.relations
+        }
+        results = []
+        for row in rows:
+            item = {}
+            for name in fields:
+                if name in self.columns:
+                    item[name] = row[self.columns[name]]
+                else:
+                    item[name] = related[name].get(row[pk_name], [])
+            results.append(item)
+        return results
+
+    def load_relation(self, name, ids):
+        through, own, other = self.relations[name]
+        grouped = defaultdict(list)
+        pairs = through.objects.filter(**{f"{own}__in": ids}).order_by(
+            own, other
+        ).values_list(own, other)
+        for own_id, other_id in pairs:
+            grouped[own_id].append(other_id)
+        return grouped
+
+
+class TaskResource(Resource):
+    model = Task
+    columns = {
+        "id": "id",
+        "name": "name",
+        "description": "description",
+        "deadline": "deadline",
+        "is_completed": "is_completed",
+        "priority": "priority",
+        "task_type": "task_type_id",
+        "project": "project_id",
+        "assignee_count": "assignee_count",
+        "tag_count": "tag_count",
+    }
+    relations = {
+        "assignees": (Task.assignees.through, "task_id", "worker_id"),
+        "tags": (Task.tags.through, "task_id", "tag_id"),
+    }
+    ordering = ("deadline", "pk")
+
+
+class ProjectResource(Resource):
+    model = Project
+    columns = {
+        "id": "id",
+        "name": "name",
+        "description": "description",
+        "budget": "budget",
+        "status": "status",
+        "task_count": "task_count",
+        "open_task_count": "open_task_count",
+        "team_count": "team_count",
+    }
+    relations = {
+        "teams": (Project.teams.through, "project_id", "team_id"),
+    }
+    ordering = ("name", "pk")
+
+
+class TeamResource(Resource):
+    model = Team
+    columns = {
+        "id": "id",
+        "name": "name",
+        "team_lead": "team_lead_id",
+        "worker_count": "worker_count",
+        "project_count": "project_count",
+    }
+    relations = {
+        "workers": (Team.workers.through, "team_id", "worker_id"),
+        "projects": (Project.teams.through, "team_id", "project_id"),
+    }
+    ordering = ("name", "pk")
+
+
+class WorkerResource(Resource):
+    model = Worker
+    columns = {
+        "id": "id",
+        "username": "username",
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "email": "email",
+        "position": "position_id",
+        "task_count": "task_count",
+        "open_task_count": "open_task_count",
+        "team_count": "team_count",
+        "led_team_count": "led_team_count",
+    }
+    relations = {
+        "teams": (Team.workers.through, "worker_id", "team_id"),
+        "tasks": (Task.assignees.through, "worker_id", "task_id"),
+    }
+    ordering = ("username", "pk")
+
+
+def parse_int_list(raw, name):
+    try:
+        values = [int(value) for value in raw.split(",") if value.strip()]
+    except ValueError:
+        raise ApiError(f"'{name}' must be comma separated integers")
+    if len(values) > MAX_PAGE_SIZE:
+        raise ApiError(f"At most {MAX_PAGE_SIZE} ids may be requested")
+    return values
+
+
+class ResourceView(generic.View):
+    """List (``/<resource>/``) and detail (``/<resource>/<pk>/``) endpoint."""
+
+    resource_class = Resource
+    http_method_names = ["get", "head", "options"]
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."},
+                status=401,
+            )
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({"detail": str(error)}, status=error.status)
+        except Http404 as error:
+            return JsonResponse({"detail": str(error)}, status=404)
+
+    def get(self, request, pk=None):
+        resource = self.resource_class()
+        fields = resource.parse_fields(request.GET.get("fields"))
+        queryset = resource.get_queryset(fields)
+
+        if pk is not None:
+            rows = list(queryset.filter(pk=pk)[:1])
+            if not rows:
+                raise Http404("No such object")
+            data = resource.serialize(rows, fields)[0]
+        elif request.GET.get("ids"):
+            ids = parse_int_list(request.GET["ids"], "ids")
+            rows = list(
+                queryset.filter(pk__in=ids).order_by(*resource.ordering)
+            )
+            data = {"results": resource.serialize(rows, fields)}
+        else:
+            page = KeysetPaginator(
+                queryset, resource.ordering, self.get_limit()
+            ).page(request.GET.get("cursor"))
+            data = {
+                "results": resource.serialize(page.object_list, fields),
+                "next": page.next_cursor,
+                "previous": page.previous_cursor,
+            }
+
+        return self.render(request, data)
+
+    def get_limit(self):
+        raw = self.request.GET.get("limit", DEFAULT_PAGE_SIZE)
+        try:
+            limit = int(raw)
+        except (TypeError, ValueError):
+            raise ApiError("'limit' must be an integer")
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ApiError(f"'limit' must be between 1 and {MAX_PAGE_SIZE}")
+        return limit
+
+    def render(self, request, data):
+        content = json.dumps(data, cls=DjangoJSONEncoder)
+        etag = quote_etag(hashlib.md5(content.encode()).hexdigest())
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+class TaskApiView(ResourceView):
+    resource_class = TaskResource
+
+
+class ProjectApiView(ResourceView):
+    resource_class = ProjectResource
+
+
+class TeamApiView(ResourceView):
+    resource_class = TeamResource
+
+
+class WorkerApiView(ResourceView):
+    resource_class = WorkerResource
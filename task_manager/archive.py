@@ -0,0 +1,114 @@
+"""
+Archival of old completed tasks and finished projects.
+
+``archive_tasks`` moves completed tasks whose deadline passed more than
+``ARCHIVE_AFTER_DAYS`` ago, with their assignee and tag links, into
+``ArchivedTask`` and its through tables, one transaction per batch.  The
+``Task`` table then only holds live work, so list queries and counters no
+longer skip over history.
+
+Finished (DONE or CANCELED) projects left without live tasks are archived
+in place: ``archived_at`` is set, which hides them from ``Project.objects``
+while their archived tasks keep pointing at them.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from task_manager import search, stats
+from task_manager.models import ArchivedTask, Project, Task, Team
+
+
+ARCHIVE_AFTER_DAYS = 90
+BATCH_SIZE = 500
+FINISHED_PROJECT_STATUSES = ("DONE", "CANCELED")
+
+
+def get_archive_after_days() -> int:
+    return getattr(settings, "ARCHIVE_AFTER_DAYS", ARCHIVE_AFTER_DAYS)
+
+
+def archivable_tasks(days=None):
+    if days is None:
+        days = get_archive_after_days()
+    cutoff = timezone.localdate() - datetime.timedelta(days=days)
+    return Task.objects.filter(is_completed=True, deadline__lt=cutoff)
+
+
+def _copy_links(relation, archived_relation, task_ids, other_field):
+    through = archived_relation.through
+    through.objects.bulk_create([
+        through(archivedtask_id=task_id, **{other_field: other_id})
+        for task_id, other_id in relation.through.objects.filter(
+            task_id__in=task_ids
+        ).values_list("task_id", other_field)
+    ])
+
+
+def archive_batch(task_ids) -> int:
+    """Move the given completed tasks to the archive; returns tasks moved."""
+    tasks = Task.objects.filter(pk__in=task_ids, is_completed=True)
+    archived = ArchivedTask.objects.bulk_create([
+        ArchivedTask(
+            id=task.pk,
+            name=task.name,
+            description=task.description,
+            deadline=task.deadline,
+            priority=task.priority,
+            task_type_id=task.task_type_id,
+            project_id=task.project_id,
+        )
+        for task in tasks
+    ])
+    moved_ids = [task.pk for task in archived]
+    _copy_links(Task.assignees, ArchivedTask.assignees, moved_ids, "worker_id")
+    _copy_links(Task.tags, ArchivedTask.tags, moved_ids, "tag_id")
+    # Deleted through the ORM, so the signal handlers settle counters,
+    # caches and the search index as for any other deletion.
+    Task.objects.filter(pk__in=moved_ids).delete()
+    return len(moved_ids)
+
+
+@transaction.atomic
+def archive_projects() -> int:
+    """Archive finished projects without live tasks; returns the count."""
+    projects = Project.objects.filter(
+        status__in=FINISHED_PROJECT_STATUSES
+    ).exclude(Exists(Task.objects.filter(project=OuterRef("pk"))))
+    project_ids = list(projects.values_list("pk", flat=True))
+    if not project_ids:
+        return 0
+    team_ids = set(
+        Project.teams.through.objects.filter(
+            project_id__in=project_ids
+        ).values_list("team_id", flat=True)
+    )
+    now = timezone.now()
+    Project.objects.filter(pk__in=project_ids).update(
+        archived_at=now, updated_at=now
+    )
+    stats.refresh_counts(Team, team_ids)
+    # No longer found by Project.objects, so their documents are dropped.
+    search.index_objects(Project, project_ids)
+    return len(project_ids)
+
+
+def archive_tasks(days=None, batch_size=BATCH_SIZE, on_batch=None) -> dict:
+    """
+    Archive every task due for it, then the projects this left empty.
+
+    ``on_batch`` is called with the number of tasks moved so far after
+    each batch commits.
+    """
+    moved = 0
+    pks = archivable_tasks(days).order_by("pk").values_list("pk", flat=True)
+    while batch := list(pks[:batch_size]):
+        with transaction.atomic():
+            moved += archive_batch(batch)
+        if on_batch is not None:
+            on_batch(moved)
+    return {"tasks": moved, "projects": archive_projects()}
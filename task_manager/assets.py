@@ -0,0 +1,302 @@
+"""
+Production static asset pipeline.
+
+With ``STATIC_PIPELINE`` on, ``collectstatic`` runs through
+``PipelineStaticFilesStorage``: it builds the ``BUNDLES`` from their
+source files (minifying CSS), gives every file a content-hashed name like
+``ManifestStaticFilesStorage`` does, and writes gzip variants of text
+assets next to the hashed files, plus brotli variants when the
+``brotli`` package is installed.  With Pillow installed, large JPEG and
+PNG images also get downscaled ``.w<width>`` derivatives.
+
+``StaticAssetMiddleware`` serves the collected files in-process.  Hashed
+names never change content, so they are sent with a one-year immutable
+``Cache-Control``; the smallest precompressed variant the client accepts
+is picked without compressing anything per request; and files go out as
+``FileResponse``, which WSGI servers hand to ``sendfile``.
+"""
+
+import gzip
+import io
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# Built by collectstatic; see the ``bundle`` template tag.
+BUNDLES = {
+    "assets/css/app.bundle.css": (
+        "assets/css/material-dashboard.css",
+    ),
+    "assets/js/app.bundle.js": (
+        "assets/js/core/popper.min.js",
+        "assets/js/core/bootstrap.min.js",
+        "assets/js/plugins/perfect-scrollbar.min.js",
+        "assets/js/plugins/smooth-scrollbar.min.js",
+        "assets/js/material-dashboard.min.js",
+    ),
+}
+COMPRESSIBLE_EXTENSIONS = {
+    ".css", ".js", ".map", ".json", ".svg", ".txt", ".html", ".xml",
+    ".ico", ".ttf", ".otf", ".eot",
+}
+# Variants saving less than this fraction are not worth the disk space.
+MIN_COMPRESSION_SAVING = 0.05
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+IMAGE_WIDTHS = (480, 960)
+# In the order they are preferred when the client accepts several.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+_CSS_TOKENS = re.compile(
+    r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')"""  # strings, kept as-is
+    r"|/\*.*?\*/"  # comments
+    r"|\s*;\s*}\s*"  # a last declaration's semicolon
+    r"|\s*([{};,>])\s*"  # punctuation that needs no spacing
+    r"|(?<=:)\s+"  # after a colon; before one it can be a descendant
+    r"|\s+",
+    re.S,
+)
+
+_SOURCE_MAP = re.compile(r"^//# sourceMappingURL=.*$", re.M)
+
+
+def minify_css(source: str) -> str:
+    def replace(match):
+        string, punctuation = match.groups()
+        text = match.group(0)
+        if string:
+            return string
+        if text.startswith("/*"):
+            return ""
+        if punctuation:
+            return punctuation
+        if "}" in text:
+            return "}"
+        if match.string[match.start() - 1] == ":":
+            return ""
+        return " "
+
+    return _CSS_TOKENS.sub(replace, source).strip()
+
+
+def build_bundle(name, read) -> str:
+    """
+    Join the sources of bundle ``name``; ``read`` returns a source's text.
+    """
+    sources = [read(path) for path in BUNDLES[name]]
+    if name.endswith(".css"):
+        return minify_css("\n".join(sources))
+    # The vendored scripts ship minified; ";" guards against a missing
+    # trailing semicolon in one of them.  Their source maps do not match
+    # the bundle, so the references go.
+    return ";\n".join(
+        _SOURCE_MAP.sub("", source).strip() for source in sources
+    ) + "\n"
+
+
+def accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if coding and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PipelineStaticFilesStorage(ManifestStaticFilesStorage):
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def convert(match):
+            # Vendored files point at source maps and images that are not
+            # shipped; those references are left as they are rather than
+            # failing the build.
+            try:
+                return converter(match)
+            except ValueError:
+                return match.group(0)
+
+        return convert
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run, **options)
+            return
+
+        paths = dict(paths)
+        for name in BUNDLES:
+            self._write(name, build_bundle(name, self._read_text).encode())
+            paths[name] = (self, name)
+
+        yield from super().post_process(paths, dry_run, **options)
+
+        for hashed_name in sorted(set(self.hashed_files.values())):
+            extension = os.path.splitext(hashed_name)[1].lower()
+            if extension in COMPRESSIBLE_EXTENSIONS:
+                for variant in self.compress(hashed_name):
+                    yield variant, variant, True
+            elif extension in IMAGE_EXTENSIONS and Image is not None:
+                for variant in self.resize(hashed_name):
+                    yield variant, variant, True
+
+    def _read_text(self, name) -> str:
+        with self.open(name) as source:
+            return source.read().decode()
+
+    def _write(self, name, content) -> None:
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(content))
+
+    def compress(self, name) -> list:
+        with self.open(name) as source:
+            data = source.read()
+        compressors = [("gz", lambda data: gzip.compress(data, 9, mtime=0))]
+        if brotli is not None:
+            compressors.append(("br", brotli.compress))
+        written = []
+        for suffix, compress in compressors:
+            compressed = compress(data)
+            if len(compressed) <= len(data) * (1 - MIN_COMPRESSION_SAVING):
+                self._write(f"{name}.{suffix}", compressed)
+                written.append(f"{name}.{suffix}")
+        return written
+
+    def resize(self, name) -> list:
+        root, extension = os.path.splitext(name)
+        written = []
+        with self.open(name) as source, Image.open(source) as image:
+            for width in IMAGE_WIDTHS:
+                if image.width <= width:
+                    continue
+                height = round(image.height * width / image.width)
+                output = io.BytesIO()
+                image.resize((width, height), Image.LANCZOS).save(
+                    output, format=image.format, optimize=True
+                )
+                variant = f"{root}.w{width}{extension}"
+                self._write(variant, output.getvalue())
+                written.append(variant)
+        return written
+
+
+class _Asset:
+    def __init__(self, path, immutable):
+        stat = path.stat()
+        self.path = path
+        self.immutable = immutable
+        self.content_type = (
+            mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        )
+        self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        self.variants = [
+            (coding, path.with_name(path.name + suffix))
+            for coding, suffix in ENCODINGS
+            if path.with_name(path.name + suffix).exists()
+        ]
+
+    def pick(self, accept_encoding):
+        accepted = accepted_encodings(accept_encoding)
+        for coding, path in self.variants:
+            if coding in accepted:
+                return coding, path
+        return None, self.path
+
+
+def load_assets(root) -> dict:
+    """Index the collected files under ``root`` by their static path."""
+    root = Path(root)
+    manifest = ManifestStaticFilesStorage(location=root)
+    hashed = set(manifest.hashed_files.values())
+    assets = {}
+    suffixes = {suffix for _, suffix in ENCODINGS}
+    for path in root.rglob("*"):
+        if not path.is_file() or path.suffix in suffixes:
+            continue
+        name = path.relative_to(root).as_posix()
+        assets[name] = _Asset(path, immutable=name in hashed)
+    return assets
+
+
+class StaticAssetMiddleware:
+    """Serve ``STATIC_ROOT`` in-process, precompressed and cache-friendly."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.assets = None
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.serve(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        response = self.serve(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+    def serve(self, request):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        if not request.path.startswith(self.prefix):
+            return None
+        if self.assets is None:
+            self.assets = load_assets(settings.STATIC_ROOT)
+        asset = self.assets.get(request.path[len(self.prefix):])
+        if asset is None:
+            return None
+
+        headers = {
+            "ETag": asset.etag,
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL
+            if asset.immutable else REVALIDATE_CACHE_CONTROL,
+        }
+        if asset.variants:
+            headers["Vary"] = "Accept-Encoding"
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and (
+            asset.etag in parse_etags(if_none_match) or if_none_match == "*"
+        ):
+            return HttpResponseNotModified(headers=headers)
+
+        coding, path = asset.pick(request.headers.get("Accept-Encoding", ""))
+        response = FileResponse(
+            open(path, "rb"),
+            filename=asset.path.name,
+            content_type=asset.content_type,
+            headers=headers,
+        )
+        if coding:
+            response.headers["Content-Encoding"] = coding
+        return response
@@ -0,0 +1,24 @@
+"""URLs of the ASGI profile: ``task_manager.urls`` with the async pages."""
+
+from django.urls import path
+
+from task_manager import async_views
+from task_manager.urls import app_name, urlpatterns as sync_urlpatterns
+
+
+ASYNC_VIEWS = {
+    "index": async_views.index,
+    "task-list": async_views.AsyncTaskListView.as_view(),
+    "tag-list": async_views.AsyncTagListView.as_view(),
+    "task-type-list": async_views.AsyncTaskTypeListView.as_view(),
+    "position-list": async_views.AsyncPositionListView.as_view(),
+    "team-list": async_views.AsyncTeamListView.as_view(),
+    "worker-list": async_views.AsyncWorkerListView.as_view(),
+    "project-list": async_views.AsyncProjectListView.as_view(),
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name)
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
@@ -0,0 +1,181 @@
+"""
+Async versions of the read-heavy pages, served in the ASGI profile.
+
+``task_manager.async_urls`` swaps them in for their synchronous
+counterparts.  Rows are fetched with the async ORM before the response is
+built, and the list views reuse the querysets, orderings and templates of
+the views they replace, so both profiles render the same pages.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.db.models import aprefetch_related_objects
+from django.template.response import TemplateResponse
+from django.views import generic
+
+from task_manager import activity, stats, views
+from task_manager.caching import aget_pending_tasks, attach_versions, uncached
+from task_manager.forms import TaskBulkActionForm
+from task_manager.pagination import KeysetPaginationMixin, KeysetPaginator
+from task_manager.routers import replica_reads
+
+
+async def alist(queryset) -> list:
+    return [obj async for obj in queryset]
+
+
+async def get_base_context(request) -> dict:
+    """
+    Resolve the user and the sidebar's pending tasks up front.
+
+    Both are lazy in the synchronous views; resolving them here keeps the
+    base template from querying when it is rendered.
+    """
+    request.user = await request.auser()
+    if not request.user.is_authenticated:
+        return {"user_tasks": []}
+    return {"user_tasks": await aget_pending_tasks(request.user.pk)}
+
+
+async def count_visit(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+    key = activity.visits_key(user)
+    activity.record(key)
+    return await activity.aget_count(key)
+
+
+async def get_busiest_workers(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return []
+    return await sync_to_async(views.get_busiest_workers)()
+
+
+@replica_reads
+async def index(request):
+    # None of these depend on each other, so they are awaited together.
+    (
+        context, counters, teams, projects, visit_times, busiest_workers
+    ) = await asyncio.gather(
+        get_base_context(request),
+        stats.aget_counters(),
+        alist(views.get_dashboard_teams()),
+        alist(views.get_dashboard_projects()),
+        count_visit(request),
+        get_busiest_workers(request),
+    )
+    context.update(
+        views.get_dashboard_context(counters, teams, projects, visit_times)
+    )
+    context["busiest_workers"] = busiest_workers
+
+    return TemplateResponse(request, "task_manager/index.html", context)
+
+
+class AsyncListView(generic.View):
+    """
+    Async ``ListView`` built on the configuration of ``view_class``.
+
+    ``row_fragment`` names the ``{% cache %}`` fragment of each row and the
+    relations its template reads; they are prefetched for uncached rows only.
+    """
+
+    view_class = None
+    segment = None
+    row_fragment = None
+    replica_reads = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.base_context = await get_base_context(request)
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_extra_context(self) -> dict:
+        return {}
+
+    async def get(self, request, *args, **kwargs):
+        view = self.view_class()
+        view.setup(request, *args, **kwargs)
+        queryset = view.object_list = view.get_queryset()
+
+        context = {
+            **self.base_context,
+            "view": view,
+            "segment": self.segment,
+            "paginator": None,
+            "page_obj": None,
+            "is_paginated": False,
+        }
+        if isinstance(view, KeysetPaginationMixin):
+            paginator = KeysetPaginator(
+                queryset,
+                view.get_keyset_ordering(),
+                view.get_paginate_by(queryset),
+            )
+            page = await paginator.apage(view.get_cursor())
+            rows = page.object_list
+            context.update(
+                paginator=paginator,
+                page_obj=page,
+                is_paginated=page.has_other_pages(),
+            )
+        else:
+            rows = await alist(queryset)
+
+        if self.row_fragment:
+            fragment, lookups = self.row_fragment
+            await aprefetch_related_objects(
+                uncached(fragment, attach_versions(rows)), *lookups
+            )
+
+        context["object_list"] = rows
+        context[view.get_context_object_name(queryset)] = rows
+        context.update(self.get_extra_context())
+
+        return view.render_to_response(context)
+
+
+class AsyncTaskListView(AsyncListView):
+    view_class = views.TaskListView
+    segment = "tasks"
+
+    def get_extra_context(self) -> dict:
+        return {"bulk_form": TaskBulkActionForm()}
+
+
+class AsyncTeamListView(AsyncListView):
+    view_class = views.TeamListView
+    segment = "teams"
+    row_fragment = ("team-row", ("workers", "projects"))
+
+
+class AsyncWorkerListView(AsyncListView):
+    view_class = views.WorkerListView
+    segment = "workers"
+    row_fragment = ("worker-row", ("teams_team_lead", "teams"))
+
+
+class AsyncProjectListView(AsyncListView):
+    view_class = views.ProjectListView
+    segment = "projects"
+    row_fragment = ("project-row", ("teams",))
+
+
+class AsyncTagListView(AsyncListView):
+    view_class = views.TagListView
+    segment = "tags"
+
+
+class AsyncTaskTypeListView(AsyncListView):
+    view_class = views.TaskTypeListView
+    segment = "task types"
+
+
+class AsyncPositionListView(AsyncListView):
+    view_class = views.PositionListView
+    segment = "positions"
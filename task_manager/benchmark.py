@@ -0,0 +1,329 @@
+"""
+Latency, query and memory benchmark of every ``task_manager`` route.
+
+Each route is requested through the Django test client as a logged-in
+worker, against whatever database is configured, typically one filled by
+``manage.py seed``.  URL arguments are filled with sample rows.  Results are
+plain JSON so runs from before and after a change can be diffed.
+
+``run_throughput_benchmark`` instead drives the ASGI handler with many
+concurrent clients, to compare the serving profiles in ``settings``, and
+``run_assignment_benchmark`` times ``task_manager.scheduling`` on scratch
+rows that are rolled back afterwards.
+"""
+
+import asyncio
+import datetime
+import random
+import statistics
+import time
+import tracemalloc
+
+import django
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from task_manager import scheduling, urls
+from task_manager.models import (
+    Position,
+    Project,
+    Tag,
+    Task,
+    TaskType,
+    Team,
+    Worker,
+)
+from task_manager.query_budget import QueryRecorder
+
+
+# Routes that only accept POST.
+SKIPPED_ROUTES = {"task-bulk", "task-import", "project-assign"}
+
+# Model whose primary key fills ``<int:pk>``, by route name prefix.
+PK_MODELS = {
+    "task-type": TaskType,
+    "task": Task,
+    "tag": Tag,
+    "position": Position,
+    "team": Team,
+    "worker": Worker,
+    "project": Project,
+    "api-task": Task,
+    "api-project": Project,
+    "api-team": Team,
+    "api-worker": Worker,
+}
+EXTRA_KWARGS = {
+    "worker-tasks": {"status": "open"},
+    "lookup": {"kind": "workers"},
+}
+
+
+def route_kwargs(pattern):
+    """Arguments to reverse ``pattern`` with, or ``None`` if no row fits."""
+    kwargs = dict(EXTRA_KWARGS.get(pattern.name, {}))
+    if "pk" in pattern.pattern.converters:
+        for prefix in sorted(PK_MODELS, key=len, reverse=True):
+            if pattern.name.startswith(prefix):
+                # Busiest worker / biggest project: the worst case page.
+                model = PK_MODELS[prefix]
+                ordering = ["pk"]
+                if model in (Worker, Project):
+                    ordering = ["-task_count", "pk"]
+                pk = model.objects.order_by(*ordering).values_list(
+                    "pk", flat=True
+                ).first()
+                if pk is None:
+                    return None
+                kwargs["pk"] = pk
+                break
+    return kwargs
+
+
+def get_routes(only=None):
+    """Return ``[(name, path)]`` for every GET route of the app."""
+    if only:
+        only = {name.split(":")[-1] for name in only}
+    routes = []
+    for pattern in urls.urlpatterns:
+        if not isinstance(pattern, URLPattern):
+            continue
+        if pattern.name in SKIPPED_ROUTES:
+            continue
+        if only and pattern.name not in only:
+            continue
+        kwargs = route_kwargs(pattern)
+        if kwargs is None:
+            continue
+        name = f"{urls.app_name}:{pattern.name}"
+        routes.append((name, reverse(name, kwargs=kwargs)))
+    return routes
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def measure(client, path, iterations, warmup=1):
+    def fetch():
+        response = client.get(path)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    for _ in range(warmup):
+        fetch()
+
+    timings = []
+    for _ in range(iterations):
+        with QueryRecorder() as recorder:
+            start = time.perf_counter()
+            response = fetch()
+            timings.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate run so tracing does not skew timings.
+    tracemalloc.start()
+    try:
+        fetch()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "path": path,
+        "status": response.status_code,
+        "p50_ms": round(statistics.median(timings) * 1000, 2),
+        "p95_ms": round(percentile(timings, 0.95) * 1000, 2),
+        "queries": recorder.count,
+        "db_ms": round(recorder.duration * 1000, 2),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+async def measure_throughput(user, path, clients, requests):
+    """Run ``clients`` sessions, each requesting ``path`` in turn."""
+    async def session():
+        client = AsyncClient()
+        await client.aforce_login(user)
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(path)
+            timings.append(time.perf_counter() - start)
+        return response.status_code, timings
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(session() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    timings = [timing for _, session_timings in results
+               for timing in session_timings]
+    return {
+        "path": path,
+        "status": results[0][0],
+        "requests": len(timings),
+        "requests_per_second": round(len(timings) / elapsed, 1),
+        "p50_ms": round(statistics.median(timings) * 1000, 2),
+        "p95_ms": round(percentile(timings, 0.95) * 1000, 2),
+    }
+
+
+def get_user(username=None):
+    workers = Worker.objects.order_by("-task_count", "pk")
+    if username:
+        workers = workers.filter(username=username)
+    user = workers.first()
+    if user is None:
+        raise Worker.DoesNotExist("No worker to log in as; run seed first.")
+    return user
+
+
+def get_meta(user, **extra) -> dict:
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "serving_mode": getattr(settings, "SERVING_MODE", "development"),
+        "session_profile": getattr(settings, "SESSION_PROFILE", "db"),
+        **extra,
+        "user": user.username,
+        "rows": {
+            model._meta.model_name: model.objects.count()
+            for model in (Worker, Team, Project, Task, Tag)
+        },
+    }
+
+
+def run_benchmark(iterations=10, only=None, username=None) -> dict:
+    """Benchmark the routes; returns the report as a JSON-ready dict."""
+    user = get_user(username)
+
+    client = Client()
+    client.force_login(user)
+    try:
+        results = {
+            name: measure(client, path, iterations)
+            for name, path in get_routes(only)
+        }
+    finally:
+        client.logout()
+
+    return {
+        "meta": get_meta(user, iterations=iterations),
+        "routes": results,
+    }
+
+
+def run_throughput_benchmark(
+    clients=8, requests=20, only=None, username=None
+) -> dict:
+    """Requests per second of each route under ``clients`` at once."""
+    user = get_user(username)
+    results = {
+        name: async_to_sync(measure_throughput)(
+            user, path, clients, requests
+        )
+        for name, path in get_routes(only)
+    }
+    return {
+        "meta": get_meta(
+            user, clients=clients, requests_per_client=requests
+        ),
+        "routes": results,
+    }
+
+
+def _timed(function, *args, **kwargs) -> tuple:
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+    return result, {
+        "ms": round(elapsed * 1000, 1), "queries": len(queries)
+    }
+
+
+def _load_spread(loads) -> dict:
+    return {
+        "min": round(min(loads), 2),
+        "max": round(max(loads), 2),
+        "mean": round(statistics.fmean(loads), 2),
+        "stdev": round(statistics.pstdev(loads), 2),
+    }
+
+
+def run_assignment_benchmark(tasks=10000, workers=1000, random_seed=0):
+    """
+    Plan and apply the assignment of ``tasks`` unassigned tasks over a
+    team of ``workers``, a tenth of whom already carry open tasks.
+    """
+    rng = random.Random(random_seed)
+    prefix = f"bench{rng.randrange(16 ** 6):06x}"
+    today = datetime.date.today()
+    priorities = [priority for priority, _ in Task.PRIORITY_CHOICES]
+
+    with transaction.atomic():
+        members = Worker.objects.bulk_create([
+            Worker(username=f"{prefix}-{index}", password="!")
+            for index in range(workers)
+        ])
+        team = Team.objects.create(name=prefix)
+        team.workers.add(*members)
+        project = Project.objects.create(name=prefix, budget=0)
+        project.teams.add(team)
+        task_type = TaskType.objects.get_or_create(name="Feature")[0]
+
+        def new_tasks(count, project, assignee_count=0):
+            return Task.objects.bulk_create([
+                Task(
+                    name=f"{prefix} task {index}",
+                    description="",
+                    deadline=today + datetime.timedelta(
+                        days=rng.randrange(90)
+                    ),
+                    is_completed=False,
+                    priority=rng.choice(priorities),
+                    task_type=task_type,
+                    project=project,
+                    assignee_count=assignee_count,
+                )
+                for index in range(count)
+            ])
+
+        # Existing work on a tenth of the team, outside the project.
+        busy = members[:max(workers // 10, 1)]
+        Task.assignees.through.objects.bulk_create([
+            Task.assignees.through(task=task, worker=rng.choice(busy))
+            for task in new_tasks(tasks // 10, None, assignee_count=1)
+        ])
+        new_tasks(tasks, project)
+
+        member_ids = [worker.pk for worker in members]
+        before = scheduling.get_loads(member_ids)
+        plan, planned = _timed(
+            scheduling.assign_tasks, project, dry_run=True
+        )
+        result, applied = _timed(scheduling.assign_tasks, project)
+        after = scheduling.get_loads(member_ids)
+        transaction.set_rollback(True)
+
+    return {
+        "tasks": tasks,
+        "workers": workers,
+        "assigned": result["assigned"],
+        "dry_run": planned,
+        "apply": applied,
+        "load_before": _load_spread(
+            [before.get(pk, 0.0) for pk in member_ids]
+        ),
+        "load_after": _load_spread(
+            [after.get(pk, 0.0) for pk in member_ids]
+        ),
+    }
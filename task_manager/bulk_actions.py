@@ -0,0 +1,144 @@
+"""
+Set-based bulk edits of many tasks at once.
+
+Every action is a handful of UPDATE / through-table INSERT or DELETE
+statements in one transaction, whatever the number of selected tasks.
+Those statements bypass model signals, so each action settles the
+affected counters, pending-task caches, search documents and detail page
+stamps itself; the stamps also key the cached fragments.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from task_manager import search, stats
+from task_manager.caching import invalidate_pending_tasks
+from task_manager.freshness import touch
+from task_manager.models import Project, Task, Worker
+
+
+ACTION_CHOICES = (
+    ("complete", "Mark as completed"),
+    ("reopen", "Mark as in progress"),
+    ("priority", "Set priority"),
+    ("project", "Move to project"),
+    ("add_assignee", "Add assignee"),
+    ("remove_assignee", "Remove assignee"),
+    ("add_tag", "Add tag"),
+    ("remove_tag", "Remove tag"),
+)
+
+
+def _assignee_ids(task_ids):
+    return set(
+        Task.assignees.through.objects.filter(task_id__in=task_ids)
+        .values_list("worker_id", flat=True)
+    )
+
+
+def set_completed(task_ids, is_completed: bool) -> int:
+    changed = list(
+        Task.objects.filter(pk__in=task_ids)
+        .exclude(is_completed=is_completed)
+        .values_list("pk", "project_id")
+    )
+    if not changed:
+        return 0
+    changed_ids = [pk for pk, _ in changed]
+    Task.objects.filter(pk__in=changed_ids).update(
+        is_completed=is_completed, updated_at=timezone.now()
+    )
+
+    workers = _assignee_ids(changed_ids)
+    delta = -len(changed_ids) if is_completed else len(changed_ids)
+    stats.increment(stats.TASKS_IN_PROCESS, delta)
+    stats.refresh_counts(Worker, workers)
+    stats.refresh_counts(Project, {project for _, project in changed})
+    invalidate_pending_tasks(workers)
+    return len(changed_ids)
+
+
+def set_priority(task_ids, priority: str) -> int:
+    tasks = Task.objects.filter(pk__in=task_ids).exclude(priority=priority)
+    # Project and worker pages show task priorities.
+    projects = set(tasks.values_list("project_id", flat=True))
+    touch(Project, projects)
+    touch(Worker, _assignee_ids(tasks.values("pk")))
+    return tasks.update(priority=priority, updated_at=timezone.now())
+
+
+def set_project(task_ids, project) -> int:
+    project_id = project.pk if project else None
+    tasks = Task.objects.filter(pk__in=task_ids).exclude(
+        project_id=project_id
+    )
+    projects = set(tasks.values_list("project_id", flat=True))
+    updated = tasks.update(project_id=project_id, updated_at=timezone.now())
+    if updated:
+        # The old and new project pages and search documents list the
+        # moved tasks; refreshing their task counts moves their stamps.
+        stats.refresh_counts(Project, projects | {project_id})
+        search.index_objects(Project, projects | {project_id})
+    return updated
+
+
+def _add_links(relation, task_ids, other_field, other_id) -> list:
+    through = relation.through
+    existing = set(
+        through.objects.filter(
+            task_id__in=task_ids, **{other_field: other_id}
+        ).values_list("task_id", flat=True)
+    )
+    added = [pk for pk in task_ids if pk not in existing]
+    through.objects.bulk_create(
+        [through(task_id=pk, **{other_field: other_id}) for pk in added],
+        ignore_conflicts=True,
+    )
+    return added
+
+
+def _remove_links(relation, task_ids, other_field, other_id) -> list:
+    links = relation.through.objects.filter(
+        task_id__in=task_ids, **{other_field: other_id}
+    )
+    removed = list(links.values_list("task_id", flat=True))
+    links.delete()
+    return removed
+
+
+def change_assignee(task_ids, worker, add: bool) -> int:
+    change = _add_links if add else _remove_links
+    changed = change(Task.assignees, task_ids, "worker_id", worker.pk)
+    if changed:
+        stats.refresh_counts(Task, changed)
+        stats.refresh_counts(Worker, [worker.pk])
+        invalidate_pending_tasks([worker.pk])
+        search.index_objects(Task, changed)
+    return len(changed)
+
+
+def change_tag(task_ids, tag, add: bool) -> int:
+    change = _add_links if add else _remove_links
+    changed = change(Task.tags, task_ids, "tag_id", tag.pk)
+    if changed:
+        # Tags only show on the task pages, which the refresh stamps.
+        stats.refresh_counts(Task, changed)
+        search.index_objects(Task, changed)
+    return len(changed)
+
+
+@transaction.atomic
+def apply_bulk_action(task_ids, action, value=None) -> int:
+    """Apply ``action`` to the tasks in ``task_ids``; returns rows changed."""
+    task_ids = list(task_ids)
+    if action in ("complete", "reopen"):
+        return set_completed(task_ids, action == "complete")
+    if action == "priority":
+        return set_priority(task_ids, value)
+    if action == "project":
+        return set_project(task_ids, value)
+    if action in ("add_assignee", "remove_assignee"):
+        return change_assignee(task_ids, value, action == "add_assignee")
+    if action in ("add_tag", "remove_tag"):
+        return change_tag(task_ids, value, action == "add_tag")
+    raise ValueError(f"Unknown bulk action {action!r}")
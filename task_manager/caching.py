@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+
+from task_manager.models import Task
+from task_manager.routers import get_replica_cache_timeout
+
+
+PENDING_TASKS_LIMIT = 10
+PENDING_TASKS_TIMEOUT = 60 * 60
+# Lifetime of ``{% cache %}`` fragments, passed to templates as
+# ``fragment_timeout`` by ``task_manager.context_processors``.
+FRAGMENT_TIMEOUT = 24 * 60 * 60
+
+
+def pending_tasks_key(worker_id) -> str:
+    return f"task_manager:pending_tasks:{worker_id}"
+
+
+def get_pending_tasks(worker_id) -> list:
+    """
+    Return the worker's nearest open tasks as ``{"pk", "name"}`` dicts.
+
+    Results are cached per worker and dropped by the signal handlers in
+    ``task_manager.signals`` whenever one of the listed tasks could change.
+    """
+    key = pending_tasks_key(worker_id)
+    tasks = cache.get(key)
+    if tasks is None:
+        tasks = list(
+            Task.objects.filter(is_completed=False, assignees=worker_id)
+            .order_by("deadline", "pk")
+            .values("pk", "name")[:PENDING_TASKS_LIMIT]
+        )
+        cache.set(
+            key, tasks, get_replica_cache_timeout(PENDING_TASKS_TIMEOUT)
+        )
+    return tasks
+
+
+async def aget_pending_tasks(worker_id) -> list:
+    """Async variant of ``get_pending_tasks`` for the ASGI views."""
+    key = pending_tasks_key(worker_id)
+    tasks = await cache.aget(key)
+    if tasks is None:
+        queryset = (
+            Task.objects.filter(is_completed=False, assignees=worker_id)
+            .order_by("deadline", "pk")
+            .values("pk", "name")[:PENDING_TASKS_LIMIT]
+        )
+        tasks = [task async for task in queryset]
+        await cache.aset(
+            key, tasks, get_replica_cache_timeout(PENDING_TASKS_TIMEOUT)
+        )
+    return tasks
+
+
+def invalidate_pending_tasks(worker_ids) -> None:
+    """
+    Drop cached pending tasks for ``worker_ids`` once the transaction commits.
+
+    Deferring to commit keeps a concurrent request from caching rows that
+    are about to change.
+    """
+    keys = [pending_tasks_key(worker_id) for worker_id in set(worker_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# Template fragment versions
+#
+# Each cached row or section is keyed on its object's ``updated_at``
+# stamp, which ``task_manager.signals`` and the set-based writers move
+# whenever anything the row's pages show changes (see
+# ``task_manager.freshness``).  The stamp lives in the database, so a
+# change made by one process retires the fragments of every process, and
+# an uncommitted change never does.
+
+
+def attach_versions(objects) -> list:
+    """Set ``cache_version`` on each object from its ``updated_at``."""
+    objects = list(objects)
+    for obj in objects:
+        obj.cache_version = obj.updated_at.isoformat()
+    return objects
+
+
+def uncached(fragment_name, objects) -> list:
+    """
+    Objects whose ``{% cache ... fragment_name obj.pk obj.cache_version %}``
+    fragment is not stored, so views prefetch relations only for them.
+    """
+    keys = {
+        make_template_fragment_key(
+            fragment_name, [obj.pk, obj.cache_version]
+        ): obj
+        for obj in objects
+    }
+    cached = cache.get_many(keys)
+    return [obj for key, obj in keys.items() if key not in cached]
@@ -1,16 +1,23 @@
 from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
 
-from task_manager.models import Task
+from task_manager.caching import FRAGMENT_TIMEOUT, get_pending_tasks
+from task_manager.routers import get_replica_cache_timeout
 
 def pending_tasks(request: HttpRequest) -> dict:
     if request.user.is_authenticated:
-        user_tasks = Task.objects.filter(
-            is_completed=False, assignees=request.user
-        ).order_by("deadline")[:10]
+        # Lazy, so pages that never render the sidebar never hit the cache.
+        user_id = request.user.pk
+        user_tasks = SimpleLazyObject(lambda: get_pending_tasks(user_id))
 
         return {"user_tasks": user_tasks}
     return {"user_tasks": []}
 
 
+def fragment_cache(request: HttpRequest) -> dict:
+    # Fragments rendered from a lagging replica must not outlive the lag.
+    return {"fragment_timeout": get_replica_cache_timeout(FRAGMENT_TIMEOUT)}
+
+
 # def pages(request: HttpRequest) -> dict:
 #     return None
@@ -1,8 +1,67 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.forms.widgets import CheckboxSelectMultiple
+from django.urls import reverse_lazy
 
-from task_manager.models import Task, Team, Worker, Project
+from task_manager.bulk_actions import ACTION_CHOICES
+from task_manager.scheduling import get_candidates
+from task_manager.models import Task, Team, Worker, Project, Tag
+
+
+class TypeaheadMixin:
+    """
+    Model choice widget that renders only the selected options.
+
+    Other options are fetched page by page from ``lookup_url`` by
+    ``typeahead.js``, so rendering costs one ``pk__in`` query however many
+    rows the field's queryset holds.  Submitted ids are validated by the
+    model choice field with a single ``pk__in`` query as usual.
+    """
+
+    def __init__(self, lookup_url, attrs=None):
+        super().__init__(attrs)
+        self.lookup_url = lookup_url
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-typeahead-url"] = str(
+            self.lookup_url
+        )
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        options = []
+        if not self.allow_multiple_selected and field.empty_label is not None:
+            options.append(("", field.empty_label, not any(value)))
+        # Only ids can be looked up; junk is reported by field validation.
+        selected = [pk for pk in value if str(pk).isdigit()]
+        options += [
+            (field.prepare_value(obj), field.label_from_instance(obj), True)
+            for obj in self.choices.queryset.filter(pk__in=selected)
+        ]
+        return [
+            (None, [self.create_option(
+                name, option_value, label, is_selected, index, attrs=attrs
+            )], index)
+            for index, (option_value, label, is_selected) in enumerate(options)
+        ]
+
+
+class TypeaheadSelect(TypeaheadMixin, forms.Select):
+    pass
+
+
+class TypeaheadSelectMultiple(TypeaheadMixin, forms.SelectMultiple):
+    pass
+
+
+def typeahead(kind, multiple=True):
+    widget_class = TypeaheadSelectMultiple if multiple else TypeaheadSelect
+    return widget_class(
+        reverse_lazy("task_manager:lookup", kwargs={"kind": kind}),
+        attrs={"class": "form-select"},
+    )
 
 
 class TaskForm(forms.ModelForm):
@@ -10,18 +69,40 @@ class TaskForm(forms.ModelForm):
         model = Task
         fields = "__all__"
         widgets={
-            "tags": CheckboxSelectMultiple,
+            "tags": typeahead("tags"),
             "deadline": forms.DateTimeInput(
                 format="%Y-%m-%d",
                 attrs={"type": "date"}
             ),
-            "assignees": CheckboxSelectMultiple
+            "assignees": typeahead("workers")
         }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields["task_type"].empty_label = "Choose type of task..."
         self.fields["project"].empty_label = "Choose project this task belong..."
+        # Checked in clean(): a new task of a project may be left
+        # unassigned, and then goes to a member of the project's teams.
+        self.fields["assignees"].required = False
+
+    def clean(self):
+        cleaned_data = super().clean()
+        project = cleaned_data.get("project")
+        auto_assigned = (
+            self.instance._state.adding
+            and project is not None
+            and get_candidates(project).exists()
+        )
+        if (
+            "assignees" in cleaned_data
+            and not cleaned_data["assignees"]
+            and not auto_assigned
+        ):
+            self.add_error(
+                "assignees",
+                self.fields["assignees"].error_messages["required"],
+            )
+        return cleaned_data
 
 
 class TeamForm(forms.ModelForm):
@@ -30,7 +111,8 @@ class TeamForm(forms.ModelForm):
         fields = "__all__"
 
         widgets = {
-            "workers": CheckboxSelectMultiple
+            "team_lead": typeahead("workers", multiple=False),
+            "workers": typeahead("workers")
         }
 
     def __init__(self, *args, **kwargs):
@@ -73,3 +155,56 @@ class ProjectForm(forms.ModelForm):
         widgets = {
             "teams": CheckboxSelectMultiple
         }
+
+
+class TaskBulkActionForm(forms.Form):
+    # Fields an action needs a value from; the rest need none.
+    VALUE_FIELDS = {
+        "priority": "priority",
+        "project": "project",
+        "add_assignee": "worker",
+        "remove_assignee": "worker",
+        "add_tag": "tag",
+        "remove_tag": "tag",
+    }
+
+    tasks = forms.ModelMultipleChoiceField(
+        queryset=Task.objects.all(),
+        widget=forms.MultipleHiddenInput,
+        error_messages={"required": "Select at least one task."},
+    )
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    priority = forms.ChoiceField(
+        choices=Task.PRIORITY_CHOICES, required=False
+    )
+    # Rendered on every task list page, so never with all their options.
+    project = forms.ModelChoiceField(
+        queryset=Project.objects.all(),
+        required=False,
+        empty_label="No project",
+        widget=typeahead("projects", multiple=False),
+    )
+    worker = forms.ModelChoiceField(
+        queryset=Worker.objects.all(),
+        required=False,
+        empty_label="Choose worker...",
+        widget=typeahead("workers", multiple=False),
+    )
+    tag = forms.ModelChoiceField(
+        queryset=Tag.objects.all(),
+        required=False,
+        empty_label="Choose tag...",
+        widget=typeahead("tags", multiple=False),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        field = self.VALUE_FIELDS.get(cleaned_data.get("action"))
+        # Clearing the project is a valid "move", so it may be empty.
+        if field and field != "project" and not cleaned_data.get(field):
+            self.add_error(field, "This action needs a value.")
+        return cleaned_data
+
+    def get_value(self):
+        field = self.VALUE_FIELDS.get(self.cleaned_data["action"])
+        return self.cleaned_data.get(field) if field else None
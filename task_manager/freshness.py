@@ -0,0 +1,79 @@
+"""
+Conditional GETs of the task, team, project and worker detail pages.
+
+Each of those models has an ``updated_at`` stamp that moves whenever
+anything its detail page shows changes: its own columns through
+``auto_now``, counters through ``stats.refresh_counts``, and related rows
+and m2m sets through ``touch`` calls from ``task_manager.signals`` and
+the set-based writers.  ``ConditionalDetailMixin`` builds the page's
+validators from the stamp before the view runs its queries, so polling an
+unchanged page costs one primary-key lookup and a 304.
+"""
+
+import hashlib
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from task_manager.caching import get_pending_tasks
+
+
+def touch(model, pks) -> int:
+    """Move the ``updated_at`` stamp of the given rows to now."""
+    pks = {pk for pk in pks or () if pk is not None}
+    if not pks:
+        return 0
+    # The base manager, so archived projects are stamped as well.
+    return model._base_manager.filter(pk__in=pks).update(
+        updated_at=timezone.now()
+    )
+
+
+def get_page_etag(request, updated_at) -> str:
+    """
+    ETag of a detail page last changed at ``updated_at``.
+
+    The page also shows the viewer's pending tasks in the sidebar and
+    marks overdue tasks, so the viewer and the date are part of the tag.
+    """
+    user_id = request.user.pk
+    parts = [
+        updated_at.isoformat(),
+        timezone.localdate().isoformat(),
+        str(user_id),
+        repr(get_pending_tasks(user_id)),
+    ]
+    digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+    return f'"{digest.hexdigest()}"'
+
+
+class ConditionalDetailMixin:
+    """
+    Answer ``If-None-Match`` / ``If-Modified-Since`` on a ``DetailView``
+    before the object and its relations are loaded.
+    """
+
+    def get_updated_at(self):
+        return self.model._default_manager.filter(
+            pk=self.kwargs[self.pk_url_kwarg]
+        ).values_list("updated_at", flat=True).first()
+
+    def get(self, request, *args, **kwargs):
+        updated_at = self.get_updated_at()
+        if updated_at is None:
+            # Missing: let the view raise its usual 404.
+            return super().get(request, *args, **kwargs)
+
+        etag = get_page_etag(request, updated_at)
+        last_modified = int(updated_at.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response.headers.setdefault("ETag", etag)
+        response.headers.setdefault("Last-Modified", http_date(last_modified))
+        # Always revalidate, and never from a shared cache.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,350 @@
+"""
+A database-backed job queue for work too heavy for a request.
+
+Views call ``enqueue`` with the name of a handler registered here; the
+``run_jobs`` command claims queued ``Job`` rows and runs them.  Claiming is
+a conditional ``UPDATE``, so any number of workers can share the queue
+without a broker.  Handlers work in short batches, each in its own
+transaction, and report progress after every batch.
+
+A failed job is retried with exponential backoff until ``max_attempts``
+is used up.  Handlers are written to resume where an earlier attempt
+stopped; a job whose worker died mid-run is picked up again once its lock
+is older than ``LOCK_TIMEOUT``.
+"""
+
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from task_manager import archive, search, stats, transfer, workload
+from task_manager.bulk_actions import set_project
+from task_manager.models import Job, Project, Task, TaskType, Team
+
+
+# Rows handled per transaction.
+BATCH_SIZE = 200
+# Deletions cascading to more rows than this are done by a job.
+INLINE_DELETE_LIMIT = 200
+# Imports of larger uploads are done by a job.
+INLINE_IMPORT_BYTES = 256 * 1024
+# Renames changing more search documents than this are re-indexed by a job.
+INLINE_REINDEX_LIMIT = 200
+# Seconds before the first retry; doubled for every further attempt.
+RETRY_DELAY = 30
+# Seconds after which a running job without progress counts as abandoned.
+LOCK_TIMEOUT = 600
+
+HANDLERS = {}
+
+
+def register(name):
+    """Register the decorated function as the handler of ``name`` jobs."""
+    def decorator(handler):
+        HANDLERS[name] = handler
+        return handler
+    return decorator
+
+
+def get_batch_size() -> int:
+    return getattr(settings, "JOBS_BATCH_SIZE", BATCH_SIZE)
+
+
+def get_inline_delete_limit() -> int:
+    return getattr(settings, "JOBS_INLINE_DELETE_LIMIT", INLINE_DELETE_LIMIT)
+
+
+def get_inline_import_bytes() -> int:
+    return getattr(settings, "JOBS_INLINE_IMPORT_BYTES", INLINE_IMPORT_BYTES)
+
+
+def get_inline_reindex_limit() -> int:
+    return getattr(
+        settings, "JOBS_INLINE_REINDEX_LIMIT", INLINE_REINDEX_LIMIT
+    )
+
+
+def get_file_storage():
+    return FileSystemStorage(location=settings.JOB_FILES_ROOT)
+
+
+def enqueue(name, max_attempts=None, **payload) -> Job:
+    """
+    Queue a ``name`` job with ``payload`` as its handler's arguments.
+
+    An identical job that is still waiting or running is returned instead
+    of queuing a duplicate, so a resubmitted form does not double the work.
+    """
+    if name not in HANDLERS:
+        raise ValueError(f"Unknown job {name!r}")
+    pending = Job.objects.filter(
+        name=name, payload=payload, status__in=("QUEUED", "RUNNING")
+    ).first()
+    if pending is not None:
+        return pending
+    job = Job(name=name, payload=payload)
+    if max_attempts is not None:
+        job.max_attempts = max_attempts
+    job.save()
+    return job
+
+
+def report_progress(job, progress, total=None) -> None:
+    """Record ``job``'s progress; this also renews its lock."""
+    job.progress = progress
+    if total is not None:
+        job.total = total
+    job.locked_at = timezone.now()
+    Job.objects.filter(pk=job.pk).update(
+        progress=job.progress, total=job.total, locked_at=job.locked_at
+    )
+
+
+def get_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker_id=None):
+    """Lock the next runnable job for ``worker_id``; ``None`` if idle."""
+    now = timezone.now()
+    abandoned = Q(
+        status="RUNNING",
+        locked_at__lt=now - timedelta(
+            seconds=getattr(settings, "JOBS_LOCK_TIMEOUT", LOCK_TIMEOUT)
+        ),
+    )
+    Job.objects.filter(
+        abandoned, attempts__gte=F("max_attempts")
+    ).update(
+        status="FAILED",
+        error="The worker running this job stopped responding.",
+        locked_by="",
+        locked_at=None,
+        finished_at=now,
+    )
+
+    runnable = Q(status="QUEUED", run_after__lte=now) | abandoned
+    candidates = Job.objects.filter(runnable).order_by("run_after", "pk")
+    for pk in candidates.values_list("pk", flat=True)[:10]:
+        # Another worker may win the race for this row; then try the next.
+        claimed = Job.objects.filter(runnable, pk=pk).update(
+            status="RUNNING",
+            attempts=F("attempts") + 1,
+            locked_by=worker_id or get_worker_id(),
+            locked_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job) -> Job:
+    """Run a claimed job and record its outcome."""
+    now = timezone.now()
+    handler = HANDLERS.get(job.name)
+    try:
+        if handler is None:
+            job.attempts = job.max_attempts
+            raise LookupError(f"No handler registered for {job.name!r} jobs")
+        job.result = handler(job, **job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = "QUEUED"
+            delay = getattr(settings, "JOBS_RETRY_DELAY", RETRY_DELAY)
+            job.run_after = now + timedelta(
+                seconds=delay * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = "FAILED"
+            job.finished_at = timezone.now()
+    else:
+        job.status = "DONE"
+        job.error = ""
+        job.finished_at = timezone.now()
+    job.locked_by = ""
+    job.locked_at = None
+    job.save(update_fields=[
+        "status", "attempts", "result", "error", "run_after",
+        "locked_by", "locked_at", "finished_at",
+    ])
+    return job
+
+
+def run_pending(limit=None, worker_id=None) -> list:
+    """Run runnable jobs until the queue is empty; returns the jobs run."""
+    finished = []
+    while limit is None or len(finished) < limit:
+        job = claim(worker_id)
+        if job is None:
+            break
+        finished.append(run_job(job))
+    return finished
+
+
+def _run_batches(job, steps) -> int:
+    """
+    Apply each ``(queryset, action)`` step to its rows, a batch at a time.
+
+    ``action`` receives a list of primary keys and must take those rows out
+    of its queryset, so every pass picks up the next batch.  Progress left
+    by an earlier attempt is carried over.
+    """
+    done = job.progress
+    report_progress(
+        job, done, done + sum(queryset.count() for queryset, _ in steps)
+    )
+    for queryset, action in steps:
+        pks = queryset.order_by("pk").values_list("pk", flat=True)
+        while batch := list(pks[:get_batch_size()]):
+            with transaction.atomic():
+                action(batch)
+            done += len(batch)
+            report_progress(job, done)
+    return done
+
+
+@register("delete_task_type")
+def delete_task_type(job, pk):
+    task_type = TaskType.objects.filter(pk=pk).first()
+    if task_type is None:
+        return {"deleted": False}
+    tasks = Task.objects.filter(task_type=task_type)
+    # Deleted through the ORM, so the signal handlers settle counters,
+    # caches and the search index for every task.
+    _run_batches(job, [
+        (tasks, lambda batch: Task.objects.filter(pk__in=batch).delete()),
+    ])
+    task_type.delete()
+    return {"deleted": True, "tasks": job.progress}
+
+
+@register("delete_project")
+def delete_project(job, pk):
+    project = Project.objects.filter(pk=pk).first()
+    if project is None:
+        return {"deleted": False}
+    # Tasks outlive their project, as with on_delete=SET_NULL.
+    _run_batches(job, [
+        (project.tasks.all(), lambda batch: set_project(batch, None)),
+    ])
+    project.delete()
+    return {"deleted": True, "tasks": job.progress}
+
+
+@register("delete_team")
+def delete_team(job, pk):
+    team = Team.objects.filter(pk=pk).first()
+    if team is None:
+        return {"deleted": False}
+    _run_batches(job, [
+        (team.workers.all(), lambda batch: team.workers.remove(*batch)),
+        (team.projects.all(), lambda batch: team.projects.remove(*batch)),
+    ])
+    team.delete()
+    return {"deleted": True, "links": job.progress}
+
+
+@register("import_tasks")
+def import_tasks(job, path, file_format):
+    storage = get_file_storage()
+    try:
+        with storage.open(path, "rb") as stream:
+            result = transfer.import_tasks(
+                stream,
+                file_format,
+                on_batch=lambda result: report_progress(
+                    job, result.created + result.skipped
+                ),
+            )
+    finally:
+        storage.delete(path)
+    return result.as_dict()
+
+
+@register("recount")
+def recount(job, models=None):
+    """Batched ``stats.recount`` followed by a dashboard counter rebuild."""
+    models = [
+        apps.get_model(label) for label in models or ()
+    ] or list(stats.COUNT_COLUMNS)
+    report_progress(job, 0, sum(model.objects.count() for model in models))
+    rows = {}
+    for model in models:
+        rows[model._meta.label] = 0
+        last = 0
+        pks = model.objects.order_by("pk").values_list("pk", flat=True)
+        while batch := list(pks.filter(pk__gt=last)[:get_batch_size()]):
+            with transaction.atomic():
+                stats.refresh_counts(model, batch)
+            last = batch[-1]
+            rows[model._meta.label] += len(batch)
+            report_progress(job, job.progress + len(batch))
+    counters = {
+        name: stats.rebuild_counter(name) for name in stats.COUNTER_QUERIES
+    }
+    return {"rows": rows, "counters": counters}
+
+
+def schedule_reindex(model, **filters) -> None:
+    """
+    Re-index the ``model`` documents matching ``filters``: right away when
+    there are few of them, otherwise by a ``reindex`` job.
+    """
+    limit = get_inline_reindex_limit()
+    pks = list(
+        model.objects.filter(**filters).values_list("pk", flat=True)[
+            :limit + 1
+        ]
+    )
+    if len(pks) <= limit:
+        search.index_objects(model, pks)
+    else:
+        enqueue("reindex", kind=search.KINDS[model], filters=filters)
+
+
+@register("reindex")
+def reindex(job, kind, filters):
+    model = search.DOCUMENTS[kind][0]
+    pks = model.objects.filter(**filters).order_by("pk").values_list(
+        "pk", flat=True
+    )
+    # The documents are rebuilt from current data, so a retry starts over.
+    report_progress(job, 0, pks.count())
+    last = 0
+    while batch := list(pks.filter(pk__gt=last)[:get_batch_size()]):
+        with transaction.atomic():
+            search.index_objects(model, batch)
+        last = batch[-1]
+        report_progress(job, job.progress + len(batch))
+    return {"indexed": job.progress}
+
+
+@register("workload")
+def refresh_workload(job):
+    result = workload.compute_workload()
+    # Only the latest snapshot is read.  It stays until this job's result
+    # is stored, so requests never find none in between.
+    snapshots = Job.objects.filter(name="workload", status="DONE")
+    latest = snapshots.order_by("-finished_at").values("pk")[:1]
+    snapshots.exclude(pk__in=latest).delete()
+    return result
+
+
+@register("archive_tasks")
+def archive_tasks(job, days=None):
+    # Moved tasks leave the queryset, so each attempt starts from zero.
+    report_progress(job, 0, archive.archivable_tasks(days).count())
+    return archive.archive_tasks(
+        days,
+        get_batch_size(),
+        on_batch=lambda moved: report_progress(job, moved),
+    )
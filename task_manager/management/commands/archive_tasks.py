@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager import archive, jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed tasks whose deadline passed more than --days ago "
+        "into the archive tables, then archive finished projects left "
+        "without live tasks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help=(
+                "Age in days past the deadline (default: the "
+                "ARCHIVE_AFTER_DAYS setting, or "
+                f"{archive.ARCHIVE_AFTER_DAYS})."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=archive.BATCH_SIZE
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue the archival for the run_jobs worker.",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] is not None and options["days"] < 0:
+            raise CommandError("--days cannot be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        if options["background"]:
+            job = jobs.enqueue("archive_tasks", days=options["days"])
+            self.stdout.write(self.style.SUCCESS(f"Queued {job}."))
+            return
+
+        result = archive.archive_tasks(
+            options["days"],
+            options["batch_size"],
+            on_batch=lambda moved: self.stdout.write(f"{moved} tasks moved"),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {result['tasks']} tasks and "
+            f"{result['projects']} projects."
+        ))
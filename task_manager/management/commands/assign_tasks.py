@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from task_manager import scheduling
+from task_manager.models import Project, Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign the open, unassigned tasks of each project to the members "
+        "of its teams, balancing their weighted load."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            type=int,
+            action="append",
+            dest="projects",
+            help="Only this project id; may be repeated (default: all).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the planned assignments without saving them.",
+        )
+
+    def handle(self, *args, **options):
+        projects = Project.objects.filter(
+            tasks__in=Task.objects.filter(
+                is_completed=False, assignees__isnull=True
+            )
+        ).distinct().order_by("pk")
+        if options["projects"]:
+            projects = projects.filter(pk__in=options["projects"])
+
+        total = 0
+        for project in projects:
+            result = scheduling.assign_tasks(
+                project, dry_run=options["dry_run"]
+            )
+            total += result["assigned"]
+            self.stdout.write(f"{project}: {result['assigned']} tasks")
+        verb = "Would assign" if options["dry_run"] else "Assigned"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} tasks."))
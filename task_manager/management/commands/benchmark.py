@@ -0,0 +1,89 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from task_manager.benchmark import run_benchmark, run_throughput_benchmark
+from task_manager.models import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every task_manager page through the test client and "
+        "record p50/p95 latency, query count and peak memory as JSON. "
+        "With --clients, measure requests per second under that many "
+        "concurrent clients instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--iterations", type=int, default=10)
+        parser.add_argument(
+            "-c",
+            "--clients",
+            type=int,
+            help="Concurrent clients for a throughput run.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=20,
+            help="Requests per client in a throughput run.",
+        )
+        parser.add_argument(
+            "-o",
+            "--output",
+            help="Write the JSON report to this file instead of stdout.",
+        )
+        parser.add_argument(
+            "--route",
+            action="append",
+            dest="routes",
+            help="Only benchmark this route name; may be repeated.",
+        )
+        parser.add_argument(
+            "--user",
+            help="Username to log in as (default: the busiest worker).",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        if options["clients"] is not None and (
+            options["clients"] < 1 or options["requests"] < 1
+        ):
+            raise CommandError(
+                "--clients and --requests must be at least 1."
+            )
+
+        # Lets the test client's host through ALLOWED_HOSTS.
+        setup_test_environment()
+        try:
+            if options["clients"]:
+                report = run_throughput_benchmark(
+                    options["clients"],
+                    options["requests"],
+                    options["routes"],
+                    options["user"],
+                )
+            else:
+                report = run_benchmark(
+                    options["iterations"], options["routes"], options["user"]
+                )
+        except Worker.DoesNotExist as error:
+            raise CommandError(error)
+        finally:
+            teardown_test_environment()
+
+        content = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(content + "\n")
+            self.stderr.write(
+                f"{len(report['routes'])} routes written to "
+                f"{options['output']}"
+            )
+        else:
+            self.stdout.write(content)
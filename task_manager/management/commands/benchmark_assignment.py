@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.benchmark import run_assignment_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the automatic assignment of --tasks new tasks over a team of "
+        "--workers in a scratch project, in dry-run and write mode, and "
+        "report timings and the load spread as JSON.  Nothing is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=10000)
+        parser.add_argument("--workers", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["tasks"] < 1 or options["workers"] < 1:
+            raise CommandError("--tasks and --workers must be at least 1.")
+
+        report = run_assignment_benchmark(
+            options["tasks"], options["workers"], options["seed"]
+        )
+        self.stdout.write(json.dumps(report, indent=2))
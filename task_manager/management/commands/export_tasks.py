@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from task_manager.transfer import (
+    DEFAULT_BATCH_SIZE,
+    FORMATS,
+    guess_format,
+    iter_export,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream every task, with its tags and assignees, as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-o", "--output",
+            help="File to write to (default: stdout).",
+        )
+        parser.add_argument(
+            "-f", "--format",
+            choices=FORMATS,
+            help="Output format (default: from the file name, else csv).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Rows fetched from the database per round trip.",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        file_format = options["format"] or guess_format(output or "")
+        lines = iter_export(file_format, options["chunk_size"])
+
+        if output is None:
+            sys.stdout.writelines(lines)
+            return
+        with open(output, "w", encoding="utf-8", newline="") as stream:
+            stream.writelines(lines)
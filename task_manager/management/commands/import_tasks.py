@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.transfer import (
+    DEFAULT_BATCH_SIZE,
+    FORMATS,
+    guess_format,
+    import_tasks,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import tasks from a CSV or NDJSON file produced by "
+        "export_tasks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file to import.")
+        parser.add_argument(
+            "-f", "--format",
+            choices=FORMATS,
+            help="Input format (default: from the file name, else csv).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Rows inserted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or guess_format(path)
+        try:
+            with open(path, "rb") as stream:
+                result = import_tasks(
+                    stream, file_format, options["batch_size"]
+                )
+        except (OSError, NotImplementedError) as error:
+            raise CommandError(error)
+
+        for error in result.errors:
+            self.stderr.write(error)
+        if result.unknown_assignees:
+            self.stderr.write(
+                "Unknown assignees (skipped): "
+                + ", ".join(sorted(result.unknown_assignees))
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} tasks, skipped {result.skipped}."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from task_manager.stats import rebuild_dashboard_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the stored dashboard counters and per-project task/team "
+        "counts from scratch."
+    )
+
+    def handle(self, *args, **options):
+        counters = rebuild_dashboard_stats()
+        for name, value in counters.items():
+            self.stdout.write(f"{name}: {value}")
+        self.stdout.write(self.style.SUCCESS("Dashboard stats rebuilt."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from task_manager.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of tasks, projects and workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Rows loaded per query while indexing.",
+        )
+
+    def handle(self, *args, **options):
+        counts = rebuild_index(chunk_size=options["chunk_size"])
+        for kind, total in counts.items():
+            self.stdout.write(f"{kind}: {total} documents indexed")
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
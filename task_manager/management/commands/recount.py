@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager import jobs
+from task_manager.stats import COUNT_COLUMNS, recount
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized *_count columns on tasks, workers, "
+        "teams and projects to repair any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            metavar="model",
+            help=(
+                "Limit the recount to these models "
+                "(task, worker, team, project)."
+            ),
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help=(
+                "Queue the recount for the run_jobs worker, which works in "
+                "batches and also rebuilds the dashboard counters."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        by_name = {model._meta.model_name: model for model in COUNT_COLUMNS}
+        models = []
+        for name in options["models"]:
+            if name.lower() not in by_name:
+                raise CommandError(
+                    f"Unknown model {name!r}; "
+                    f"choose from {', '.join(sorted(by_name))}."
+                )
+            models.append(by_name[name.lower()])
+
+        if options["background"]:
+            job = jobs.enqueue(
+                "recount", models=[model._meta.label for model in models]
+            )
+            self.stdout.write(self.style.SUCCESS(f"Queued {job}."))
+            return
+
+        for label, rows in recount(models).items():
+            self.stdout.write(f"{label}: {rows} rows recounted")
+        self.stdout.write(self.style.SUCCESS("Counters recounted."))
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs (large deletions, imports, counter "
+        "rebuilds), polling the queue until stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling.",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            help="Exit after running this many jobs.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls of an empty queue.",
+        )
+
+    def handle(self, *args, **options):
+        if options["max_jobs"] is not None and options["max_jobs"] < 1:
+            raise CommandError("--max-jobs must be at least 1.")
+
+        worker_id = jobs.get_worker_id()
+        remaining = options["max_jobs"]
+        self.stdout.write(f"Worker {worker_id} started.")
+        try:
+            while remaining is None or remaining > 0:
+                job = jobs.claim(worker_id)
+                if job is None:
+                    if options["burst"]:
+                        break
+                    time.sleep(options["sleep"])
+                    continue
+                self.report(jobs.run_job(job))
+                if remaining is not None:
+                    remaining -= 1
+        except KeyboardInterrupt:
+            self.stdout.write("Interrupted.")
+
+    def report(self, job):
+        line = f"{job}: {job.progress}/{job.total or job.progress}"
+        if job.status == "DONE":
+            self.stdout.write(self.style.SUCCESS(line))
+        elif job.status == "QUEUED":
+            self.stdout.write(self.style.WARNING(
+                f"{line}, retrying after {job.run_after:%H:%M:%S}"
+            ))
+        else:
+            self.stdout.write(self.style.ERROR(f"{line}\n{job.error}"))
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic workers, teams, projects, tasks and tags with "
+        "bulk inserts, for load testing and benchmarks."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ("workers", 100),
+            ("teams", 10),
+            ("projects", 20),
+            ("tasks", 1000),
+            ("tags", 30),
+        ):
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                default=default,
+                help=f"Number of {name} to create (default {default}).",
+            )
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.0,
+            help=(
+                "Zipf exponent for spreading tasks and memberships; 0 is "
+                "uniform, higher concentrates work on fewer rows."
+            ),
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Random seed, for reproducible data sets.",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        counts = {
+            name: options[name]
+            for name in ("workers", "teams", "projects", "tasks", "tags")
+        }
+        if any(value < 0 for value in counts.values()):
+            raise CommandError("Row counts must not be negative.")
+        if options["skew"] < 0:
+            raise CommandError("--skew must not be negative.")
+
+        created = seed(
+            **counts,
+            skew=options["skew"],
+            random_seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+        for name, total in created.items():
+            self.stdout.write(f"{name}: {total} created")
+        self.stdout.write(self.style.SUCCESS("Seed data generated."))
@@ -0,0 +1,42 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.sqlite import run_write_stress
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent read-then-write transactions against scratch SQLite "
+        "databases set up with the default and the tuned settings, and "
+        "report lock errors of each as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--transactions",
+            type=int,
+            default=25,
+            help="Transactions per thread.",
+        )
+
+    def handle(self, *args, **options):
+        if options["threads"] < 1 or options["transactions"] < 1:
+            raise CommandError(
+                "--threads and --transactions must be at least 1."
+            )
+
+        engine = {"ENGINE": "django.db.backends.sqlite3"}
+        profiles = {
+            "default": engine,
+            "tuned": {**engine, **settings.SQLITE_TUNED_PROFILE},
+        }
+        report = {
+            name: run_write_stress(
+                profile, options["threads"], options["transactions"]
+            )
+            for name, profile in profiles.items()
+        }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0003_remove_project_tasks_task_project'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='status',
+            field=models.CharField(choices=[('IN_PROCESS', 'in process'), ('DONE', 'done'), ('PAUSED', 'paused'), ('CANCELED', 'canceled')], default='IN_PROCESS', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='project',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tasks', to='task_manager.project'),
+        ),
+    ]
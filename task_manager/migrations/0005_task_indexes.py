@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0004_project_description_project_status_tag_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='project',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tasks', to='task_manager.project'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status'], name='project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['name', 'id'], name='project_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['deadline', 'id'], name='task_open_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['deadline', 'id'], name='task_deadline_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'is_completed'], name='task_project_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['name', 'id'], name='team_name_id_idx'),
+        ),
+        # The auto-created M2M table only has a (task_id, worker_id) unique
+        # index, which does not help "tasks assigned to this worker".
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX "task_assignees_worker_task_idx" '
+                'ON "task_manager_task_assignees" ("worker_id", "task_id");'
+            ),
+            reverse_sql='DROP INDEX "task_assignees_worker_task_idx";',
+        ),
+    ]
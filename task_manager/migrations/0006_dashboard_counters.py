@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:34
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset):
+    return Coalesce(
+        Subquery(
+            queryset.filter(project=OuterRef("pk"))
+            .order_by()
+            .values("project")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def populate_counters(apps, schema_editor):
+    Project = apps.get_model("task_manager", "Project")
+    Task = apps.get_model("task_manager", "Task")
+    Team = apps.get_model("task_manager", "Team")
+    Worker = apps.get_model("task_manager", "Worker")
+    DashboardCounter = apps.get_model("task_manager", "DashboardCounter")
+
+    Project.objects.update(
+        task_count=count_subquery(Task.objects.all()),
+        team_count=count_subquery(Project.teams.through.objects.all()),
+    )
+    DashboardCounter.objects.bulk_create([
+        DashboardCounter(
+            name="tasks_in_process",
+            value=Task.objects.filter(is_completed=False).count(),
+        ),
+        DashboardCounter(
+            name="active_projects",
+            value=Project.objects.filter(status="IN_PROCESS").count(),
+        ),
+        DashboardCounter(name="workers", value=Worker.objects.count()),
+        DashboardCounter(name="teams", value=Team.objects.count()),
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0005_task_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='team_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
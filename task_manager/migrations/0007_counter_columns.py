@@ -0,0 +1,106 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:36
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def populate_counts(apps, schema_editor):
+    Project = apps.get_model("task_manager", "Project")
+    Task = apps.get_model("task_manager", "Task")
+    Team = apps.get_model("task_manager", "Team")
+    Worker = apps.get_model("task_manager", "Worker")
+    assignments = Task.assignees.through.objects.all()
+    memberships = Team.workers.through.objects.all()
+    project_teams = Project.teams.through.objects.all()
+
+    Task.objects.update(
+        assignee_count=count_subquery(assignments, "task"),
+        tag_count=count_subquery(Task.tags.through.objects.all(), "task"),
+    )
+    Worker.objects.update(
+        task_count=count_subquery(assignments, "worker"),
+        open_task_count=count_subquery(
+            assignments.filter(task__is_completed=False), "worker"
+        ),
+        team_count=count_subquery(memberships, "worker"),
+        led_team_count=count_subquery(Team.objects.all(), "team_lead"),
+    )
+    Team.objects.update(
+        worker_count=count_subquery(memberships, "team"),
+        project_count=count_subquery(project_teams, "team"),
+    )
+    Project.objects.update(
+        open_task_count=count_subquery(
+            Task.objects.filter(is_completed=False), "project"
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0006_dashboard_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='open_task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='assignee_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='tag_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='project_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='worker_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='worker',
+            name='led_team_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='worker',
+            name='open_task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='worker',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='worker',
+            name='team_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
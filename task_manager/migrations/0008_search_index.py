@@ -0,0 +1,102 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:44
+
+import re
+
+from django.db import migrations, models
+
+
+FTS_TABLE = "task_manager_search_fts"
+KIND_CODES = {"task": 1, "project": 2, "worker": 3}
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        f"title, body, tokenize='unicode61 remove_diacritics 2', "
+        f"prefix='2 3')"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def _join(*parts):
+    return " ".join(str(part) for part in parts if part)
+
+
+def build_documents(apps):
+    Project = apps.get_model("task_manager", "Project")
+    Task = apps.get_model("task_manager", "Task")
+    Worker = apps.get_model("task_manager", "Worker")
+
+    for task in Task.objects.prefetch_related("tags", "assignees"):
+        yield "task", task.pk, task.name, _join(
+            task.description,
+            *(tag.name for tag in task.tags.all()),
+            *(_join(w.username, w.first_name, w.last_name)
+              for w in task.assignees.all()),
+        )
+    for project in Project.objects.prefetch_related("teams"):
+        yield "project", project.pk, project.name, _join(
+            project.description, *(team.name for team in project.teams.all())
+        )
+    for worker in Worker.objects.select_related("position"):
+        yield "worker", worker.pk, _join(
+            worker.first_name, worker.last_name, worker.username
+        ), _join(worker.email, worker.position and worker.position.name)
+
+
+def populate_index(apps, schema_editor):
+    documents = build_documents(apps)
+    if schema_editor.connection.vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, body) "
+                f"VALUES (%s, %s, %s)",
+                [
+                    (object_id * 8 + KIND_CODES[kind], title, body)
+                    for kind, object_id, title, body in documents
+                ],
+            )
+        return
+    SearchDocument = apps.get_model("task_manager", "SearchDocument")
+    SearchDocument.objects.bulk_create([
+        SearchDocument(
+            kind=kind,
+            object_id=object_id,
+            title=title[:255],
+            body=" {} ".format(
+                " ".join(re.findall(r"\w+", f"{title} {body}".lower()))
+            ),
+        )
+        for kind, object_id, title, body in documents
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0007_counter_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=16)),
+                ('object_id', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='search_document_unique')],
+            },
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+        migrations.RunPython(populate_index, migrations.RunPython.noop),
+    ]
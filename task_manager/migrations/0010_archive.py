@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0009_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('deadline', models.DateField()),
+                ('priority', models.CharField(choices=[('CRITICAL', 'Urgent'), ('HIGH', 'High'), ('MEDIUM', 'Medium'), ('LOW', 'Low')], max_length=255)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('assignees', models.ManyToManyField(related_name='archived_tasks', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_tasks', to='task_manager.project')),
+                ('tags', models.ManyToManyField(related_name='archived_tasks', to='task_manager.tag')),
+                ('task_type', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_tasks', to='task_manager.tasktype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['deadline', 'id'], name='archived_task_deadline_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0010_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityCounter',
+            fields=[
+                ('key', models.CharField(max_length=128, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
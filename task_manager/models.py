@@ -1,8 +1,34 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from it_company import settings
 
 
+class CounterFieldsMixin(models.Model):
+    """
+    Keeps plain ``save()`` calls from overwriting maintained counters.
+
+    Counter columns are updated in SQL by ``task_manager.stats``, so the
+    in-memory copy is usually stale; saving an existing row only writes
+    the other fields.
+    """
+
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
 class Tag(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -25,13 +51,24 @@ class Position(models.Model):
         return self.name
 
 
-class Worker(AbstractUser):
+class Worker(CounterFieldsMixin, AbstractUser):
+    counter_fields = (
+        "task_count", "open_task_count", "team_count", "led_team_count"
+    )
+
     position = models.ForeignKey(
         Position,
         on_delete=models.SET_NULL,
         null=True,
         related_name="workers"
     )
+    # Maintained by task_manager.stats; see the recount command.
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    open_task_count = models.PositiveIntegerField(default=0, editable=False)
+    team_count = models.PositiveIntegerField(default=0, editable=False)
+    led_team_count = models.PositiveIntegerField(default=0, editable=False)
+    # Moves with anything the detail page shows; see task_manager.freshness.
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -41,7 +78,9 @@ class Worker(AbstractUser):
         verbose_name = "worker"
         verbose_name_plural = "workers"
 
-class Team(models.Model):
+class Team(CounterFieldsMixin, models.Model):
+    counter_fields = ("worker_count", "project_count")
+
     name = models.CharField(max_length=255)
     team_lead = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -50,12 +89,31 @@ class Team(models.Model):
         null=True
     )
     workers = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name="teams")
+    # Maintained by task_manager.stats; see the recount command.
+    worker_count = models.PositiveIntegerField(default=0, editable=False)
+    project_count = models.PositiveIntegerField(default=0, editable=False)
+    # Moves with anything the detail page shows; see task_manager.freshness.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["name", "id"], name="team_name_id_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Project(models.Model):
+class LiveProjectManager(models.Manager):
+    """Projects that have not been archived by ``task_manager.archive``."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(archived_at__isnull=True)
+
+
+class Project(CounterFieldsMixin, models.Model):
+    counter_fields = ("task_count", "open_task_count", "team_count")
+
     STATUS_CHOICES = (
         ("IN_PROCESS", "in process"),
         ("DONE", "done"),
@@ -67,12 +125,29 @@ class Project(models.Model):
     budget = models.IntegerField()
     description = models.TextField(blank=True)
     status = models.CharField(max_length=255 ,choices=STATUS_CHOICES, default="IN_PROCESS")
+    # Maintained by task_manager.stats; see the recount command.
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    open_task_count = models.PositiveIntegerField(default=0, editable=False)
+    team_count = models.PositiveIntegerField(default=0, editable=False)
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Moves with anything the detail page shows; see task_manager.freshness.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = LiveProjectManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status"], name="project_status_idx"),
+            models.Index(fields=["name", "id"], name="project_name_id_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Task(models.Model):
+class Task(CounterFieldsMixin, models.Model):
+    counter_fields = ("assignee_count", "tag_count")
 
     PRIORITY_CHOICES = (
         ("CRITICAL", "Urgent"),
@@ -93,4 +168,176 @@ class Task(models.Model):
     task_type = models.ForeignKey(TaskType, on_delete=models.CASCADE, related_name="tasks")
     assignees = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name="tasks")
     tags = models.ManyToManyField(Tag, related_name="tasks")
-    project = models.ForeignKey(Project, on_delete=models.SET_NULL, null=True, blank=True, related_name="tasks")
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="tasks",
+        # Covered by the (project, is_completed) index below.
+        db_index=False,
+    )
+    # Maintained by task_manager.stats; see the recount command.
+    assignee_count = models.PositiveIntegerField(default=0, editable=False)
+    tag_count = models.PositiveIntegerField(default=0, editable=False)
+    # Moves with anything the detail page shows; see task_manager.freshness.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Open tasks by deadline: sidebar, dashboard counter, worker pages.
+            models.Index(
+                fields=["deadline", "id"],
+                condition=models.Q(is_completed=False),
+                name="task_open_deadline_idx",
+            ),
+            # Keyset pagination order of the task list.
+            models.Index(
+                fields=["deadline", "id"], name="task_deadline_id_idx"
+            ),
+            models.Index(
+                fields=["project", "is_completed"],
+                name="task_project_completed_idx",
+            ),
+        ]
+
+
+class DashboardCounter(models.Model):
+    """A named, incrementally maintained dashboard total."""
+
+    name = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}={self.value}"
+
+
+class ActivityCounter(models.Model):
+    """A named hit count, written in batches by ``task_manager.activity``."""
+
+    key = models.CharField(max_length=128, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.key}={self.value}"
+
+
+class SearchDocument(models.Model):
+    """
+    Flattened text of a task, project or worker for full-text search.
+
+    Used by the portable search backend; SQLite keeps the same documents
+    in an FTS5 table instead.
+    """
+
+    kind = models.CharField(max_length=16)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"], name="search_document_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work, run by the ``run_jobs`` command.
+
+    ``name`` picks the handler registered in ``task_manager.jobs`` and
+    ``payload`` holds its keyword arguments.
+    """
+
+    STATUS_CHOICES = (
+        ("QUEUED", "queued"),
+        ("RUNNING", "running"),
+        ("DONE", "done"),
+        ("FAILED", "failed"),
+    )
+    name = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default="QUEUED"
+    )
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "run_after"], name="job_status_run_after_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    def as_dict(self):
+        return {
+            "id": self.pk,
+            "name": self.name,
+            "status": self.status,
+            "progress": self.progress,
+            "total": self.total,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error.splitlines()[-1] if self.error else "",
+        }
+
+
+class ArchivedTask(models.Model):
+    """
+    A completed task moved out of ``Task`` by ``task_manager.archive``.
+
+    It keeps the primary key it had as a task; the assignee and tag links
+    move to this model's own through tables.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=255)
+    description = models.TextField()
+    deadline = models.DateField()
+    priority = models.CharField(max_length=255, choices=Task.PRIORITY_CHOICES)
+    task_type = models.ForeignKey(
+        TaskType,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="archived_tasks",
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="archived_tasks",
+    )
+    assignees = models.ManyToManyField(
+        settings.AUTH_USER_MODEL, related_name="archived_tasks"
+    )
+    tags = models.ManyToManyField(Tag, related_name="archived_tasks")
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["deadline", "id"], name="archived_task_deadline_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,171 @@
+import base64
+import binascii
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated list.
+
+    Exposes the parts of ``django.core.paginator.Page`` the templates use,
+    plus opaque ``next_cursor`` / ``previous_cursor`` tokens.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over a stable, unique ordering.
+
+    ``ordering`` is a tuple of field names, optionally ``-`` prefixed for
+    descending order, ending in a unique one (usually ``pk``).  Each page
+    is fetched with a ``WHERE (a, b) > (x, y)`` range condition instead of
+    ``OFFSET``, so the cost of a page does not depend on how deep into the
+    list it is.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = int(per_page)
+        self.names = [name.lstrip("-") for name in self.ordering]
+        self.descending = [name.startswith("-") for name in self.ordering]
+        self.fields = [self._get_field(name) for name in self.names]
+
+    def _get_field(self, name):
+        opts = self.queryset.model._meta
+        return opts.pk if name == "pk" else opts.get_field(name)
+
+    def encode_cursor(self, obj, direction):
+        # Rows may be model instances or ``values()`` dicts keyed by attname.
+        if isinstance(obj, dict):
+            values = [obj[field.attname] for field in self.fields]
+        else:
+            values = [getattr(obj, field.attname) for field in self.fields]
+        raw = json.dumps([direction, values], cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(padded))
+            if direction not in ("next", "prev"):
+                raise ValueError
+            if len(values) != len(self.fields):
+                raise ValueError
+            values = [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (
+            binascii.Error, UnicodeDecodeError, ValueError, TypeError,
+            ValidationError,
+        ):
+            raise Http404("Invalid cursor")
+        return direction, values
+
+    def _after(self, values, reverse=False):
+        condition = Q()
+        for i, name in enumerate(self.names):
+            lookup = "lt" if self.descending[i] != reverse else "gt"
+            term = Q(**{f"{name}__{lookup}": values[i]})
+            for prev_name, prev_value in zip(self.names[:i], values[:i]):
+                term &= Q(**{prev_name: prev_value})
+            condition |= term
+        return condition
+
+    def _page_query(self, cursor):
+        direction, values = (
+            self.decode_cursor(cursor) if cursor else ("next", None)
+        )
+        backwards = direction == "prev"
+
+        ordering = self.ordering
+        if backwards:
+            ordering = tuple(
+                name if desc else f"-{name}"
+                for name, desc in zip(self.names, self.descending)
+            )
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(values, reverse=backwards))
+
+        # One extra row tells us whether there is anything beyond this page.
+        return queryset[:self.per_page + 1], values, backwards
+
+    def _make_page(self, rows, values, backwards):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or backwards:
+                next_cursor = self.encode_cursor(rows[-1], "next")
+            came_forward = values is not None and not backwards
+            if (has_more and backwards) or came_forward:
+                previous_cursor = self.encode_cursor(rows[0], "prev")
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+    def page(self, cursor=None):
+        queryset, values, backwards = self._page_query(cursor)
+        return self._make_page(list(queryset), values, backwards)
+
+    async def apage(self, cursor=None):
+        queryset, values, backwards = self._page_query(cursor)
+        rows = [row async for row in queryset]
+        return self._make_page(rows, values, backwards)
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin that swaps offset pagination for keyset pagination.
+
+    Prefetches declared in ``get_queryset`` only run for the rows of the
+    current page, since the page is sliced before it is evaluated.
+    """
+
+    paginate_by = 25
+    keyset_ordering = ("pk",)
+    cursor_kwarg = "cursor"
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def get_cursor(self):
+        return (
+            self.kwargs.get(self.cursor_kwarg)
+            or self.request.GET.get(self.cursor_kwarg)
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(
+            queryset, self.get_keyset_ordering(), page_size
+        )
+        page = paginator.page(self.get_cursor())
+        return paginator, page, page.object_list, page.has_other_pages()
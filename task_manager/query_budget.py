@@ -0,0 +1,176 @@
+"""
+Per-request query budgets and N+1 detection.
+
+``QueryRecorder`` hooks ``execute_wrapper`` on every database alias, so
+it works with ``DEBUG`` off and without the debug toolbar, and counts the
+queries routed to read replicas too.  ``QueryBudgetMiddleware``
+records every request to a named URL and logs a one-line report, warning
+when a view exceeds its budget in ``QUERY_BUDGETS`` or repeats the same
+statement ``N_PLUS_ONE_THRESHOLD`` times or more.  Tests use
+``QueryBudgetTestMixin`` to enforce the same budgets.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger("task_manager.queries")
+
+# Maximum queries per request, by URL name.  Counts include the session
+# and user lookups every authenticated request makes.
+QUERY_BUDGETS = {
+    # Both include reading the workload snapshot and queuing its refresh.
+    "task_manager:index": 13,
+    "task_manager:workload": 5,
+    "task_manager:task-list": 5,
+    "task_manager:task-detail": 7,
+    "task_manager:task-create": 6,
+    "task_manager:task-update": 9,
+    "task_manager:team-list": 6,
+    "task_manager:team-detail": 6,
+    "task_manager:team-create": 5,
+    "task_manager:team-update": 6,
+    "task_manager:worker-list": 7,
+    "task_manager:worker-detail": 9,
+    "task_manager:worker-tasks": 5,
+    "task_manager:project-list": 5,
+    "task_manager:project-detail": 8,
+    "task_manager:tag-list": 4,
+    "task_manager:task-type-list": 4,
+    "task_manager:position-list": 4,
+    "task_manager:search": 8,
+    "task_manager:lookup": 4,
+}
+DEFAULT_BUDGET = 20
+N_PLUS_ONE_THRESHOLD = 5
+
+_LITERALS_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|\?")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\?, )*\?\)")
+
+
+def fingerprint(sql: str) -> str:
+    """Return ``sql`` with literals and parameters collapsed to ``?``."""
+    sql = _LITERALS_RE.sub("?", sql)
+    return _IN_LIST_RE.sub("IN (...)", sql)
+
+
+class QueryRecorder:
+    """
+    Collects ``(sql, seconds)`` for every statement run while active, on
+    the ``using`` alias or, by default, on all of them.
+    """
+
+    def __init__(self, using=None):
+        self.using = using
+        self.queries = []
+        self.aliases = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+            self.aliases[context["connection"].alias] += 1
+
+    def __enter__(self):
+        self._wrappers = ExitStack()
+        for alias in [self.using] if self.using else connections:
+            self._wrappers.enter_context(
+                connections[alias].execute_wrapper(self)
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrappers.__exit__(*exc_info)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def duration(self) -> float:
+        return sum(seconds for _, seconds in self.queries)
+
+    def repeated(self, threshold=2) -> dict:
+        """Fingerprints run at least ``threshold`` times, with their count."""
+        counts = Counter(fingerprint(sql) for sql, _ in self.queries)
+        return {sql: n for sql, n in counts.items() if n >= threshold}
+
+    def report(self, name) -> str:
+        repeated = self.repeated()
+        line = (
+            f"{name}: {self.count} queries in {self.duration * 1000:.1f} ms, "
+            f"{sum(repeated.values()) - len(repeated)} duplicated"
+        )
+        if len(self.aliases) > 1:
+            line += " (" + ", ".join(
+                f"{alias} {n}" for alias, n in sorted(self.aliases.items())
+            ) + ")"
+        for sql, n in sorted(repeated.items(), key=lambda item: -item[1]):
+            line += f"\n  {n}x {sql[:200]}"
+        return line
+
+
+def get_budget(name) -> int:
+    budgets = getattr(settings, "QUERY_BUDGETS", QUERY_BUDGETS)
+    return budgets.get(name, DEFAULT_BUDGET)
+
+
+class QueryBudgetMiddleware:
+    """
+    Log query count, duplicates and DB time of every named view.
+
+    Enabled by the ``QUERY_BUDGET_ENABLED`` setting (``DEBUG`` by default);
+    otherwise the middleware is a no-op.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(
+            settings, "QUERY_BUDGET_ENABLED", settings.DEBUG
+        )
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        if match is None or not match.url_name:
+            return response
+        name = match.view_name
+        healthy = recorder.count <= get_budget(name) and not (
+            recorder.repeated(N_PLUS_ONE_THRESHOLD)
+        )
+        logger.log(
+            logging.DEBUG if healthy else logging.WARNING,
+            recorder.report(name),
+        )
+        response["X-Query-Count"] = str(recorder.count)
+        response["X-Query-Time-Ms"] = f"{recorder.duration * 1000:.1f}"
+        return response
+
+
+class QueryBudgetTestMixin:
+    """``TestCase`` mixin enforcing ``QUERY_BUDGETS`` on views."""
+
+    @contextmanager
+    def assertQueryBudget(self, name, budget=None):
+        budget = get_budget(name) if budget is None else budget
+        with QueryRecorder() as recorder:
+            yield recorder
+        n_plus_one = recorder.repeated(N_PLUS_ONE_THRESHOLD)
+        if recorder.count > budget or n_plus_one:
+            self.fail(
+                f"Query budget of {budget} exceeded or N+1 pattern found.\n"
+                + recorder.report(name)
+            )
@@ -0,0 +1,140 @@
+"""
+Read-replica routing.
+
+``ReplicaRouter`` sends reads of ``task_manager`` models to one of the
+``DATABASE_REPLICAS`` aliases, but only while a read-only view is running:
+``ReplicaRoutingMiddleware`` enables it for ``ListView`` and ``DetailView``
+subclasses and for views marked with ``replica_reads``.  Everything else,
+including sessions, permissions and every write, stays on ``default``.
+
+After a user's successful POST (or other unsafe request) a cookie pins
+their reads to the primary for ``REPLICA_PIN_SECONDS``, so they see their
+own writes while the replicas catch up.
+"""
+
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.views import generic
+
+
+REPLICATED_APPS = {"task_manager"}
+PIN_COOKIE = "primary_reads"
+# Seconds reads stay on the primary after a user's write.
+REPLICA_PIN_SECONDS = 10
+# Lifetime of cache entries filled from a replica, which may lag behind.
+REPLICA_CACHE_TIMEOUT = 60
+
+_use_replica = ContextVar("use_replica", default=None)
+
+
+def replica_reads(view):
+    """Mark a function view as read-only, so it may read from replicas."""
+    view.replica_reads = True
+    return view
+
+
+def is_read_only(view) -> bool:
+    view_class = getattr(view, "view_class", None)
+    if view_class is None:
+        return getattr(view, "replica_reads", False)
+    return getattr(
+        view_class,
+        "replica_reads",
+        issubclass(view_class, (generic.ListView, generic.DetailView)),
+    )
+
+
+def get_replicas() -> list:
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+def reading_from_replica() -> bool:
+    state = _use_replica.get()
+    return bool(state and state["enabled"] and get_replicas())
+
+
+def get_pin_seconds() -> int:
+    return getattr(settings, "REPLICA_PIN_SECONDS", REPLICA_PIN_SECONDS)
+
+
+def get_replica_cache_timeout(timeout):
+    """``timeout``, capped while the request reads from a replica."""
+    if not reading_from_replica():
+        return timeout
+    return min(
+        timeout,
+        getattr(settings, "REPLICA_CACHE_TIMEOUT", REPLICA_CACHE_TIMEOUT),
+    )
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in REPLICATED_APPS:
+            return DEFAULT_DB_ALIAS
+        if reading_from_replica():
+            return random.choice(get_replicas())
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Enable replica reads for read-only views of unpinned users."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _use_replica.set({"enabled": False})
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        token = _use_replica.set({"enabled": False})
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.pin(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # A mutable state object, so the change survives sync_to_async.
+        _use_replica.get()["enabled"] = (
+            request.method in ("GET", "HEAD")
+            and PIN_COOKIE not in request.COOKIES
+            and is_read_only(view_func)
+        )
+
+    def pin(self, request, response):
+        if request.method not in ("GET", "HEAD", "OPTIONS", "TRACE") and (
+            response.status_code < 400
+        ):
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=get_pin_seconds(),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
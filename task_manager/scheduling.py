@@ -0,0 +1,111 @@
+"""
+Automatic assignment of a project's unassigned tasks.
+
+``plan_assignments`` spreads the open, unassigned tasks of a project over
+the members of the project's teams with a greedy pass: tasks are taken by
+deadline, the heavier priority first on the same day, and each goes to
+the member with the least weighted load at that moment.  Members sit in a
+heap keyed on their load, which is updated as tasks are handed out, so a
+batch costs O(tasks * log members).  Loads start from the open tasks the
+members already have, weighted as in ``task_manager.workload``.
+
+``assign_tasks`` writes a plan in one transaction with set-based inserts
+and settles counters, caches and search documents itself, as
+``task_manager.bulk_actions`` does; with ``dry_run`` it only returns it.
+"""
+
+import heapq
+from collections import defaultdict
+
+from django.db import transaction
+
+from task_manager import search, stats
+from task_manager.caching import invalidate_pending_tasks
+from task_manager.models import Task, Team, Worker
+from task_manager.workload import priority_weight
+
+
+def get_candidates(project):
+    """Primary keys of the members of ``project``'s teams."""
+    return (
+        Team.workers.through.objects.filter(team__projects=project)
+        .values_list("worker_id", flat=True)
+        .distinct()
+    )
+
+
+def get_unassigned_tasks(project, task_ids=None):
+    tasks = Task.objects.filter(
+        project=project, is_completed=False, assignees__isnull=True
+    )
+    if task_ids is not None:
+        tasks = tasks.filter(pk__in=task_ids)
+    return tasks
+
+
+def get_loads(worker_ids) -> dict:
+    """Weighted open-task load of each worker, shared tasks split evenly."""
+    loads = defaultdict(float)
+    for worker_id, weight, assignees in (
+        Task.assignees.through.objects.filter(
+            worker_id__in=worker_ids, task__is_completed=False
+        ).values_list(
+            "worker_id", priority_weight("task__priority"),
+            "task__assignee_count",
+        )
+    ):
+        loads[worker_id] += weight / max(assignees, 1)
+    return loads
+
+
+def plan_assignments(project, task_ids=None) -> list:
+    """``(task_id, worker_id)`` pairs for the project's unassigned tasks."""
+    workers = list(get_candidates(project))
+    if not workers:
+        return []
+    loads = get_loads(workers)
+    # (load, tasks handed out in this batch, worker): the fewest new
+    # tasks breaks ties, then the lowest pk, so plans are reproducible.
+    heap = [(loads[worker], 0, worker) for worker in workers]
+    heapq.heapify(heap)
+
+    tasks = (
+        get_unassigned_tasks(project, task_ids)
+        .annotate(weight=priority_weight())
+        .order_by("deadline", "-weight", "pk")
+        .values_list("pk", "weight")
+    )
+    plan = []
+    for task_id, task_weight in tasks:
+        load, handed_out, worker = heap[0]
+        plan.append((task_id, worker))
+        heapq.heapreplace(heap, (load + task_weight, handed_out + 1, worker))
+    return plan
+
+
+@transaction.atomic
+def assign_tasks(project, task_ids=None, dry_run=False) -> dict:
+    """
+    Assign the project's unassigned tasks (or those of ``task_ids``) to
+    its team members; with ``dry_run`` nothing is written.
+    """
+    plan = plan_assignments(project, task_ids)
+    if plan and not dry_run:
+        through = Task.assignees.through
+        through.objects.bulk_create(
+            [through(task_id=task, worker_id=worker) for task, worker in plan]
+        )
+        assigned = [task for task, _ in plan]
+        workers = {worker for _, worker in plan}
+        stats.refresh_counts(Task, assigned)
+        stats.refresh_counts(Worker, workers)
+        invalidate_pending_tasks(workers)
+        search.index_objects(Task, assigned)
+    return {
+        "project": project.pk,
+        "dry_run": dry_run,
+        "assigned": len(plan),
+        "assignments": [
+            {"task": task, "worker": worker} for task, worker in plan
+        ],
+    }
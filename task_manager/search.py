@@ -0,0 +1,320 @@
+"""
+Full-text search over tasks, projects and workers.
+
+Each searchable object is flattened into one document (``title`` plus a
+``body`` of descriptions and related names) in a maintained inverted
+index, so a query never joins through the relation tables.  The backend is
+chosen by the ``SEARCH_BACKEND`` setting; by default SQLite databases use
+an FTS5 virtual table and every other database falls back to
+``SimpleSearchBackend``.
+"""
+
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from task_manager.models import Project, SearchDocument, Task, Worker
+
+
+SearchHit = namedtuple("SearchHit", ["kind", "object_id", "title", "rank"])
+
+FTS_TABLE = "task_manager_search_fts"
+MAX_RESULTS = 50
+MAX_TERMS = 10
+# Rows per ``pk__in`` query when re-indexing, well under SQLite's limit on
+# query parameters.
+INDEX_BATCH_SIZE = 500
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def terms(text: str, limit=None) -> list:
+    return _TERM_RE.findall(text.lower())[:limit]
+
+
+# Documents
+
+
+def _join(*parts) -> str:
+    return " ".join(str(part) for part in parts if part)
+
+
+def task_document(task) -> tuple:
+    return task.name, _join(
+        task.description,
+        *(tag.name for tag in task.tags.all()),
+        *(
+            _join(worker.username, worker.first_name, worker.last_name)
+            for worker in task.assignees.all()
+        ),
+    )
+
+
+def project_document(project) -> tuple:
+    return project.name, _join(
+        project.description,
+        *(team.name for team in project.teams.all()),
+        *(task.name for task in project.tasks.all()),
+    )
+
+
+def worker_document(worker) -> tuple:
+    return _join(worker.first_name, worker.last_name, worker.username), _join(
+        worker.email,
+        worker.position.name if worker.position_id else "",
+    )
+
+
+DOCUMENTS = {
+    "task": (Task, task_document),
+    "project": (Project, project_document),
+    "worker": (Worker, worker_document),
+}
+KINDS = {model: kind for kind, (model, _) in DOCUMENTS.items()}
+# Relations each document reads, loaded up front when indexing in bulk.
+PREFETCH = {
+    Task: ("tags", "assignees"),
+    Project: ("teams", "tasks"),
+    Worker: (),
+}
+
+
+# Backends
+
+
+class BaseSearchBackend:
+    def index(self, kind, object_id, title, body):
+        raise NotImplementedError
+
+    def remove(self, kind, object_ids):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def search(self, query, kinds=None, limit=MAX_RESULTS) -> list:
+        """Return ranked ``SearchHit`` tuples, best match first."""
+        raise NotImplementedError
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """
+    Inverted index in an FTS5 virtual table, ranked with BM25.
+
+    The table is created by migration 0008 on SQLite databases only.  The
+    kind and object id are packed into the rowid, so replacing or removing
+    a document is a primary-key operation rather than a table scan.
+    """
+
+    KIND_CODES = {"task": 1, "project": 2, "worker": 3}
+    KIND_BITS = 8
+    # bm25() column weights: title, body.
+    WEIGHTS = (10.0, 1.0)
+
+    def rowid(self, kind, object_id) -> int:
+        return object_id * self.KIND_BITS + self.KIND_CODES[kind]
+
+    def index(self, kind, object_id, title, body):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [self.rowid(kind, object_id)],
+            )
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, body) "
+                f"VALUES (%s, %s, %s)",
+                [self.rowid(kind, object_id), title, body],
+            )
+
+    def remove(self, kind, object_ids):
+        rowids = [self.rowid(kind, pk) for pk in object_ids]
+        if not rowids:
+            return
+        placeholders = ", ".join(["%s"] * len(rowids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})",
+                rowids,
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    @staticmethod
+    def match_expression(words) -> str:
+        # Every term must match; the last one as a prefix for type-ahead.
+        quoted = [f'"{word}"' for word in words]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    def search(self, query, kinds=None, limit=MAX_RESULTS):
+        words = terms(query, MAX_TERMS)
+        if not words:
+            return []
+        sql = (
+            f"SELECT rowid, title, bm25({FTS_TABLE}, "
+            f"{', '.join(map(str, self.WEIGHTS))}) AS rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        )
+        params = [self.match_expression(words)]
+        if kinds:
+            codes = [self.KIND_CODES[kind] for kind in kinds]
+            sql += (
+                f" AND rowid %% {self.KIND_BITS} "
+                f"IN ({', '.join(['%s'] * len(codes))})"
+            )
+            params += codes
+        sql += " ORDER BY rank LIMIT %s"
+        params.append(limit)
+        names = {code: kind for kind, code in self.KIND_CODES.items()}
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [
+                SearchHit(
+                    names[rowid % self.KIND_BITS],
+                    rowid // self.KIND_BITS,
+                    title,
+                    rank,
+                )
+                for rowid, title, rank in cursor.fetchall()
+            ]
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """
+    Portable fallback on the ``SearchDocument`` table.
+
+    The body is stored as normalized, space separated terms and every
+    query term must match the start of one of them, so a query still
+    avoids relation joins and duplicate rows.  Title matches rank first.
+    Database-specific backends (e.g. PostgreSQL ``tsvector``) can replace
+    it through ``SEARCH_BACKEND``.
+    """
+
+    def index(self, kind, object_id, title, body):
+        SearchDocument.objects.update_or_create(
+            kind=kind,
+            object_id=object_id,
+            defaults={
+                "title": title[:255],
+                "body": " {} ".format(" ".join(terms(f"{title} {body}"))),
+            },
+        )
+
+    def remove(self, kind, object_ids):
+        SearchDocument.objects.filter(
+            kind=kind, object_id__in=list(object_ids)
+        ).delete()
+
+    def clear(self):
+        SearchDocument.objects.all().delete()
+
+    def search(self, query, kinds=None, limit=MAX_RESULTS):
+        words = terms(query, MAX_TERMS)
+        if not words:
+            return []
+        documents = SearchDocument.objects.all()
+        if kinds:
+            documents = documents.filter(kind__in=kinds)
+        for word in words:
+            documents = documents.filter(body__contains=f" {word}")
+        rows = documents.values_list("kind", "object_id", "title")
+        hits = [
+            SearchHit(kind, object_id, title, rank=-sum(
+                word in title.lower() for word in words
+            ))
+            for kind, object_id, title in rows[:limit * 2]
+        ]
+        return sorted(hits, key=lambda hit: hit.rank)[:limit]
+
+
+_backend = None
+
+
+def get_backend() -> BaseSearchBackend:
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "SEARCH_BACKEND", None)
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == "sqlite":
+            _backend = SQLiteFTS5Backend()
+        else:
+            _backend = SimpleSearchBackend()
+    return _backend
+
+
+# Public API
+
+
+def _documents_queryset(model):
+    queryset = model.objects.prefetch_related(*PREFETCH[model])
+    if model is Worker:
+        queryset = queryset.select_related("position")
+    return queryset
+
+
+def index_object(obj) -> None:
+    kind = KINDS[type(obj)]
+    title, body = DOCUMENTS[kind][1](obj)
+    get_backend().index(kind, obj.pk, title, body)
+
+
+def index_objects(model, pks) -> None:
+    """Re-index the given rows; rows that no longer exist are dropped."""
+    pks = sorted({pk for pk in pks or () if pk is not None})
+    for start in range(0, len(pks), INDEX_BATCH_SIZE):
+        batch = set(pks[start:start + INDEX_BATCH_SIZE])
+        found = set()
+        for obj in _documents_queryset(model).filter(pk__in=batch):
+            index_object(obj)
+            found.add(obj.pk)
+        if batch - found:
+            get_backend().remove(KINDS[model], batch - found)
+
+
+def remove_object(obj) -> None:
+    get_backend().remove(KINDS[type(obj)], [obj.pk])
+
+
+@transaction.atomic
+def rebuild_index(chunk_size=1000) -> dict:
+    """Rebuild the whole index; returns documents indexed per kind."""
+    backend = get_backend()
+    backend.clear()
+    counts = {}
+    for kind, (model, _) in DOCUMENTS.items():
+        counts[kind] = 0
+        queryset = _documents_queryset(model).order_by("pk")
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            index_object(obj)
+            counts[kind] += 1
+    return counts
+
+
+def search(query, kinds=None, limit=MAX_RESULTS) -> list:
+    """
+    Return ``(hit, object)`` pairs in rank order.
+
+    Objects are fetched with one ``in_bulk`` query per kind.
+    """
+    hits = get_backend().search(query, kinds, limit)
+    objects = {}
+    for kind in {hit.kind for hit in hits}:
+        model = DOCUMENTS[kind][0]
+        objects[kind] = model.objects.in_bulk(
+            [hit.object_id for hit in hits if hit.kind == kind]
+        )
+    return [
+        (hit, objects[hit.kind][hit.object_id])
+        for hit in hits
+        if hit.object_id in objects[hit.kind]
+    ]
+
+
+def search_ids(kind, query, limit=1000) -> list:
+    hits = get_backend().search(query, [kind], limit)
+    return [hit.object_id for hit in hits]
@@ -0,0 +1,177 @@
+"""
+Synthetic data for load testing.
+
+Everything is inserted with ``bulk_create``, so generating tens of
+thousands of rows takes seconds.  ``skew`` shapes how unevenly tasks and
+memberships are spread: related rows are drawn with Zipf-like weights
+``1 / rank ** skew``, so ``0`` is uniform and larger values pile most of
+the work on a few workers, tags and projects, as in real teams.
+"""
+
+import datetime
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from task_manager import search, stats
+from task_manager.models import (
+    Position,
+    Project,
+    Tag,
+    Task,
+    TaskType,
+    Team,
+    Worker,
+)
+from task_manager.transfer import DEFAULT_BATCH_SIZE
+
+
+POSITIONS = ("Developer", "QA", "Designer", "DevOps", "Manager")
+TASK_TYPES = ("Bug", "Feature", "Refactoring", "QA", "Research")
+PROJECT_STATUSES = ("IN_PROCESS", "IN_PROCESS", "DONE", "PAUSED")
+SEED_PASSWORD = "seed12345"
+
+
+def zipf_weights(size, skew):
+    return [1 / (rank ** skew) for rank in range(1, size + 1)]
+
+
+def sample(rng, population, weights, k):
+    """Up to ``k`` distinct items of ``population`` drawn by ``weights``."""
+    k = min(k, len(population))
+    chosen = set()
+    if k <= 0:
+        # Zero workers, teams or tags just leave the links out.
+        return chosen
+    # A handful of draws is enough; heavy skew just yields fewer items.
+    for item in rng.choices(population, weights, k=k * 3):
+        chosen.add(item)
+        if len(chosen) == k:
+            break
+    return chosen
+
+
+def _bulk_links(through, rows, batch_size):
+    through.objects.bulk_create(
+        [through(**row) for row in rows],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+
+
+@transaction.atomic
+def seed(
+    workers=100,
+    teams=10,
+    projects=20,
+    tasks=1000,
+    tags=30,
+    skew=1.0,
+    random_seed=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+) -> dict:
+    """Insert the requested rows; returns how many of each were created."""
+    rng = random.Random(random_seed)
+    prefix = f"seed{rng.randrange(16 ** 6):06x}"
+    today = datetime.date.today()
+
+    positions = [
+        Position.objects.get_or_create(name=name)[0] for name in POSITIONS
+    ]
+    task_types = [
+        TaskType.objects.get_or_create(name=name)[0] for name in TASK_TYPES
+    ]
+    password = make_password(SEED_PASSWORD)
+
+    created_workers = Worker.objects.bulk_create([
+        Worker(
+            username=f"{prefix}-worker{index}",
+            first_name=f"Worker{index}",
+            last_name=prefix,
+            email=f"worker{index}@{prefix}.example.com",
+            password=password,
+            position=rng.choice(positions),
+        )
+        for index in range(workers)
+    ], batch_size=batch_size)
+    created_tags = Tag.objects.bulk_create([
+        Tag(name=f"{prefix}-tag{index}") for index in range(tags)
+    ], batch_size=batch_size)
+
+    worker_ids = [worker.pk for worker in created_workers]
+    worker_weights = zipf_weights(len(worker_ids), skew)
+    created_teams = Team.objects.bulk_create([
+        Team(
+            name=f"{prefix}-team{index}",
+            team_lead_id=rng.choice(worker_ids) if worker_ids else None,
+        )
+        for index in range(teams)
+    ], batch_size=batch_size)
+    _bulk_links(Team.workers.through, (
+        {"team_id": team.pk, "worker_id": worker_id}
+        for team in created_teams
+        for worker_id in sample(
+            rng, worker_ids, worker_weights, rng.randint(3, 12)
+        )
+    ), batch_size)
+
+    team_ids = [team.pk for team in created_teams]
+    created_projects = Project.objects.bulk_create([
+        Project(
+            name=f"{prefix}-project{index}",
+            budget=rng.randrange(1_000, 1_000_000),
+            status=rng.choice(PROJECT_STATUSES),
+        )
+        for index in range(projects)
+    ], batch_size=batch_size)
+    _bulk_links(Project.teams.through, (
+        {"project_id": project.pk, "team_id": team_id}
+        for project in created_projects
+        for team_id in sample(
+            rng, team_ids, zipf_weights(len(team_ids), skew), 2
+        )
+    ), batch_size)
+
+    project_ids = [project.pk for project in created_projects] + [None]
+    project_weights = zipf_weights(len(project_ids), skew)
+    tag_ids = [tag.pk for tag in created_tags]
+    tag_weights = zipf_weights(len(tag_ids), skew)
+    priorities = [choice for choice, _ in Task.PRIORITY_CHOICES]
+    created_tasks = Task.objects.bulk_create([
+        Task(
+            name=f"{prefix} task {index}",
+            description=f"Synthetic task {index} of {prefix}.",
+            deadline=today + datetime.timedelta(days=rng.randint(-60, 120)),
+            is_completed=rng.random() < 0.4,
+            priority=rng.choice(priorities),
+            task_type=rng.choice(task_types),
+            project_id=rng.choices(project_ids, project_weights)[0],
+        )
+        for index in range(tasks)
+    ], batch_size=batch_size)
+    _bulk_links(Task.assignees.through, (
+        {"task_id": task.pk, "worker_id": worker_id}
+        for task in created_tasks
+        for worker_id in sample(
+            rng, worker_ids, worker_weights, rng.randint(1, 3)
+        )
+    ), batch_size)
+    _bulk_links(Task.tags.through, (
+        {"task_id": task.pk, "tag_id": tag_id}
+        for task in created_tasks
+        for tag_id in sample(rng, tag_ids, tag_weights, rng.randint(0, 3))
+    ), batch_size)
+
+    # bulk_create skips the signal handlers; rebuild what they maintain.
+    stats.recount()
+    stats.rebuild_dashboard_stats()
+    search.rebuild_index()
+
+    return {
+        "workers": len(created_workers),
+        "teams": len(created_teams),
+        "projects": len(created_projects),
+        "tasks": len(created_tasks),
+        "tags": len(created_tags),
+    }
@@ -0,0 +1,587 @@
+from django.contrib.auth.models import Group, Permission
+from django.core.signals import request_finished
+from django.db import DatabaseError
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from task_manager import activity, jobs, search, sqlite, stats
+from task_manager.caching import invalidate_pending_tasks
+from task_manager.freshness import touch
+from task_manager.models import (
+    Position,
+    Project,
+    Tag,
+    Task,
+    TaskType,
+    Team,
+    Worker,
+)
+from task_manager.utils import invalidate_admin_permissions
+
+
+def _assignee_ids(task) -> list:
+    return list(task.assignees.values_list("pk", flat=True))
+
+
+def _remember_previous(instance, *fields):
+    # Snapshot the stored row so post_save can compute deltas.
+    instance._stats_previous = None
+    if instance.pk is not None and not instance._state.adding:
+        instance._stats_previous = (
+            type(instance)._default_manager
+            .filter(pk=instance.pk)
+            .values(*fields)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    # A new task has no assignees yet; they arrive via m2m_changed.
+    if not created:
+        invalidate_pending_tasks(_assignee_ids(instance))
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    # Through rows are gone by post_delete, so collect assignees up front.
+    invalidate_pending_tasks(_assignee_ids(instance))
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def task_assignees_changed(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if reverse:
+        # worker.tasks.add(...) and friends: only this worker is affected.
+        invalidate_pending_tasks([instance.pk])
+    elif action == "pre_clear":
+        invalidate_pending_tasks(_assignee_ids(instance))
+    else:
+        invalidate_pending_tasks(pk_set)
+
+
+# Dashboard counters and denormalized *_count columns
+
+
+def _through_field(through, model) -> str:
+    for field in through._meta.get_fields():
+        if field.many_to_one and field.related_model is model:
+            return field.name
+    raise LookupError(f"{through} has no foreign key to {model}")
+
+
+def _related_ids(through, instance, model) -> list:
+    own = _through_field(through, type(instance))
+    other = _through_field(through, model)
+    return list(
+        through.objects.filter(**{own: instance.pk})
+        .values_list(other, flat=True)
+    )
+
+
+@receiver(pre_save, sender=Task)
+def task_stats_pre_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember_previous(instance, "is_completed", "project_id", "name")
+
+
+@receiver(post_save, sender=Task)
+def task_stats_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_stats_previous", None)
+    if previous is None:
+        stats.increment(
+            stats.TASKS_IN_PROCESS, int(not instance.is_completed)
+        )
+        stats.refresh_counts(Project, [instance.project_id])
+        return
+
+    stats.increment(
+        stats.TASKS_IN_PROCESS,
+        int(previous["is_completed"]) - int(instance.is_completed),
+    )
+    if previous["is_completed"] != instance.is_completed:
+        stats.refresh_counts(Worker, _assignee_ids(instance))
+    if (
+        previous["project_id"] != instance.project_id
+        or previous["is_completed"] != instance.is_completed
+    ):
+        stats.refresh_counts(
+            Project, [previous["project_id"], instance.project_id]
+        )
+
+
+@receiver(pre_delete, sender=Task)
+def task_stats_pre_delete(sender, instance, **kwargs):
+    instance._stats_worker_ids = _assignee_ids(instance)
+
+
+@receiver(post_delete, sender=Task)
+def task_stats_deleted(sender, instance, **kwargs):
+    if not instance.is_completed:
+        stats.increment(stats.TASKS_IN_PROCESS, -1)
+    stats.refresh_counts(Project, [instance.project_id])
+    stats.refresh_counts(Worker, instance._stats_worker_ids)
+
+
+@receiver(pre_save, sender=Project)
+def project_stats_pre_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember_previous(instance, "status")
+
+
+@receiver(post_save, sender=Project)
+def project_stats_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_stats_previous", None)
+    was_active = previous is not None and previous["status"] == "IN_PROCESS"
+    is_active = instance.status == "IN_PROCESS"
+    stats.increment(stats.ACTIVE_PROJECTS, int(is_active) - int(was_active))
+
+
+@receiver(pre_delete, sender=Project)
+def project_stats_pre_delete(sender, instance, **kwargs):
+    instance._stats_team_ids = _related_ids(
+        Project.teams.through, instance, Team
+    )
+
+
+@receiver(post_delete, sender=Project)
+def project_stats_deleted(sender, instance, **kwargs):
+    if instance.status == "IN_PROCESS":
+        stats.increment(stats.ACTIVE_PROJECTS, -1)
+    stats.refresh_counts(Team, instance._stats_team_ids)
+
+
+@receiver(pre_save, sender=Team)
+def team_stats_pre_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember_previous(instance, "team_lead_id")
+
+
+@receiver(post_save, sender=Team)
+def team_stats_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        stats.increment(stats.TEAMS)
+    previous = getattr(instance, "_stats_previous", None)
+    previous_lead = previous["team_lead_id"] if previous else None
+    if previous_lead != instance.team_lead_id:
+        stats.refresh_counts(Worker, [previous_lead, instance.team_lead_id])
+
+
+@receiver(pre_delete, sender=Team)
+def team_stats_pre_delete(sender, instance, **kwargs):
+    instance._stats_project_ids = _related_ids(
+        Project.teams.through, instance, Project
+    )
+    instance._stats_worker_ids = _related_ids(
+        Team.workers.through, instance, Worker
+    )
+
+
+@receiver(post_delete, sender=Team)
+def team_stats_deleted(sender, instance, **kwargs):
+    stats.increment(stats.TEAMS, -1)
+    stats.refresh_counts(Project, instance._stats_project_ids)
+    stats.refresh_counts(
+        Worker, instance._stats_worker_ids + [instance.team_lead_id]
+    )
+
+
+@receiver(post_save, sender=Worker)
+def worker_stats_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.increment(stats.WORKERS)
+
+
+@receiver(pre_delete, sender=Worker)
+def worker_stats_pre_delete(sender, instance, **kwargs):
+    instance._stats_task_ids = _related_ids(
+        Task.assignees.through, instance, Task
+    )
+    instance._stats_team_ids = _related_ids(
+        Team.workers.through, instance, Team
+    )
+
+
+@receiver(post_delete, sender=Worker)
+def worker_stats_deleted(sender, instance, **kwargs):
+    stats.increment(stats.WORKERS, -1)
+    stats.refresh_counts(Task, instance._stats_task_ids)
+    stats.refresh_counts(Team, instance._stats_team_ids)
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_stats_pre_delete(sender, instance, **kwargs):
+    instance._stats_task_ids = _related_ids(Task.tags.through, instance, Task)
+
+
+@receiver(post_delete, sender=Tag)
+def tag_stats_deleted(sender, instance, **kwargs):
+    stats.refresh_counts(Task, instance._stats_task_ids)
+
+
+def relation_counts_changed(sender, instance, action, model, pk_set, **kwargs):
+    """Refresh counters on both sides of an m2m add/remove/clear."""
+    if action == "pre_clear":
+        instance._stats_cleared_ids = _related_ids(sender, instance, model)
+        return
+    if action == "post_clear":
+        pk_set = instance._stats_cleared_ids
+    elif action not in ("post_add", "post_remove"):
+        return
+
+    stats.refresh_counts(type(instance), [instance.pk])
+    stats.refresh_counts(model, pk_set)
+
+
+for through in (
+    Task.assignees.through,
+    Task.tags.through,
+    Team.workers.through,
+    Project.teams.through,
+):
+    m2m_changed.connect(
+        relation_counts_changed,
+        sender=through,
+        dispatch_uid=f"relation_counts_changed:{through._meta.label}",
+    )
+
+
+# Full-text search index
+
+# Worker columns shown in search documents and cached fragments.
+WORKER_TEXT_FIELDS = {
+    "username", "first_name", "last_name", "email", "position",
+}
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Project)
+def search_document_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_object(instance)
+
+
+@receiver(post_save, sender=Task)
+def search_task_project_saved(sender, instance, raw=False, **kwargs):
+    # Project documents list the names of their tasks.
+    previous = getattr(instance, "_stats_previous", None) or {}
+    if raw or (
+        previous.get("name") == instance.name
+        and previous.get("project_id") == instance.project_id
+    ):
+        return
+    search.index_objects(
+        Project, [previous.get("project_id"), instance.project_id]
+    )
+
+
+@receiver(post_save, sender=Worker)
+def search_worker_saved(sender, instance, created, raw=False,
+                        update_fields=None, **kwargs):
+    # Logins save last_login only; skip anything that leaves the text alone.
+    if raw or (
+        update_fields and not WORKER_TEXT_FIELDS.intersection(update_fields)
+    ):
+        return
+    search.index_objects(Worker, [instance.pk])
+    if not created:
+        jobs.schedule_reindex(Task, assignees=instance.pk)
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Project)
+def search_document_deleted(sender, instance, **kwargs):
+    search.remove_object(instance)
+
+
+@receiver(post_delete, sender=Task)
+def search_task_project_deleted(sender, instance, **kwargs):
+    search.index_objects(Project, [instance.project_id])
+
+
+@receiver(post_delete, sender=Worker)
+def search_worker_deleted(sender, instance, **kwargs):
+    search.remove_object(instance)
+    search.index_objects(Task, instance._stats_task_ids)
+
+
+@receiver(post_save, sender=Tag)
+def search_tag_saved(sender, instance, created, raw=False, **kwargs):
+    if not (created or raw):
+        jobs.schedule_reindex(Task, tags=instance.pk)
+
+
+@receiver(post_delete, sender=Tag)
+def search_tag_deleted(sender, instance, **kwargs):
+    search.index_objects(Task, instance._stats_task_ids)
+
+
+@receiver(post_save, sender=Team)
+def search_team_saved(sender, instance, created, raw=False, **kwargs):
+    if not (created or raw):
+        jobs.schedule_reindex(Project, teams=instance.pk)
+
+
+@receiver(post_delete, sender=Team)
+def search_team_deleted(sender, instance, **kwargs):
+    search.index_objects(Project, instance._stats_project_ids)
+
+
+@receiver(post_save, sender=Position)
+def search_position_saved(sender, instance, created, raw=False, **kwargs):
+    if not (created or raw):
+        jobs.schedule_reindex(Worker, position=instance.pk)
+
+
+@receiver(pre_delete, sender=Position)
+def search_position_pre_delete(sender, instance, **kwargs):
+    instance._search_worker_ids = list(
+        instance.workers.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Position)
+def search_position_deleted(sender, instance, **kwargs):
+    search.index_objects(Worker, instance._search_worker_ids)
+
+
+def search_relations_changed(sender, instance, action, model, pk_set,
+                             reverse, **kwargs):
+    """Re-index the document side of a changed m2m relation."""
+    if action == "pre_clear" and reverse:
+        instance._search_cleared_ids = _related_ids(sender, instance, model)
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        search.index_objects(type(instance), [instance.pk])
+    elif action == "post_clear":
+        search.index_objects(model, instance._search_cleared_ids)
+    else:
+        search.index_objects(model, pk_set)
+
+
+for through in (
+    Task.assignees.through,
+    Task.tags.through,
+    Project.teams.through,
+):
+    m2m_changed.connect(
+        search_relations_changed,
+        sender=through,
+        dispatch_uid=f"search_relations_changed:{through._meta.label}",
+    )
+
+
+# Detail page stamps
+#
+# Own columns move updated_at through auto_now, and counter changes,
+# including every m2m add/remove/clear, through stats.refresh_counts;
+# these handlers stamp the pages that show a row of another model.  The
+# stamps also key the cached list rows and project sections.
+
+
+def _assigned_workers(task_ids) -> list:
+    return list(
+        Task.assignees.through.objects.filter(task_id__in=task_ids)
+        .values_list("worker_id", flat=True)
+    )
+
+
+def _projects_of_teams(team_ids) -> list:
+    return list(
+        Project.teams.through.objects.filter(team_id__in=team_ids)
+        .values_list("project_id", flat=True)
+    )
+
+
+def _pages_showing_worker(worker):
+    led = list(worker.teams_team_lead.values_list("pk", flat=True))
+    teams = _related_ids(Team.workers.through, worker, Team) + led
+    return teams, _projects_of_teams(led)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Team)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Worker)
+def stamp_partial_save(sender, instance, raw=False, update_fields=None,
+                       **kwargs):
+    # auto_now only applies when updated_at is among the saved fields.
+    if not raw and update_fields and "updated_at" not in update_fields:
+        touch(sender, [instance.pk])
+
+
+@receiver(post_save, sender=Task)
+def stamp_task_saved(sender, instance, created, raw=False, **kwargs):
+    # New tasks reach project and worker pages through the counters.
+    previous = getattr(instance, "_stats_previous", None)
+    if raw or created or previous is None:
+        return
+    touch(Project, [previous["project_id"], instance.project_id])
+    touch(Worker, _assignee_ids(instance))
+
+
+@receiver(post_save, sender=Project)
+def stamp_project_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    touch(Task, instance.tasks.values_list("pk", flat=True))
+    touch(Team, _related_ids(Project.teams.through, instance, Team))
+
+
+@receiver(pre_delete, sender=Project)
+def stamp_project_pre_delete(sender, instance, **kwargs):
+    # Its tasks lose the project through SET_NULL, which sends no signal.
+    instance._stamp_task_ids = list(
+        instance.tasks.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Project)
+def stamp_project_deleted(sender, instance, **kwargs):
+    touch(Task, instance._stamp_task_ids)
+
+
+@receiver(post_save, sender=Team)
+def stamp_team_saved(sender, instance, created, raw=False, **kwargs):
+    if not (raw or created):
+        touch(Project, _related_ids(Project.teams.through, instance, Project))
+        touch(
+            Worker,
+            _related_ids(Team.workers.through, instance, Worker)
+            + [instance.team_lead_id],
+        )
+
+
+@receiver(m2m_changed, sender=Team.workers.through)
+def stamp_team_members_changed(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    # Worker and project pages show the worker count of each team.
+    if action == "post_clear":
+        pk_set = instance._stats_cleared_ids
+    elif action not in ("post_add", "post_remove"):
+        return
+    team_ids = pk_set if reverse else [instance.pk]
+    touch(
+        Worker,
+        Team.workers.through.objects.filter(team_id__in=team_ids)
+        .values_list("worker_id", flat=True),
+    )
+    touch(Project, _projects_of_teams(team_ids))
+
+
+@receiver(post_save, sender=Worker)
+def stamp_worker_saved(sender, instance, created, raw=False,
+                       update_fields=None, **kwargs):
+    if raw or created or (
+        update_fields and not WORKER_TEXT_FIELDS.intersection(update_fields)
+    ):
+        return
+    teams, projects = _pages_showing_worker(instance)
+    touch(Task, _related_ids(Task.assignees.through, instance, Task))
+    touch(Team, teams)
+    touch(Project, projects)
+
+
+@receiver(pre_delete, sender=Worker)
+def stamp_worker_pre_delete(sender, instance, **kwargs):
+    # Led teams lose their lead through SET_NULL, which sends no signal.
+    instance._stamp_ids = _pages_showing_worker(instance)
+
+
+@receiver(post_delete, sender=Worker)
+def stamp_worker_deleted(sender, instance, **kwargs):
+    teams, projects = instance._stamp_ids
+    touch(Team, teams)
+    touch(Project, projects)
+
+
+@receiver(post_save, sender=Position)
+def stamp_position_saved(sender, instance, created, raw=False, **kwargs):
+    if not (raw or created):
+        touch(Worker, instance.workers.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Position)
+def stamp_position_deleted(sender, instance, **kwargs):
+    touch(Worker, instance._search_worker_ids)
+
+
+@receiver(post_save, sender=TaskType)
+def stamp_task_type_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    task_ids = list(instance.tasks.values_list("pk", flat=True))
+    touch(Task, task_ids)
+    touch(Worker, _assigned_workers(task_ids))
+
+
+@receiver(post_save, sender=Tag)
+def stamp_tag_saved(sender, instance, created, raw=False, **kwargs):
+    if not (raw or created):
+        touch(Task, _related_ids(Task.tags.through, instance, Task))
+
+
+# Admin menu permissions cached in sessions
+
+# Worker columns that change what the admin lets a user see.
+WORKER_ADMIN_FIELDS = {"is_active", "is_staff", "is_superuser"}
+
+
+@receiver(m2m_changed, sender=Worker.groups.through)
+@receiver(m2m_changed, sender=Worker.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def admin_permissions_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_admin_permissions()
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def admin_permissions_deleted(sender, instance, **kwargs):
+    invalidate_admin_permissions()
+
+
+@receiver(post_save, sender=Worker)
+def admin_flags_saved(sender, instance, created, raw=False,
+                      update_fields=None, **kwargs):
+    if created or raw or (
+        update_fields and not WORKER_ADMIN_FIELDS.intersection(update_fields)
+    ):
+        return
+    invalidate_admin_permissions()
+
+
+# SQLite connection tuning
+
+@receiver(connection_created)
+def connection_pragmas(sender, connection, **kwargs):
+    sqlite.apply_pragmas(connection)
+
+
+# Activity counters
+
+@receiver(request_finished)
+def activity_flush(sender, **kwargs):
+    try:
+        activity.flush_if_due()
+    except DatabaseError:
+        # The hits stay pending and go out with the next flush.
+        pass
@@ -0,0 +1,127 @@
+"""
+SQLite connection tuning and a concurrent-write stress test.
+
+Databases whose settings carry a ``PRAGMAS`` dict get those pragmas run on
+every new connection by ``apply_pragmas``, connected to
+``connection_created`` in ``task_manager.signals``.  ``run_write_stress``
+hammers a scratch database with read-then-write transactions from several
+threads and counts "database is locked" failures, so a settings profile
+can be checked before it is deployed.  Threads of deferred transactions
+run in lockstep rounds that all read before anyone writes, so the counts
+do not depend on thread timing.
+"""
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    OperationalError,
+    connections,
+    transaction,
+)
+
+
+STRESS_ALIAS = "sqlite-stress"
+# Seconds a thread waits for the others at a step, in case one of them
+# failed outright.
+LOCKSTEP_TIMEOUT = 30
+
+
+def apply_pragmas(connection) -> None:
+    pragmas = connection.settings_dict.get("PRAGMAS")
+    if connection.vendor != "sqlite" or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def _write_loop(transactions, pause, errors, lockstep):
+    connection = connections[STRESS_ALIAS]
+    try:
+        for _ in range(transactions):
+            try:
+                # Read, then write from the same transaction: the pattern
+                # of a model form save followed by its signal handlers.
+                with transaction.atomic(using=STRESS_ALIAS):
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT value FROM counter")
+                        value = cursor.fetchone()[0]
+                        if lockstep is not None:
+                            lockstep.wait(LOCKSTEP_TIMEOUT)
+                        time.sleep(pause)
+                        cursor.execute(
+                            "UPDATE counter SET value = %s", [value + 1]
+                        )
+            except OperationalError as error:
+                if "locked" not in str(error):
+                    raise
+                errors.append(str(error))
+            if lockstep is not None:
+                # Settle the round before anyone reads for the next one.
+                lockstep.wait(LOCKSTEP_TIMEOUT)
+    finally:
+        connection.close()
+
+
+def run_write_stress(
+    settings_dict, threads=8, transactions=25, pause=0.001
+) -> dict:
+    """
+    Run ``threads`` concurrent writers against a scratch database set up
+    like ``settings_dict``; returns counts of commits and lock errors.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        database = {
+            **settings_dict, "NAME": str(Path(directory) / "stress.sqlite3")
+        }
+        # configure_settings fills in the defaults Django expects.
+        connections.settings[STRESS_ALIAS] = connections.configure_settings(
+            {DEFAULT_DB_ALIAS: database}
+        )[DEFAULT_DB_ALIAS]
+        try:
+            connection = connections[STRESS_ALIAS]
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE TABLE counter (value integer)")
+                cursor.execute("INSERT INTO counter VALUES (0)")
+                cursor.execute("PRAGMA journal_mode")
+                journal_mode = cursor.fetchone()[0]
+
+            errors = []
+            # IMMEDIATE and EXCLUSIVE transactions take the write lock up
+            # front, so they run one at a time and could never meet.
+            lockstep = None
+            if connection.transaction_mode in (None, "DEFERRED"):
+                lockstep = threading.Barrier(threads)
+            workers = [
+                threading.Thread(
+                    target=_write_loop,
+                    args=(transactions, pause, errors, lockstep),
+                )
+                for _ in range(threads)
+            ]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT value FROM counter")
+                committed = cursor.fetchone()[0]
+            connection.close()
+        finally:
+            del connections[STRESS_ALIAS]
+            del connections.settings[STRESS_ALIAS]
+
+    return {
+        "journal_mode": journal_mode,
+        "attempted": threads * transactions,
+        "committed": committed,
+        "lock_errors": len(errors),
+        "seconds": round(elapsed, 2),
+    }
@@ -0,0 +1,179 @@
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from task_manager.models import (
+    DashboardCounter,
+    Project,
+    Task,
+    Team,
+    Worker,
+)
+
+
+TASKS_IN_PROCESS = "tasks_in_process"
+ACTIVE_PROJECTS = "active_projects"
+WORKERS = "workers"
+TEAMS = "teams"
+
+DASHBOARD_PROJECTS_LIMIT = 10
+DASHBOARD_TEAMS_LIMIT = 5
+
+COUNTER_QUERIES = {
+    TASKS_IN_PROCESS: lambda: Task.objects.filter(is_completed=False),
+    ACTIVE_PROJECTS: lambda: Project.objects.filter(status="IN_PROCESS"),
+    WORKERS: lambda: Worker.objects.all(),
+    TEAMS: lambda: Team.objects.all(),
+}
+
+
+def get_counters() -> dict:
+    """Return every dashboard counter in a single primary-key lookup."""
+    stored = DashboardCounter.objects.in_bulk(list(COUNTER_QUERIES))
+    counters = {}
+    for name in COUNTER_QUERIES:
+        if name in stored:
+            counters[name] = stored[name].value
+        else:
+            counters[name] = rebuild_counter(name)
+    return counters
+
+
+async def aget_counters() -> dict:
+    """Async variant of ``get_counters`` for the ASGI views."""
+    stored = await DashboardCounter.objects.ain_bulk(list(COUNTER_QUERIES))
+    counters = {}
+    for name in COUNTER_QUERIES:
+        if name in stored:
+            counters[name] = stored[name].value
+        else:
+            counters[name] = await sync_to_async(rebuild_counter)(name)
+    return counters
+
+
+def increment(name: str, delta: int = 1) -> None:
+    if not delta:
+        return
+    updated = DashboardCounter.objects.filter(name=name).update(
+        value=F("value") + delta
+    )
+    if not updated:
+        # Never built (or wiped): a recount already includes this change.
+        rebuild_counter(name)
+
+
+def rebuild_counter(name: str) -> int:
+    value = COUNTER_QUERIES[name]().count()
+    DashboardCounter.objects.update_or_create(
+        name=name, defaults={"value": value}
+    )
+    return value
+
+
+def _count_subquery(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def _task_counts() -> dict:
+    return {
+        "assignee_count": _count_subquery(
+            Task.assignees.through.objects.all(), "task"
+        ),
+        "tag_count": _count_subquery(Task.tags.through.objects.all(), "task"),
+    }
+
+
+def _worker_counts() -> dict:
+    assignments = Task.assignees.through.objects.all()
+    return {
+        "task_count": _count_subquery(assignments, "worker"),
+        "open_task_count": _count_subquery(
+            assignments.filter(task__is_completed=False), "worker"
+        ),
+        "team_count": _count_subquery(
+            Team.workers.through.objects.all(), "worker"
+        ),
+        "led_team_count": _count_subquery(Team.objects.all(), "team_lead"),
+    }
+
+
+def _team_counts() -> dict:
+    return {
+        "worker_count": _count_subquery(
+            Team.workers.through.objects.all(), "team"
+        ),
+        # Archived projects are hidden from team pages, so not counted.
+        "project_count": _count_subquery(
+            Project.teams.through.objects.filter(
+                project__archived_at__isnull=True
+            ),
+            "team",
+        ),
+    }
+
+
+def _project_counts() -> dict:
+    tasks = Task.objects.all()
+    return {
+        "task_count": _count_subquery(tasks, "project"),
+        "open_task_count": _count_subquery(
+            tasks.filter(is_completed=False), "project"
+        ),
+        "team_count": _count_subquery(
+            Project.teams.through.objects.all(), "project"
+        ),
+    }
+
+
+COUNT_COLUMNS = {
+    Task: _task_counts,
+    Worker: _worker_counts,
+    Team: _team_counts,
+    Project: _project_counts,
+}
+
+
+def refresh_counts(model, pks) -> None:
+    """
+    Recompute the denormalized ``*_count`` columns of the given rows.
+
+    Each refresh is a single ``UPDATE ... SET col = (SELECT COUNT(*) ...)``,
+    so it is exact regardless of how the relation changed.  Models without
+    counter columns are ignored.  The rows' ``updated_at`` stamps move
+    along the way, as their detail pages and cached fragments show the
+    counts too.
+    """
+    pks = {pk for pk in pks or () if pk is not None}
+    if pks and model in COUNT_COLUMNS:
+        model.objects.filter(pk__in=pks).update(
+            updated_at=timezone.now(), **COUNT_COLUMNS[model]()
+        )
+
+
+@transaction.atomic
+def recount(models=None) -> dict:
+    """Repair every counter column; returns updated row counts per model."""
+    counts = {}
+    for model in models or COUNT_COLUMNS:
+        counts[model._meta.label] = model.objects.update(
+            updated_at=timezone.now(), **COUNT_COLUMNS[model]()
+        )
+    return counts
+
+
+@transaction.atomic
+def rebuild_dashboard_stats() -> dict:
+    """Recompute every stored dashboard counter from scratch."""
+    recount([Project])
+    return {name: rebuild_counter(name) for name in COUNTER_QUERIES}
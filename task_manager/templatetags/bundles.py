@@ -0,0 +1,25 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from task_manager.assets import BUNDLES
+
+
+register = template.Library()
+
+TAGS = {
+    ".css": '<link rel="stylesheet" href="{}">',
+    ".js": '<script src="{}"></script>',
+}
+
+
+@register.simple_tag
+def bundle(name):
+    """
+    Tags loading bundle ``name``: the built file when the asset pipeline
+    is on, otherwise each of its source files.
+    """
+    paths = [name] if settings.STATIC_PIPELINE else BUNDLES[name]
+    tag = TAGS[name[name.rindex("."):]]
+    return format_html_join("\n", tag, ((static(path),) for path in paths))
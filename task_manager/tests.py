@@ -1,3 +1,2408 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.db import connection, connections
+from django.http import Http404, HttpResponse
+from django.test import (
+    AsyncClient,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve, reverse
+from django.utils import timezone
+
+from task_manager import (
+    activity,
+    archive,
+    assets,
+    benchmark,
+    jobs,
+    scheduling,
+    search,
+    seeding,
+    stats,
+    transfer,
+    utils,
+    workload,
+)
+from task_manager.async_urls import ASYNC_VIEWS
+from task_manager.bulk_actions import apply_bulk_action
+from task_manager.caching import get_pending_tasks
+from task_manager.forms import TaskForm, TeamForm
+from task_manager.pagination import KeysetPaginationMixin, KeysetPaginator
+from task_manager.models import (
+    ActivityCounter,
+    ArchivedTask,
+    Job,
+    Position,
+    Project,
+    Tag,
+    Task,
+    TaskType,
+    Team,
+    Worker,
+)
+from task_manager.query_budget import QueryBudgetTestMixin, QueryRecorder
+from task_manager.routers import PIN_COOKIE, ReplicaRouter
+
+
+class PendingVisitsMixin:
+    """
+    Forget the dashboard visits a test leaves in this process's tally, so
+    a later test's ``request_finished`` does not flush them.
+    """
+
+    def setUp(self):
+        super().setUp()
+        activity.discard()
+        self.addCleanup(activity.discard)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="pager", password="test12345"
+        )
+        task_type = TaskType.objects.create(name="Feature")
+        # Deadlines repeat, so pages have to break ties on pk.
+        for index, day in enumerate((3, 1, 2, 1, 3, 1, 2)):
+            Task.objects.create(
+                name=f"Task {index}",
+                deadline=datetime.date(2030, 1, day),
+                is_completed=False,
+                task_type=task_type,
+            )
+
+    def pages(self, paginator, cursor=None, direction="next"):
+        """Follow cursors in ``direction`` from ``cursor`` to the end."""
+        pages = []
+        while True:
+            page = paginator.page(cursor)
+            pages.append([task.pk for task in page])
+            cursor = (
+                page.next_cursor if direction == "next"
+                else page.previous_cursor
+            )
+            if cursor is None:
+                return pages, page
+
+    def test_cursors_walk_every_row_once_in_both_directions(self):
+        for ordering in (("deadline", "pk"), ("-deadline", "-pk")):
+            with self.subTest(ordering):
+                expected = list(
+                    Task.objects.order_by(*ordering).values_list(
+                        "pk", flat=True
+                    )
+                )
+                paginator = KeysetPaginator(Task.objects.all(), ordering, 3)
+
+                forward, last = self.pages(paginator)
+                self.assertEqual(
+                    forward, [expected[:3], expected[3:6], expected[6:]]
+                )
+                self.assertFalse(last.has_next())
+                self.assertTrue(last.has_previous())
+
+                backward, first = self.pages(
+                    paginator, last.previous_cursor, "prev"
+                )
+                self.assertEqual(backward, forward[-2::-1])
+                self.assertFalse(first.has_previous())
+                self.assertTrue(first.has_next())
+
+    def test_a_full_last_page_has_no_next_cursor(self):
+        paginator = KeysetPaginator(Task.objects.all(), ("deadline", "pk"), 7)
+
+        page = paginator.page()
+
+        self.assertEqual(len(page), 7)
+        self.assertFalse(page.has_other_pages())
+
+    def test_tampered_cursors_are_not_found(self):
+        paginator = KeysetPaginator(Task.objects.all(), ("deadline", "pk"), 3)
+        cursor = paginator.page().next_cursor
+        self.client.force_login(self.worker)
+
+        for tampered in (cursor[:-2], "x" + cursor, "not a cursor", "W10"):
+            with self.subTest(tampered):
+                with self.assertRaises(Http404):
+                    paginator.page(tampered)
+                response = self.client.get(
+                    reverse("task_manager:task-list"), {"cursor": tampered}
+                )
+                self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(
+            reverse("task_manager:task-list"), {"cursor": cursor}
+        )
+        # The list view pages by 25, so the rest of the tasks follow.
+        self.assertEqual(len(response.context["task_list"]), 4)
+
+    @mock.patch.object(KeysetPaginationMixin, "paginate_by", 3)
+    def test_page_links_keep_the_other_query_parameters(self):
+        self.client.force_login(self.worker)
+        url = reverse("task_manager:task-list")
+
+        first = self.client.get(url, {"q": "task"})
+        next_cursor = first.context["page_obj"].next_cursor
+        self.assertContains(first, f'href="?q=task&amp;cursor={next_cursor}"')
+
+        second = self.client.get(url, {"q": "task", "cursor": next_cursor})
+        previous_cursor = second.context["page_obj"].previous_cursor
+        self.assertContains(
+            second, f'href="?q=task&amp;cursor={previous_cursor}"'
+        )
+
+
+class QueryPlanTests(TestCase):
+    """
+    The hot filters must be answered from the indexes added in 0005.
+
+    Plans are read with SQLite's ``EXPLAIN QUERY PLAN``; other backends
+    choose plans from table statistics, so the check is SQLite only.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="planner", password="test12345"
+        )
+
+    def setUp(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Query plan assertions are SQLite specific.")
+
+    def get_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return " | ".join(row[-1] for row in cursor.fetchall())
+
+    def test_pending_tasks_use_assignee_and_open_deadline_indexes(self):
+        plan = self.get_plan(
+            Task.objects.filter(
+                is_completed=False, assignees=self.worker
+            ).order_by("deadline")[:10]
+        )
+
+        self.assertIn("task_assignees_worker_task_idx", plan)
+
+    def test_open_tasks_count_uses_partial_index(self):
+        plan = self.get_plan(
+            Task.objects.filter(is_completed=False).order_by("deadline", "pk")
+        )
+
+        self.assertIn("task_open_deadline_idx", plan)
+        self.assertNotIn("USE TEMP B-TREE", plan)
+
+    def test_task_list_order_uses_deadline_index(self):
+        plan = self.get_plan(Task.objects.order_by("deadline", "pk"))
+
+        self.assertIn("task_deadline_id_idx", plan)
+        self.assertNotIn("USE TEMP B-TREE", plan)
+
+    def test_project_status_filter_uses_index(self):
+        plan = self.get_plan(Project.objects.filter(status="IN_PROCESS"))
+
+        self.assertIn("project_status_idx", plan)
+
+    def test_project_tasks_filter_uses_index(self):
+        plan = self.get_plan(
+            Task.objects.filter(project_id=1, is_completed=False)
+        )
+
+        self.assertIn("task_project_completed_idx", plan)
+
+
+class PendingTasksCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="cached", password="test12345"
+        )
+        cls.task_type = TaskType.objects.create(name="Bug")
+
+    def setUp(self):
+        cache.clear()
+
+    def create_task(self, name, **kwargs):
+        kwargs.setdefault("is_completed", False)
+        return Task.objects.create(
+            name=name,
+            description="",
+            deadline=datetime.date(2030, 1, 1),
+            task_type=self.task_type,
+            **kwargs,
+        )
+
+    def pending_names(self):
+        return [task["name"] for task in get_pending_tasks(self.worker.pk)]
+
+    def test_cached_until_invalidated(self):
+        task = self.create_task("First")
+        with self.captureOnCommitCallbacks(execute=True):
+            task.assignees.add(self.worker)
+        self.assertEqual(self.pending_names(), ["First"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.pending_names(), ["First"])
+
+    def test_assignee_changes_invalidate(self):
+        task = self.create_task("First")
+        self.assertEqual(self.pending_names(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.worker.tasks.add(task)
+        self.assertEqual(self.pending_names(), ["First"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.assignees.clear()
+        self.assertEqual(self.pending_names(), [])
+
+    def test_task_save_and_delete_invalidate(self):
+        task = self.create_task("First")
+        with self.captureOnCommitCallbacks(execute=True):
+            task.assignees.add(self.worker)
+        self.assertEqual(self.pending_names(), ["First"])
+
+        task.is_completed = True
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+        self.assertEqual(self.pending_names(), [])
+
+        task.is_completed = False
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+        self.assertEqual(self.pending_names(), ["First"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertEqual(self.pending_names(), [])
+
+
+class DashboardStatsTests(PendingVisitsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.task_type = TaskType.objects.create(name="Feature")
+
+    def assertCountersMatchRebuild(self):
+        counters = stats.get_counters()
+        projects = list(
+            Project.objects.order_by("pk").values_list(
+                "task_count", "team_count"
+            )
+        )
+
+        self.assertEqual(counters, stats.rebuild_dashboard_stats())
+        self.assertEqual(
+            projects,
+            list(
+                Project.objects.order_by("pk").values_list(
+                    "task_count", "team_count"
+                )
+            ),
+        )
+
+    def test_incremental_updates_match_rebuild(self):
+        project = Project.objects.create(name="Apollo", budget=100)
+        other = Project.objects.create(name="Gemini", budget=50)
+        team = Team.objects.create(name="Core")
+        project.teams.add(team)
+        other.teams.add(team)
+        task = Task.objects.create(
+            name="Launch",
+            description="",
+            deadline=datetime.date(2030, 1, 1),
+            is_completed=False,
+            task_type=self.task_type,
+            project=project,
+        )
+        get_user_model().objects.create_user(username="w1", password="x")
+        self.assertCountersMatchRebuild()
+
+        task.is_completed = True
+        task.project = other
+        task.save()
+        other.status = "DONE"
+        other.save()
+        team.projects.clear()
+        self.assertCountersMatchRebuild()
+
+        team.delete()
+        task.delete()
+        self.assertCountersMatchRebuild()
+
+    def test_dashboard_reads_are_constant(self):
+        user = get_user_model().objects.create_user(
+            username="viewer", password="x"
+        )
+        self.client.force_login(user)
+        self.client.get("/")
+        with CaptureQueriesContext(connection) as empty:
+            self.client.get("/")
+        for i in range(20):
+            Project.objects.create(name=f"P{i}", budget=i)
+
+        with self.assertNumQueries(len(empty)):
+            response = self.client.get("/")
+
+        self.assertEqual(response.context["total_projects"], 20)
+
+
+class CounterColumnTests(TestCase):
+    COLUMNS = {
+        Task: ("assignee_count", "tag_count"),
+        Team: ("worker_count", "project_count"),
+        Project: ("task_count", "open_task_count", "team_count"),
+    }
+
+    def snapshot(self):
+        columns = dict(self.COLUMNS)
+        columns[get_user_model()] = (
+            "task_count", "open_task_count", "team_count", "led_team_count"
+        )
+        return {
+            model: list(model.objects.order_by("pk").values_list(*fields))
+            for model, fields in columns.items()
+        }
+
+    def assertCountersMatchRecount(self):
+        maintained = self.snapshot()
+        stats.recount()
+        self.assertEqual(maintained, self.snapshot())
+
+    def test_signals_keep_columns_exact(self):
+        user_model = get_user_model()
+        lead = user_model.objects.create_user(username="lead", password="x")
+        dev = user_model.objects.create_user(username="dev", password="x")
+        tag = Tag.objects.create(name="backend")
+        team = Team.objects.create(name="Core", team_lead=lead)
+        project = Project.objects.create(name="Apollo", budget=1)
+        task = Task.objects.create(
+            name="Launch",
+            description="",
+            deadline=datetime.date(2030, 1, 1),
+            is_completed=False,
+            task_type=TaskType.objects.create(name="Ops"),
+            project=project,
+        )
+        task.assignees.add(lead, dev)
+        task.tags.add(tag)
+        team.workers.add(dev)
+        project.teams.add(team)
+        self.assertCountersMatchRecount()
+
+        task.is_completed = True
+        task.save()
+        dev.teams.clear()
+        team.team_lead = dev
+        team.save()
+        self.assertCountersMatchRecount()
+
+        tag.delete()
+        lead.delete()
+        project.delete()
+        self.assertCountersMatchRecount()
+
+
+class WorkerDetailTaskSegmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user_model = get_user_model()
+        cls.viewer = user_model.objects.create_user(
+            username="viewer", password="x"
+        )
+        cls.worker = user_model.objects.create_user(
+            username="veteran", password="x"
+        )
+        task_type = TaskType.objects.create(name="Chore")
+        for day in range(1, 26):
+            task = Task.objects.create(
+                name=f"Done {day}",
+                description="",
+                deadline=datetime.date(2024, 1, day),
+                is_completed=True,
+                task_type=task_type,
+            )
+            task.assignees.add(cls.worker)
+        Task.objects.create(
+            name="Viewer task",
+            description="",
+            deadline=datetime.date(2024, 1, 1),
+            is_completed=False,
+            task_type=task_type,
+        ).assignees.add(cls.viewer)
+
+    def setUp(self):
+        self.client.force_login(self.viewer)
+
+    def test_detail_shows_viewed_worker_tasks_in_bounded_segments(self):
+        response = self.client.get(
+            f"/workers/{self.worker.pk}/detail/"
+        )
+
+        done_page = response.context["done_tasks_page"]
+        self.assertEqual(len(response.context["open_tasks_page"]), 0)
+        self.assertEqual(len(done_page), 10)
+        self.assertEqual(done_page.object_list[0].name, "Done 25")
+        self.assertTrue(done_page.has_next())
+        self.assertEqual(response.context["done_tasks_count"], 25)
+
+    def test_load_more_continues_where_the_segment_ended(self):
+        names = []
+        url = f"/workers/{self.worker.pk}/tasks/done/"
+        while url:
+            response = self.client.get(url)
+            page = response.context["page_obj"]
+            names += [task.name for task in page]
+            url = (
+                f"/workers/{self.worker.pk}/tasks/done/"
+                f"?cursor={page.next_cursor}"
+                if page.has_next() else None
+            )
+
+        self.assertEqual(names, [f"Done {day}" for day in range(25, 0, -1)])
+
+    def test_unknown_status_is_404(self):
+        response = self.client.get(f"/workers/{self.worker.pk}/tasks/all/")
+
+        self.assertEqual(response.status_code, 404)
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="client", password="x"
+        )
+        task_type = TaskType.objects.create(name="Bug")
+        cls.tasks = []
+        for day in range(1, 6):
+            task = Task.objects.create(
+                name=f"Task {day}",
+                description="",
+                deadline=datetime.date(2030, 1, day),
+                is_completed=False,
+                task_type=task_type,
+            )
+            task.assignees.add(cls.worker)
+            cls.tasks.append(task)
+
+    def setUp(self):
+        self.client.force_login(self.worker)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+
+        self.assertEqual(self.client.get("/api/v1/tasks/").status_code, 401)
+
+    def test_sparse_fields_and_cursor_pagination(self):
+        names = []
+        url = "/api/v1/tasks/?fields=name,assignees&limit=2"
+        while url:
+            data = self.client.get(url).json()
+            for item in data["results"]:
+                self.assertEqual(set(item), {"name", "assignees"})
+                self.assertEqual(item["assignees"], [self.worker.pk])
+            names += [item["name"] for item in data["results"]]
+            url = (
+                f"/api/v1/tasks/?fields=name,assignees&limit=2"
+                f"&cursor={data['next']}" if data["next"] else None
+            )
+
+        self.assertEqual(names, [f"Task {day}" for day in range(1, 6)])
+
+    def test_batched_ids_in_constant_queries(self):
+        ids = ",".join(str(task.pk) for task in self.tasks[:3])
+
+        # Session, user, rows, assignees.
+        with self.assertNumQueries(4):
+            data = self.client.get(
+                f"/api/v1/tasks/?ids={ids}&fields=id,assignees"
+            ).json()
+
+        self.assertEqual(
+            [item["id"] for item in data["results"]],
+            [task.pk for task in self.tasks[:3]],
+        )
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get("/api/v1/workers/?fields=password")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag_round_trip(self):
+        url = f"/api/v1/tasks/{self.tasks[0].pk}/"
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+
+class TaskTransferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="alice", password="x"
+        )
+        task = Task.objects.create(
+            name="Ship, v2",
+            description="multi\nline",
+            deadline=datetime.date(2030, 5, 1),
+            is_completed=False,
+            priority="HIGH",
+            task_type=TaskType.objects.create(name="Release"),
+            project=Project.objects.create(name="Apollo", budget=10),
+        )
+        task.assignees.add(cls.worker)
+        task.tags.add(Tag.objects.create(name="urgent"))
+
+    def round_trip(self, file_format):
+        exported = "".join(transfer.iter_export(file_format, chunk_size=1))
+        Task.objects.all().delete()
+
+        result = transfer.import_tasks(
+            io.BytesIO(exported.encode()), file_format, batch_size=1
+        )
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.skipped, 0)
+        task = Task.objects.get()
+        self.assertEqual(task.name, "Ship, v2")
+        self.assertEqual(task.description, "multi\nline")
+        self.assertEqual(task.project.name, "Apollo")
+        self.assertEqual(list(task.assignees.all()), [self.worker])
+        self.assertEqual(
+            list(task.tags.values_list("name", flat=True)), ["urgent"]
+        )
+        self.assertEqual(task.assignee_count, 1)
+
+    def test_csv_round_trip(self):
+        self.round_trip("csv")
+
+    def test_ndjson_round_trip(self):
+        self.round_trip("ndjson")
+
+    def test_import_keeps_counters_in_sync(self):
+        lines = [
+            '{"name": "A", "deadline": "2030-01-01", "task_type": "Ops", '
+            '"project": "New", "assignees": ["alice", "ghost"]}',
+            '{"name": "", "deadline": "2030-01-01", "task_type": "Ops"}',
+        ]
+        counters = stats.get_counters()
+
+        result = transfer.import_tasks(
+            io.StringIO("\n".join(lines)), "ndjson"
+        )
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.skipped, 1)
+        self.assertEqual(result.unknown_assignees, {"ghost"})
+        self.assertEqual(
+            stats.get_counters()[stats.TASKS_IN_PROCESS],
+            counters[stats.TASKS_IN_PROCESS] + 1,
+        )
+        maintained = stats.get_counters()
+        self.assertEqual(maintained, stats.rebuild_dashboard_stats())
+        self.worker.refresh_from_db()
+        self.assertEqual(self.worker.open_task_count, 2)
+
+    def test_wrongly_typed_records_are_reported_and_skipped(self):
+        valid = '"deadline": "2030-01-01", "task_type": "Ops"'
+        lines = [
+            "[1, 2]",
+            '"a string"',
+            f'{{"name": 5, {valid}}}',
+            f'{{"name": "A", "priority": ["x"], {valid}}}',
+            f'{{"name": "A", "description": {{"a": 1}}, {valid}}}',
+            f'{{"name": "A", "tags": [1], {valid}}}',
+            f'{{"name": "A", "assignees": "alice", {valid}}}',
+            f'{{"name": "Kept", {valid}}}',
+        ]
+
+        result = transfer.import_tasks(
+            io.StringIO("\n".join(lines)), "ndjson", batch_size=3
+        )
+
+        self.assertEqual((result.created, result.skipped), (1, 7))
+        self.assertEqual(
+            [error.split(":")[0] for error in result.errors],
+            [f"line {n}" for n in range(1, 8)],
+        )
+        self.assertTrue(Task.objects.filter(name="Kept").exists())
+
+    def test_export_endpoint_streams(self):
+        self.client.force_login(self.worker)
+
+        response = self.client.get("/tasks/export/?format=ndjson")
+
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content).decode()
+        self.assertIn('"Ship, v2"', body)
+
+
+class TaskBulkActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="closer", password="x"
+        )
+        cls.tag = Tag.objects.create(name="sprint-1")
+        task_type = TaskType.objects.create(name="Story")
+        cls.tasks = [
+            Task.objects.create(
+                name=f"Story {i}",
+                description="",
+                deadline=datetime.date(2030, 1, 1),
+                is_completed=False,
+                task_type=task_type,
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.worker)
+
+    def post(self, action, **data):
+        return self.client.post("/tasks/bulk/", {
+            "tasks": [task.pk for task in self.tasks],
+            "action": action,
+            **data,
+        })
+
+    def assertCountersMatchRebuild(self):
+        maintained = stats.get_counters()
+        columns = list(
+            Task.objects.order_by("pk").values_list(
+                "assignee_count", "tag_count"
+            )
+        )
+        self.assertEqual(maintained, stats.rebuild_dashboard_stats())
+        stats.recount()
+        self.assertEqual(
+            columns,
+            list(
+                Task.objects.order_by("pk").values_list(
+                    "assignee_count", "tag_count"
+                )
+            ),
+        )
+
+    def test_actions_apply_to_every_selected_task(self):
+        self.post("add_assignee", worker=self.worker.pk)
+        self.post("add_tag", tag=self.tag.pk)
+        self.post("priority", priority="CRITICAL")
+        response = self.post("complete")
+
+        self.assertRedirects(
+            response, "/tasks/", fetch_redirect_response=False
+        )
+        self.assertEqual(
+            Task.objects.filter(
+                is_completed=True, priority="CRITICAL", assignees=self.worker,
+                tags=self.tag,
+            ).count(),
+            5,
+        )
+        self.worker.refresh_from_db()
+        self.assertEqual(
+            (self.worker.task_count, self.worker.open_task_count), (5, 0)
+        )
+        self.assertCountersMatchRebuild()
+
+        self.post("remove_tag", tag=self.tag.pk)
+        self.post("reopen")
+        self.assertFalse(Task.objects.filter(tags=self.tag).exists())
+        self.assertCountersMatchRebuild()
+
+    def test_query_count_does_not_depend_on_selection_size(self):
+        with CaptureQueriesContext(connection) as few:
+            self.client.post("/tasks/bulk/", {
+                "tasks": [self.tasks[0].pk], "action": "complete",
+            })
+
+        with self.assertNumQueries(len(few)):
+            self.post("complete")
+
+    def test_value_is_required(self):
+        self.post("add_tag")
+
+        self.assertEqual(Task.objects.filter(tags=self.tag).count(), 0)
+
+    def test_list_does_not_render_every_choice(self):
+        self.client.get("/tasks/")
+        with CaptureQueriesContext(connection) as few:
+            self.client.get("/tasks/")
+        get_user_model().objects.bulk_create([
+            get_user_model()(username=f"extra{index}") for index in range(30)
+        ])
+        Tag.objects.bulk_create([Tag(name=f"tag{i}") for i in range(30)])
+        Project.objects.bulk_create([
+            Project(name=f"Project {i}", budget=1) for i in range(30)
+        ])
+
+        with self.assertNumQueries(len(few)):
+            response = self.client.get("/tasks/")
+        self.assertContains(response, "data-typeahead-url", count=3)
+        self.assertNotContains(response, "extra0")
+        self.assertNotContains(response, "sprint-1")
+        self.assertEqual(
+            self.client.get("/lookup/projects/", {"q": "project 1"}).json()[
+                "results"
+            ][0]["text"],
+            "Project 1",
+        )
+
+    def test_moves_refresh_both_project_pages(self):
+        cache.clear()
+        source, target = [
+            Project.objects.create(name=name, budget=1)
+            for name in ("Source", "Target")
+        ]
+        self.post("project", project=source.pk)
+        urls = [
+            f"/projects/{project.pk}/detail/" for project in (source, target)
+        ]
+        self.assertContains(self.client.get(urls[0]), "Story 0")
+        self.assertNotContains(self.client.get(urls[1]), "Story 0")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post("project", project=target.pk)
+
+        self.assertNotContains(self.client.get(urls[0]), "Story 0")
+        self.assertContains(self.client.get(urls[1]), "Story 0")
+
+
+class SearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="mgarcia",
+            password="test12345",
+            first_name="Maria",
+            last_name="Garcia",
+        )
+        cls.task_type = TaskType.objects.create(name="Feature")
+        cls.project = Project.objects.create(
+            name="Payments", budget=1, description="Billing rewrite"
+        )
+        cls.task = Task.objects.create(
+            name="Refund endpoint",
+            description="Handle partial payments",
+            deadline=datetime.date(2030, 1, 1),
+            is_completed=False,
+            task_type=cls.task_type,
+            project=cls.project,
+        )
+        cls.task.assignees.add(cls.worker)
+        cls.task.tags.add(Tag.objects.create(name="backend"))
+
+    def setUp(self):
+        self.client.force_login(self.worker)
+
+    def search_ids(self, kind, query):
+        return search.search_ids(kind, query)
+
+    def test_documents_follow_saves_and_relations(self):
+        self.assertEqual(self.search_ids("task", "refund"), [self.task.pk])
+        self.assertEqual(self.search_ids("task", "backend"), [self.task.pk])
+        self.assertEqual(self.search_ids("task", "garcia"), [self.task.pk])
+        self.assertEqual(
+            self.search_ids("project", "billing"), [self.project.pk]
+        )
+        self.assertEqual(self.search_ids("worker", "mar"), [self.worker.pk])
+
+        self.worker.last_name = "Lopez"
+        self.worker.save()
+        self.task.tags.clear()
+
+        self.assertEqual(self.search_ids("task", "garcia"), [])
+        self.assertEqual(self.search_ids("task", "lopez"), [self.task.pk])
+        self.assertEqual(self.search_ids("task", "backend"), [])
+
+        self.task.delete()
+        self.assertEqual(self.search_ids("task", "refund"), [])
+
+    def test_title_matches_rank_first(self):
+        other = Task.objects.create(
+            name="Payments dashboard",
+            deadline=datetime.date(2030, 1, 1),
+            is_completed=False,
+            task_type=self.task_type,
+        )
+
+        self.assertEqual(
+            self.search_ids("task", "payments"), [other.pk, self.task.pk]
+        )
+
+    def test_bulk_changes_are_indexed(self):
+        tag = Tag.objects.create(name="frontend")
+
+        self.client.post("/tasks/bulk/", {
+            "tasks": [self.task.pk], "action": "add_tag", "tag": tag.pk,
+        })
+
+        self.assertEqual(self.search_ids("task", "frontend"), [self.task.pk])
+
+    def test_search_view_groups_results(self):
+        response = self.client.get("/search/", {"q": "pay"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["task_results"], [self.task])
+        self.assertEqual(response.context["project_results"], [self.project])
+        self.assertEqual(response.context["worker_results"], [])
+
+    def test_rebuild_restores_the_index(self):
+        search.get_backend().clear()
+        self.assertEqual(self.search_ids("task", "refund"), [])
+
+        counts = search.rebuild_index()
+
+        self.assertEqual(counts, {"task": 1, "project": 1, "worker": 1})
+        self.assertEqual(self.search_ids("task", "refund"), [self.task.pk])
+
+    def test_large_renames_are_reindexed_by_a_job(self):
+        tag = Tag.objects.get(name="backend")
+        other = Task.objects.create(
+            name="Payout report",
+            deadline=datetime.date(2030, 1, 1),
+            is_completed=False,
+            task_type=self.task_type,
+        )
+        other.tags.add(tag)
+
+        with self.settings(JOBS_INLINE_REINDEX_LIMIT=1):
+            tag.name = "billing"
+            tag.save()
+        self.assertEqual(self.search_ids("task", "billing"), [])
+
+        with mock.patch.object(search, "INDEX_BATCH_SIZE", 1):
+            [job] = jobs.run_pending()
+        self.assertEqual((job.status, job.result), ("DONE", {"indexed": 2}))
+        self.assertEqual(
+            sorted(self.search_ids("task", "billing")),
+            [self.task.pk, other.pk],
+        )
+
+        tag.name = "ledger"
+        tag.save()
+        self.assertEqual(len(self.search_ids("task", "ledger")), 2)
+
+    def test_project_documents_follow_their_task_names(self):
+        self.assertEqual(
+            self.search_ids("project", "refund"), [self.project.pk]
+        )
+
+        self.task.name = "Chargeback endpoint"
+        self.task.save()
+        self.assertEqual(self.search_ids("project", "refund"), [])
+        self.assertEqual(
+            self.search_ids("project", "chargeback"), [self.project.pk]
+        )
+
+        apply_bulk_action([self.task.pk], "project", None)
+        self.assertEqual(self.search_ids("project", "chargeback"), [])
+
+    def test_admin_search_uses_the_index_and_reports_the_cap(self):
+        self.client.force_login(get_user_model().objects.create_superuser(
+            username="admin", password="x"
+        ))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/admin/task_manager/project/", {"q": "refund"}
+            )
+        self.assertEqual(
+            list(response.context["cl"].result_list), [self.project]
+        )
+        self.assertNotContains(response, "Only the best")
+        self.assertFalse(any(
+            '"task_manager_task"' in query["sql"]
+            for query in queries.captured_queries
+        ))
+
+        with self.settings(ADMIN_SEARCH_LIMIT=1):
+            response = self.client.get(
+                "/admin/task_manager/task/", {"q": "pay"}
+            )
+        self.assertEqual(
+            list(response.context["cl"].result_list), [self.task]
+        )
+        self.assertContains(response, "Only the best 1 index matches")
+
+
+@override_settings(SEARCH_BACKEND="task_manager.search.SimpleSearchBackend")
+class SimpleSearchBackendTests(SearchIndexTests):
+    """The portable backend must behave like the FTS5 one."""
+
+    def setUp(self):
+        search._backend = None
+        self.addCleanup(setattr, search, "_backend", None)
+        search.rebuild_index()
+        super().setUp()
+
+
+class TypeaheadChoiceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="lead", password="test12345"
+        )
+        get_user_model().objects.bulk_create([
+            get_user_model()(username=f"dev{index:02}", first_name="Dev")
+            for index in range(30)
+        ])
+        cls.task_type = TaskType.objects.create(name="Bug")
+
+    def setUp(self):
+        self.client.force_login(self.worker)
+
+    def test_form_renders_only_selected_choices(self):
+        task = Task.objects.create(
+            name="Fix login",
+            deadline=datetime.date(2030, 1, 1),
+            is_completed=False,
+            task_type=self.task_type,
+        )
+        task.assignees.add(self.worker)
+
+        response = self.client.get(f"/tasks/{task.pk}/update/")
+
+        self.assertContains(response, "data-typeahead-url", count=2)
+        self.assertContains(response, f'value="{self.worker.pk}"')
+        self.assertNotContains(response, "dev00")
+
+    def test_render_queries_do_not_depend_on_headcount(self):
+        with CaptureQueriesContext(connection) as few:
+            self.client.get("/teams/create/")
+        get_user_model().objects.bulk_create([
+            get_user_model()(username=f"extra{index}") for index in range(50)
+        ])
+
+        with self.assertNumQueries(len(few)):
+            self.client.get("/teams/create/")
+
+    def test_submitted_ids_are_validated(self):
+        devs = list(
+            get_user_model().objects.filter(username__startswith="dev")
+            .values_list("pk", flat=True)[:3]
+        )
+        form = TeamForm(data={
+            "name": "Core", "team_lead": self.worker.pk, "workers": devs,
+        })
+        self.assertTrue(form.is_valid())
+        self.assertEqual(
+            sorted(worker.pk for worker in form.cleaned_data["workers"]),
+            sorted(devs),
+        )
+
+        form = TeamForm(data={
+            "name": "Core", "team_lead": self.worker.pk, "workers": [0],
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn("workers", form.errors)
+
+    def test_lookup_filters_and_paginates(self):
+        response = self.client.get("/lookup/workers/", {"q": "dev"})
+        data = response.json()
+
+        self.assertEqual(len(data["results"]), 20)
+        self.assertEqual(
+            data["results"][0]["id"],
+            get_user_model().objects.get(username="dev00").pk,
+        )
+
+        data = self.client.get(
+            "/lookup/workers/", {"q": "dev", "cursor": data["next"]}
+        ).json()
+        self.assertEqual(len(data["results"]), 10)
+        self.assertIsNone(data["next"])
+
+        self.assertEqual(
+            self.client.get("/lookup/positions/").status_code, 404
+        )
+
+
+class QueryBudgetTests(
+    PendingVisitsMixin, QueryBudgetTestMixin, TestCase
+):
+    """Every page stays within its budget however many rows it shows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        position = Position.objects.create(name="Developer")
+        cls.worker = User.objects.create_user(
+            username="budget", password="test12345", position=position
+        )
+        workers = [
+            User.objects.create_user(
+                username=f"w{index}", password="x", position=position
+            )
+            for index in range(6)
+        ]
+        task_type = TaskType.objects.create(name="Feature")
+        tags = [Tag.objects.create(name=f"tag{index}") for index in range(3)]
+        cls.team = Team.objects.create(name="Core", team_lead=cls.worker)
+        cls.team.workers.set(workers + [cls.worker])
+        cls.project = Project.objects.create(
+            name="Apollo", budget=1, status="IN_PROCESS"
+        )
+        cls.project.teams.add(cls.team)
+        for index in range(8):
+            task = Task.objects.create(
+                name=f"Task {index}",
+                deadline=datetime.date(2030, 1, 1 + index),
+                is_completed=index % 2 == 0,
+                task_type=task_type,
+                project=cls.project,
+            )
+            task.assignees.set(workers[:3] + [cls.worker])
+            task.tags.set(tags)
+        cls.task = task
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.worker)
+
+    def get_pages(self):
+        return [
+            ("task_manager:index", {}),
+            ("task_manager:task-list", {}),
+            ("task_manager:task-detail", {"pk": self.task.pk}),
+            ("task_manager:task-create", {}),
+            ("task_manager:task-update", {"pk": self.task.pk}),
+            ("task_manager:team-list", {}),
+            ("task_manager:team-detail", {"pk": self.team.pk}),
+            ("task_manager:team-create", {}),
+            ("task_manager:team-update", {"pk": self.team.pk}),
+            ("task_manager:worker-list", {}),
+            ("task_manager:worker-detail", {"pk": self.worker.pk}),
+            (
+                "task_manager:worker-tasks",
+                {"pk": self.worker.pk, "status": "open"},
+            ),
+            ("task_manager:project-list", {}),
+            ("task_manager:project-detail", {"pk": self.project.pk}),
+            ("task_manager:tag-list", {}),
+            ("task_manager:task-type-list", {}),
+            ("task_manager:position-list", {}),
+            ("task_manager:search", {}),
+            ("task_manager:lookup", {"kind": "workers"}),
+            ("task_manager:workload", {}),
+        ]
+
+    def test_pages_stay_within_budget(self):
+        jobs.enqueue("workload")
+        jobs.run_pending()
+        for name, kwargs in self.get_pages():
+            with self.subTest(name):
+                with self.assertQueryBudget(name):
+                    response = self.client.get(reverse(name, kwargs=kwargs))
+                self.assertEqual(response.status_code, 200)
+
+    def test_repeated_statements_are_reported(self):
+        with self.assertRaisesMessage(AssertionError, "N+1"):
+            with self.assertQueryBudget("task_manager:task-list", 100):
+                for task in Task.objects.all():
+                    task.task_type.name
+
+    @override_settings(
+        QUERY_BUDGET_ENABLED=True,
+        QUERY_BUDGETS={"task_manager:task-list": 1},
+    )
+    def test_middleware_reports_requests_over_budget(self):
+        with self.assertLogs("task_manager.queries", "WARNING") as logs:
+            response = self.client.get(reverse("task_manager:task-list"))
+
+        self.assertGreater(int(response["X-Query-Count"]), 1)
+        self.assertIn("task_manager:task-list:", logs.output[0])
+
+
+class SeedAndBenchmarkTests(TestCase):
+    def test_seed_keeps_maintained_counters_exact(self):
+        created = seeding.seed(
+            workers=20, teams=3, projects=4, tasks=60, tags=5,
+            skew=1.5, random_seed=7,
+        )
+
+        self.assertEqual(created["tasks"], 60)
+        self.assertEqual(Worker.objects.count(), 20)
+        self.assertTrue(Task.assignees.through.objects.exists())
+        counters = stats.get_counters()
+        self.assertEqual(counters, stats.rebuild_dashboard_stats())
+        columns = list(
+            Worker.objects.order_by("pk").values_list("task_count", flat=True)
+        )
+        stats.recount()
+        self.assertEqual(
+            columns,
+            list(
+                Worker.objects.order_by("pk").values_list(
+                    "task_count", flat=True
+                )
+            ),
+        )
+        # Skewed draws load the first workers far more than the last.
+        self.assertGreater(columns[0], columns[-1])
+
+    def test_seed_without_workers_teams_or_tags(self):
+        created = seeding.seed(
+            workers=0, teams=0, projects=3, tasks=10, tags=0, random_seed=7
+        )
+
+        self.assertEqual(created["tasks"], 10)
+        self.assertEqual(created["projects"], 3)
+        self.assertFalse(Task.assignees.through.objects.exists())
+        self.assertFalse(Task.tags.through.objects.exists())
+        self.assertFalse(Project.teams.through.objects.exists())
+
+    def test_benchmark_reports_every_requested_route(self):
+        seeding.seed(workers=5, teams=1, projects=2, tasks=10, tags=2)
+
+        report = benchmark.run_benchmark(
+            iterations=2,
+            only=["task_manager:task-list", "worker-detail"],
+        )
+
+        self.assertEqual(
+            set(report["routes"]),
+            {"task_manager:task-list", "task_manager:worker-detail"},
+        )
+        for result in report["routes"].values():
+            self.assertEqual(result["status"], 200)
+            self.assertGreater(result["queries"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+        self.assertEqual(report["meta"]["rows"]["task"], 10)
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.lead = User.objects.create_user(
+            username="lead", password="test12345", first_name="Ada"
+        )
+        cls.member = User.objects.create_user(
+            username="member", password="x", first_name="Bob"
+        )
+        cls.team = Team.objects.create(name="Core", team_lead=cls.lead)
+        cls.team.workers.add(cls.member)
+        cls.project = Project.objects.create(name="Apollo", budget=1)
+        cls.project.teams.add(cls.team)
+        cls.task = Task.objects.create(
+            name="Launch",
+            deadline=datetime.date(2030, 1, 1),
+            is_completed=False,
+            priority="LOW",
+            task_type=TaskType.objects.create(name="Feature"),
+            project=cls.project,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.lead)
+
+    def test_cached_rows_skip_relation_queries(self):
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get("/teams/")
+        with CaptureQueriesContext(connection) as warm:
+            response = self.client.get("/teams/")
+
+        self.assertLess(len(warm), len(cold))
+        self.assertContains(response, "Apollo")
+
+    def test_changes_invalidate_exactly_the_affected_rows(self):
+        self.client.get("/teams/")
+        self.client.get("/workers/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lead.first_name = "Grace"
+            self.lead.save()
+            other = Project.objects.create(name="Gemini", budget=1)
+            other.teams.add(self.team)
+
+        response = self.client.get("/teams/")
+        self.assertContains(response, "Grace")
+        self.assertContains(response, "Gemini")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.team.name = "Platform"
+            self.team.save()
+        self.assertContains(self.client.get("/workers/"), "Platform")
+
+    def test_team_rows_follow_project_renames(self):
+        self.assertContains(self.client.get("/teams/"), "Apollo")
+
+        # No on-commit cache work runs, as when another process renames it.
+        with self.captureOnCommitCallbacks(execute=False):
+            self.project.name = "Artemis"
+            self.project.save()
+
+        response = self.client.get("/teams/")
+        self.assertContains(response, "Artemis")
+        self.assertNotContains(response, "Apollo")
+
+    def test_project_sections_follow_task_changes(self):
+        url = f"/projects/{self.project.pk}/detail/"
+        self.assertContains(self.client.get(url), "Launch")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/tasks/bulk/", {
+                "tasks": [self.task.pk], "action": "priority",
+                "priority": "CRITICAL",
+            })
+        self.assertContains(self.client.get(url), "Critical")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.name = "Liftoff"
+            self.task.save()
+            self.team.team_lead = self.member
+            self.team.save()
+        response = self.client.get(url)
+        self.assertContains(response, "Liftoff")
+        self.assertContains(response, "Bob")
+
+    def test_project_teams_follow_team_members(self):
+        url = f"/projects/{self.project.pk}/detail/"
+
+        def team_sizes():
+            return re.findall(
+                r"(\d+)\s*<i [^>]*>person</i>",
+                self.client.get(url).content.decode(),
+            )
+
+        self.assertEqual(team_sizes(), ["1"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.team.workers.add(self.lead)
+        self.assertEqual(team_sizes(), ["2"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.teams.clear()
+        self.assertEqual(team_sizes(), ["1"])
+
+
+class AdminMenuCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name="Viewers")
+        cls.group.permissions.add(
+            Permission.objects.get(codename="view_task")
+        )
+        cls.user = get_user_model().objects.create_user(
+            username="staff", password="test12345", is_staff=True
+        )
+        cls.user.groups.add(cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.session = SessionStore()
+
+    def menu(self):
+        request = RequestFactory().get("/admin/")
+        request.user = get_user_model().objects.get(pk=self.user.pk)
+        request.session = self.session
+        return {
+            model["name"]: model["url"]
+            for app in utils.get_menu_items({"request": request})
+            for model in app["items"]
+        }
+
+    def test_permissions_are_cached_in_the_session(self):
+        self.assertEqual(self.menu(), {"task": "/admin/task_manager/task/"})
+        with CaptureQueriesContext(connection) as queries:
+            self.menu()
+        # Only the user lookup of the helper and the version read remain.
+        self.assertEqual(len(queries), 2)
+
+    def test_changes_reach_sessions_of_every_process(self):
+        self.menu()
+        # The version lives in the database, not in this process's cache.
+        with self.captureOnCommitCallbacks(execute=False):
+            self.group.permissions.add(
+                Permission.objects.get(codename="view_project")
+            )
+        self.assertIn("project", self.menu())
+
+    def test_permission_changes_invalidate_sessions(self):
+        self.menu()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(
+                Permission.objects.get(codename="view_project")
+            )
+        self.assertIn("project", self.menu())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.clear()
+        self.assertEqual(self.menu(), {})
+
+
+# Root URLconf of the ASGI profile, used by AsyncViewTests.
+urlpatterns = [
+    path("admin/", admin.site.urls),
+    path("", include("task_manager.async_urls", namespace="task_manager")),
+    path("accounts/", include("django.contrib.auth.urls")),
+]
+
+
+@override_settings(ROOT_URLCONF="task_manager.tests")
+class AsyncViewTests(PendingVisitsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.worker = User.objects.create_user(
+            username="async", password="test12345", first_name="Ada"
+        )
+        cls.team = Team.objects.create(name="Core", team_lead=cls.worker)
+        cls.team.workers.add(cls.worker)
+        project = Project.objects.create(
+            name="Apollo", budget=1, status="IN_PROCESS"
+        )
+        project.teams.add(cls.team)
+        task = Task.objects.create(
+            name="Launch",
+            deadline=datetime.date(2030, 1, 1),
+            is_completed=False,
+            priority="LOW",
+            task_type=TaskType.objects.create(name="Feature"),
+            project=project,
+        )
+        task.assignees.add(cls.worker)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    async def test_read_heavy_pages_are_served_async(self):
+        client = AsyncClient()
+        await client.aforce_login(self.worker)
+
+        for name in ASYNC_VIEWS:
+            url = reverse(f"task_manager:{name}")
+            self.assertTrue(iscoroutinefunction(resolve(url).func))
+            response = await client.get(url)
+            self.assertEqual(response.status_code, 200, name)
+            self.assertEqual(
+                [task["name"] for task in response.context["user_tasks"]],
+                ["Launch"],
+            )
+
+        response = await client.get(reverse("task_manager:team-list"))
+        self.assertContains(response, "Apollo")
+        self.assertEqual(response.context["segment"], "teams")
+
+    async def test_dashboard_counts_visits(self):
+        client = AsyncClient()
+        await client.aforce_login(self.worker)
+        await client.get("/")
+        response = await client.get("/")
+
+        self.assertEqual(response.context["visit_times"], 2)
+        self.assertEqual(response.context["total_tasks_in_process"], 1)
+        self.assertEqual(
+            [project.name for project in response.context["projects"]],
+            ["Apollo"],
+        )
+
+    async def test_lists_require_login(self):
+        response = await AsyncClient().get("/teams/")
+
+        self.assertRedirects(
+            response, "/accounts/login/?next=/teams/",
+            fetch_redirect_response=False,
+        )
+
+    async def test_lists_follow_keyset_cursors(self):
+        await Team.objects.abulk_create(
+            [
+                Team(name=f"Team {index:02}", team_lead=self.worker)
+                for index in range(30)
+            ]
+        )
+        client = AsyncClient()
+        await client.aforce_login(self.worker)
+
+        first = await client.get("/teams/")
+        cursor = first.context["page_obj"].next_cursor
+        second = await client.get("/teams/", {"cursor": cursor})
+
+        names = [team.name for team in first.context["team_list"]]
+        names += [team.name for team in second.context["team_list"]]
+        self.assertEqual(len(names), 31)
+        self.assertEqual(names, sorted(names))
+
+    def test_throughput_benchmark(self):
+        report = benchmark.run_throughput_benchmark(
+            clients=3, requests=2, only=["team-list"]
+        )
+
+        result = report["routes"]["task_manager:team-list"]
+        self.assertEqual(result["status"], 200)
+        self.assertEqual(result["requests"], 6)
+        self.assertGreater(result["requests_per_second"], 0)
+
+
+class SQLiteTuningTests(SimpleTestCase):
+    def test_tuned_profile_removes_lock_errors(self):
+        # A separate process, as the stress threads open their own
+        # connections, which test cases do not allow.
+        output = subprocess.run(
+            [
+                sys.executable, "manage.py", "sqlite_stress",
+                "--threads", "6", "--transactions", "15",
+            ],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        report = json.loads(output)
+
+        # The threads read in lockstep, so with deferred transactions only
+        # one writer of each round commits.
+        default = report["default"]
+        self.assertEqual(default["lock_errors"], 15 * 5)
+        self.assertEqual(default["committed"], 15)
+        tuned = report["tuned"]
+        self.assertEqual(tuned["journal_mode"], "wal")
+        self.assertEqual(tuned["lock_errors"], 0)
+        self.assertEqual(tuned["committed"], tuned["attempted"])
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Primary and replica are two SQLite databases, synced by backup."""
+
+    # Resolved in setUpClass, once the replica alias exists.
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        connections.settings["replica"] = connections.configure_settings({
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": str(Path(cls.directory.name) / "replica.sqlite3"),
+            },
+        })["default"]
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        cls.directory.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        self.worker = get_user_model().objects.create_user(
+            username="reader", password="test12345"
+        )
+        Tag.objects.create(name="Replicated")
+        self.replicate()
+        Tag.objects.create(name="Lagging")
+        self.client.force_login(self.worker)
+
+    def replicate(self):
+        for alias in ("default", "replica"):
+            connections[alias].ensure_connection()
+        connections["default"].connection.backup(
+            connections["replica"].connection
+        )
+
+    def tag_names(self):
+        response = self.client.get("/tags/")
+        return {tag.name for tag in response.context["tag_list"]}
+
+    def test_read_only_views_read_the_replica(self):
+        self.assertEqual(self.tag_names(), {"Replicated"})
+
+    def test_writes_pin_reads_to_the_primary(self):
+        response = self.client.post("/tags/create/", {"name": "Mine"})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertTrue(Tag.objects.using("default").filter(name="Mine"))
+        self.assertEqual(
+            self.tag_names(), {"Replicated", "Lagging", "Mine"}
+        )
+
+        del self.client.cookies[PIN_COOKIE]
+        self.assertEqual(self.tag_names(), {"Replicated"})
+
+    def test_query_budgets_count_replica_reads(self):
+        with QueryRecorder() as recorder:
+            self.tag_names()
+
+        self.assertGreater(recorder.aliases["replica"], 0)
+        self.assertEqual(recorder.count, sum(recorder.aliases.values()))
+
+    def test_only_read_only_views_use_replicas(self):
+        router = ReplicaRouter()
+
+        self.assertEqual(router.db_for_read(Tag), "default")
+        self.assertEqual(router.db_for_write(Tag), "default")
+        lagging = Tag.objects.get(name="Lagging")
+        response = self.client.get(f"/tags/{lagging.pk}/update/")
+        self.assertEqual(response.context["object"], lagging)
+
+
+class JobQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="alice", password="x"
+        )
+        cls.task_type = TaskType.objects.create(name="Chore")
+        for number in range(3):
+            task = Task.objects.create(
+                name=f"Chore {number}",
+                deadline=datetime.date(2030, 1, 1),
+                is_completed=False,
+                priority="LOW",
+                task_type=cls.task_type,
+            )
+            task.assignees.add(cls.worker)
+
+    def setUp(self):
+        self.client.force_login(self.worker)
+
+    @staticmethod
+    def failing_handler(job):
+        raise RuntimeError("boom")
+
+    @override_settings(JOBS_INLINE_DELETE_LIMIT=1, JOBS_BATCH_SIZE=2)
+    def test_large_cascade_is_deleted_by_a_job(self):
+        response = self.client.post(
+            f"/task-types/{self.task_type.pk}/delete/"
+        )
+
+        self.assertRedirects(response, "/task-types/")
+        self.assertTrue(TaskType.objects.filter(pk=self.task_type.pk).exists())
+        job = Job.objects.get()
+        self.assertEqual(job.status, "QUEUED")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "DONE")
+        self.assertEqual((job.progress, job.total), (3, 3))
+        self.assertFalse(TaskType.objects.exists())
+        self.assertFalse(Task.objects.exists())
+        self.worker.refresh_from_db()
+        self.assertEqual(self.worker.open_task_count, 0)
+        self.assertEqual(stats.get_counters(), stats.rebuild_dashboard_stats())
+
+    def test_small_cascade_is_deleted_inline(self):
+        self.client.post(f"/task-types/{self.task_type.pk}/delete/")
+
+        self.assertFalse(TaskType.objects.exists())
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_INLINE_DELETE_LIMIT=0, JOBS_BATCH_SIZE=1)
+    def test_team_delete_job_settles_counters(self):
+        team = Team.objects.create(name="Core")
+        team.workers.add(self.worker)
+        project = Project.objects.create(name="Apollo", budget=1)
+        project.teams.add(team)
+
+        self.client.post(f"/teams/{team.pk}/delete/")
+        self.client.post(f"/teams/{team.pk}/delete/")
+        self.assertEqual(Job.objects.count(), 1)
+        jobs.run_pending()
+
+        self.assertFalse(Team.objects.exists())
+        project.refresh_from_db()
+        self.assertEqual(project.team_count, 0)
+        self.assertEqual(stats.get_counters()[stats.TEAMS], 0)
+
+    @override_settings(JOBS_RETRY_DELAY=60)
+    def test_failing_job_is_retried_with_backoff(self):
+        with mock.patch.dict(jobs.HANDLERS, {"fail": self.failing_handler}):
+            job = jobs.enqueue("fail", max_attempts=2)
+
+            jobs.run_pending()
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ("QUEUED", 1))
+            self.assertGreater(job.run_after, timezone.now())
+            self.assertEqual(jobs.run_pending(), [])
+
+            Job.objects.update(run_after=timezone.now())
+            jobs.run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("FAILED", 2))
+        self.assertIn("RuntimeError: boom", job.error)
+
+    def test_background_recount_repairs_counters(self):
+        Worker.objects.update(open_task_count=0)
+        Task.objects.update(assignee_count=5)
+
+        call_command("recount", "--background", stdout=io.StringIO())
+        (job,) = jobs.run_pending()
+
+        self.assertEqual(job.status, "DONE")
+        self.assertEqual(job.progress, job.total)
+        self.worker.refresh_from_db()
+        self.assertEqual(self.worker.open_task_count, 3)
+        self.assertFalse(Task.objects.exclude(assignee_count=1).exists())
+
+    def test_abandoned_job_is_claimed_again(self):
+        job = jobs.enqueue("recount")
+        Job.objects.update(
+            status="RUNNING",
+            attempts=1,
+            locked_at=timezone.now() - datetime.timedelta(hours=1),
+        )
+
+        self.assertEqual(jobs.claim("other").pk, job.pk)
+
+    @override_settings(JOBS_INLINE_IMPORT_BYTES=0)
+    def test_large_import_is_queued_and_reports_status(self):
+        upload = SimpleUploadedFile(
+            "tasks.ndjson",
+            b'{"name": "A", "deadline": "2030-01-01", "task_type": "Ops"}',
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(JOB_FILES_ROOT=directory):
+                response = self.client.post(
+                    "/tasks/import/", {"file": upload}
+                )
+                self.assertEqual(response.status_code, 202)
+                status_url = response.json()["status_url"]
+                self.assertEqual(
+                    self.client.get(status_url).json()["status"], "QUEUED"
+                )
+
+                jobs.run_pending()
+
+                self.assertEqual(list(Path(directory).rglob("*.*")), [])
+
+        status = self.client.get(status_url).json()
+        self.assertEqual(status["status"], "DONE")
+        self.assertEqual(status["result"]["created"], 1)
+        self.assertTrue(Task.objects.filter(name="A").exists())
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="alice", password="x"
+        )
+        cls.team = Team.objects.create(name="Core")
+        cls.project = Project.objects.create(
+            name="Apollo", budget=1, status="DONE"
+        )
+        cls.project.teams.add(cls.team)
+        task_type = TaskType.objects.create(name="Chore")
+        cls.old = Task.objects.create(
+            name="Old",
+            deadline=datetime.date(2000, 1, 1),
+            is_completed=True,
+            task_type=task_type,
+            project=cls.project,
+        )
+        cls.old.assignees.add(cls.worker)
+        cls.old.tags.add(Tag.objects.create(name="legacy"))
+        for name, is_completed in (("Recent", True), ("Open", False)):
+            Task.objects.create(
+                name=name,
+                deadline=datetime.date(2000, 1, 1)
+                if not is_completed else timezone.localdate(),
+                is_completed=is_completed,
+                task_type=task_type,
+            ).assignees.add(cls.worker)
+
+    def archive(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return archive.archive_tasks(batch_size=1)
+
+    def test_old_completed_tasks_move_with_their_links(self):
+        self.assertEqual(self.archive(), {"tasks": 1, "projects": 1})
+
+        self.assertEqual(
+            set(Task.objects.values_list("name", flat=True)),
+            {"Recent", "Open"},
+        )
+        archived = ArchivedTask.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.project_id, self.project.pk)
+        self.assertEqual(list(archived.assignees.all()), [self.worker])
+        self.assertEqual(
+            list(archived.tags.values_list("name", flat=True)), ["legacy"]
+        )
+        self.worker.refresh_from_db()
+        self.assertEqual(self.worker.task_count, 2)
+        self.assertEqual(stats.get_counters(), stats.rebuild_dashboard_stats())
+
+    def test_finished_projects_leave_the_default_manager(self):
+        self.archive()
+
+        self.assertFalse(Project.objects.exists())
+        self.assertTrue(
+            Project.all_objects.filter(pk=self.project.pk).exists()
+        )
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.project_count, 0)
+        self.assertEqual(stats.recount([Team]), {"task_manager.Team": 1})
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.project_count, 0)
+
+    def test_archive_page_shows_history(self):
+        self.archive()
+        self.client.force_login(self.worker)
+
+        self.assertNotContains(self.client.get("/tasks/"), "Old")
+        response = self.client.get("/tasks/archive/")
+        self.assertContains(response, "Old")
+        self.assertContains(response, "legacy")
+
+    def test_background_archival(self):
+        call_command("archive_tasks", "--background", stdout=io.StringIO())
+
+        (job,) = jobs.run_pending()
+
+        self.assertEqual(job.status, "DONE")
+        self.assertEqual((job.progress, job.total), (1, 1))
+        self.assertEqual(job.result, {"tasks": 1, "projects": 1})
+
+
+@override_settings(ACTIVITY_FLUSH_INTERVAL=3600)
+class ActivityCounterTests(PendingVisitsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="alice", password="x"
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.worker)
+        self.key = activity.visits_key(self.worker)
+
+    def test_visits_are_kept_in_memory_until_flushed(self):
+        for _ in range(3):
+            response = self.client.get("/")
+
+        self.assertEqual(response.context["visit_times"], 3)
+        self.assertFalse(ActivityCounter.objects.exists())
+
+        self.assertEqual(activity.flush(), 1)
+        self.assertEqual(ActivityCounter.objects.get(key=self.key).value, 3)
+        self.assertEqual(self.client.get("/").context["visit_times"], 4)
+        activity.flush()
+        self.assertEqual(ActivityCounter.objects.get(key=self.key).value, 4)
+
+    @override_settings(ACTIVITY_FLUSH_INTERVAL=0)
+    def test_due_counts_are_flushed_after_the_response(self):
+        self.client.get("/")
+
+        self.assertEqual(ActivityCounter.objects.get(key=self.key).value, 1)
+        self.assertEqual(activity.flush(), 0)
+
+    def test_read_only_pages_do_not_write(self):
+        for profile, engine in settings.SESSION_PROFILES.items():
+            with self.subTest(profile), self.settings(SESSION_ENGINE=engine):
+                # A new client, since middleware binds the session engine.
+                client = self.client_class()
+                client.force_login(self.worker)
+                client.get("/")
+                client.get("/tasks/")
+
+                with CaptureQueriesContext(connection) as queries:
+                    client.get("/")
+                    client.get("/tasks/")
+
+                writes = [
+                    query["sql"] for query in queries
+                    if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+                ]
+                self.assertEqual(writes, [])
+                if profile != "db":
+                    self.assertNotIn(
+                        "django_session",
+                        " ".join(query["sql"] for query in queries),
+                    )
+
+
+class ConditionalDetailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = get_user_model().objects.create_user(
+            username="alice", password="x", first_name="Alice"
+        )
+        cls.other = get_user_model().objects.create_user(
+            username="bob", password="x"
+        )
+        cls.team = Team.objects.create(name="Core", team_lead=cls.worker)
+        cls.team.workers.add(cls.worker)
+        cls.project = Project.objects.create(name="Apollo", budget=1)
+        cls.project.teams.add(cls.team)
+        cls.tag = Tag.objects.create(name="backend")
+        cls.task = Task.objects.create(
+            name="Ship",
+            description="",
+            deadline=datetime.date(2030, 1, 1),
+            is_completed=False,
+            task_type=TaskType.objects.create(name="Feature"),
+            project=cls.project,
+        )
+        cls.task.assignees.add(cls.worker)
+        cls.task.tags.add(cls.tag)
+        cls.urls = {
+            "task": reverse("task_manager:task-detail", args=[cls.task.pk]),
+            "team": reverse("task_manager:team-detail", args=[cls.team.pk]),
+            "project": reverse(
+                "task_manager:project-detail", args=[cls.project.pk]
+            ),
+            "worker": reverse(
+                "task_manager:worker-detail", args=[cls.worker.pk]
+            ),
+        }
+
+    def setUp(self):
+        # Without pending tasks of their own, so the sidebar stays put.
+        self.client.force_login(self.other)
+
+    def etags(self) -> dict:
+        return {
+            page: self.client.get(url)["ETag"]
+            for page, url in self.urls.items()
+        }
+
+    def changed_pages(self, change) -> set:
+        before = self.etags()
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        after = self.etags()
+        return {page for page in before if before[page] != after[page]}
+
+    def test_unchanged_pages_are_not_rendered_again(self):
+        for page, url in self.urls.items():
+            with self.subTest(page):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("private", response["Cache-Control"])
+
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response["ETag"]
+                    )
+                self.assertEqual(response.status_code, 304)
+                # Session and user, then the stamp; no page queries.
+                self.assertEqual(len(queries), 3)
+
+    def test_missing_objects_are_still_not_found(self):
+        url = reverse("task_manager:task-detail", args=[0])
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_viewers_get_their_own_tags(self):
+        etag = self.client.get(self.urls["task"])["ETag"]
+        self.client.force_login(self.worker)
+
+        response = self.client.get(self.urls["task"], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_own_edits_change_the_page(self):
+        def rename():
+            self.task.name = "Ship it"
+            self.task.save()
+
+        self.assertEqual(
+            self.changed_pages(rename), {"task", "project", "worker"}
+        )
+
+    def test_related_rows_change_the_page(self):
+        def rename_tag():
+            self.tag.name = "api"
+            self.tag.save()
+
+        def rename_worker():
+            self.worker.first_name = "Alicia"
+            self.worker.save()
+
+        def rename_project():
+            self.project.name = "Gemini"
+            self.project.save()
+
+        self.assertEqual(self.changed_pages(rename_tag), {"task"})
+        self.assertEqual(
+            self.changed_pages(rename_worker),
+            {"task", "team", "project", "worker"},
+        )
+        self.assertEqual(
+            self.changed_pages(rename_project), {"task", "team", "project"}
+        )
+
+    def test_relation_changes_change_the_page(self):
+        self.assertEqual(
+            self.changed_pages(lambda: self.team.workers.add(self.other)),
+            {"team", "project", "worker"},
+        )
+        self.assertEqual(
+            self.changed_pages(lambda: self.task.tags.clear()), {"task"}
+        )
+
+    def test_bulk_actions_change_the_page(self):
+        self.assertEqual(
+            self.changed_pages(
+                lambda: apply_bulk_action([self.task.pk], "priority", "LOW")
+            ),
+            {"task", "project", "worker"},
+        )
+        other = Project.objects.create(name="Gemini", budget=1)
+        self.assertEqual(
+            self.changed_pages(
+                lambda: apply_bulk_action([self.task.pk], "project", other)
+            ),
+            {"task", "project"},
+        )
+        self.assertEqual(
+            self.changed_pages(
+                lambda: apply_bulk_action(
+                    [self.task.pk], "remove_tag", self.tag
+                )
+            ),
+            {"task"},
+        )
+
+
+class WorkloadTests(PendingVisitsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.position = Position.objects.create(name="Developer")
+        cls.alice = User.objects.create_user(
+            username="alice", password="x", position=cls.position
+        )
+        cls.bob = User.objects.create_user(
+            username="bob", password="x", position=cls.position
+        )
+        cls.idle = User.objects.create_user(username="idle", password="x")
+        cls.team = Team.objects.create(name="Core")
+        cls.team.workers.set([cls.alice, cls.bob])
+        task_type = TaskType.objects.create(name="Feature")
+        past, future = datetime.date(2000, 1, 1), datetime.date(2100, 1, 1)
+        for priority, deadline, is_completed, assignees in (
+            ("CRITICAL", past, False, [cls.alice, cls.bob]),
+            ("LOW", future, False, [cls.alice]),
+            ("HIGH", past, True, [cls.bob]),
+        ):
+            Task.objects.create(
+                name=priority,
+                description="",
+                deadline=deadline,
+                is_completed=is_completed,
+                priority=priority,
+                task_type=task_type,
+            ).assignees.set(assignees)
+
+    def setUp(self):
+        super().setUp()
+        cache.delete_many([workload.CACHE_KEY, workload.REFRESH_KEY])
+
+    def test_load_is_split_between_assignees(self):
+        result = workload.compute_workload()
+        workers = {row["name"]: row for row in result["workers"]}
+
+        # The critical task weighs 8, shared by two; the low one weighs 1.
+        self.assertEqual(
+            [row["name"] for row in result["workers"]],
+            ["alice", "bob", "idle"],
+        )
+        self.assertEqual(
+            (workers["alice"]["load"], workers["alice"]["open_tasks"]),
+            (5, 2),
+        )
+        self.assertEqual(workers["alice"]["overdue_ratio"], 0.5)
+        self.assertEqual(
+            (workers["bob"]["load"], workers["bob"]["overdue_ratio"]), (4, 1)
+        )
+        self.assertEqual(workers["idle"]["load"], 0)
+        self.assertEqual(result["assignments"], 3)
+
+        [team] = result["teams"]
+        self.assertEqual(
+            (team["members"], team["open_tasks"], team["overdue_tasks"]),
+            (2, 3, 2),
+        )
+        self.assertEqual(team["load"], 9)
+        [position] = result["positions"]
+        self.assertEqual(position["load"], 9)
+
+    @skipUnless(workload.numpy, "NumPy is not installed")
+    def test_numpy_and_python_engines_agree(self):
+        links = [
+            (pk, worker, pk % 4 + 1, pk % 3 == 0)
+            for pk in range(1, 500)
+            for worker in range(pk % 5 + 1)
+        ]
+        expected = workload._per_worker_python(links)
+        actual = workload._per_worker_numpy(links)
+
+        self.assertEqual(actual.keys(), expected.keys())
+        for worker, (count, overdue, load) in expected.items():
+            self.assertEqual(actual[worker][:2], (count, overdue))
+            self.assertAlmostEqual(actual[worker][2], load)
+
+    @skipUnless(workload.numpy, "NumPy is not installed")
+    def test_both_engines_compute_the_same_workload(self):
+        result = workload.compute_workload()
+        with mock.patch.object(workload, "numpy", None):
+            fallback = workload.compute_workload()
+
+        self.assertEqual(
+            (result["engine"], fallback["engine"]), ("numpy", "python")
+        )
+        for key in ("workers", "teams", "positions"):
+            self.assertEqual(result[key], fallback[key])
+
+    def test_links_carry_their_own_task_columns(self):
+        links = workload.load_links(datetime.date(2050, 1, 1))
+
+        self.assertCountEqual(
+            [link[1:] for link in links],
+            [
+                (self.alice.pk, 8, True),
+                (self.bob.pk, 8, True),
+                (self.alice.pk, 1, False),
+            ],
+        )
+
+    def test_endpoint_and_dashboard_panel(self):
+        url = reverse("task_manager:workload")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(self.alice)
+        # Requests only queue the computation.
+        response = self.client.get("/")
+        self.assertIsNone(response.context["busiest_workers"])
+        self.assertContains(response, "Computing the workload")
+        self.assertEqual(self.client.get(url).status_code, 202)
+        [job] = jobs.run_pending()
+        self.assertEqual(job.name, "workload")
+
+        data = self.client.get(url).json()
+        self.assertEqual(data["workers"][0]["name"], "alice")
+        busiest = self.client.get("/").context["busiest_workers"]
+        self.assertEqual([row["name"] for row in busiest], ["alice", "bob"])
+
+    def test_stale_snapshots_queue_one_refresh(self):
+        self.client.force_login(self.alice)
+        jobs.enqueue("workload")
+        jobs.run_pending()
+
+        with self.settings(WORKLOAD_CACHE_TIMEOUT=0):
+            self.client.get("/")
+            self.client.get("/")
+            busiest = self.client.get("/").context["busiest_workers"]
+
+        # The stale snapshot is still shown while the next one is queued.
+        self.assertEqual(len(busiest), 2)
+        self.assertEqual(
+            Job.objects.filter(name="workload", status="QUEUED").count(), 1
+        )
+        # The previous snapshot is kept until the new one is stored.
+        [job] = jobs.run_pending()
+        self.assertEqual(Job.objects.filter(name="workload").count(), 2)
+        jobs.enqueue("workload")
+        [newest] = jobs.run_pending()
+        self.assertEqual(
+            set(Job.objects.filter(name="workload").values_list(
+                "pk", flat=True
+            )),
+            {job.pk, newest.pk},
+        )
+
+
+class SchedulingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.alice, cls.bob, cls.carol, cls.dave = [
+            User.objects.create_user(username=name, password="x")
+            for name in ("alice", "bob", "carol", "dave")
+        ]
+        team = Team.objects.create(name="Core")
+        team.workers.set([cls.alice, cls.bob, cls.carol])
+        Team.objects.create(name="Other").workers.add(cls.dave)
+        cls.project = Project.objects.create(name="Apollo", budget=1)
+        cls.project.teams.add(team)
+        cls.task_type = TaskType.objects.create(name="Feature")
+        # Alice is already busy elsewhere.
+        cls.create_task("Busy", "HIGH").assignees.add(cls.alice)
+        cls.tasks = [
+            cls.create_task(f"Task {day}", "MEDIUM", cls.project, day)
+            for day in range(1, 5)
+        ]
+
+    @classmethod
+    def create_task(cls, name, priority, project=None, day=1):
+        return Task.objects.create(
+            name=name,
+            description="",
+            deadline=datetime.date(2030, 1, day),
+            is_completed=False,
+            priority=priority,
+            task_type=cls.task_type,
+            project=project,
+        )
+
+    def assignees(self) -> dict:
+        return {
+            task.name: [worker.username for worker in task.assignees.all()]
+            for task in Task.objects.filter(project=self.project)
+        }
+
+    def test_tasks_go_to_the_least_loaded_members(self):
+        plan = scheduling.plan_assignments(self.project)
+
+        self.assertEqual(
+            plan,
+            [
+                (self.tasks[0].pk, self.bob.pk),
+                (self.tasks[1].pk, self.carol.pk),
+                (self.tasks[2].pk, self.bob.pk),
+                (self.tasks[3].pk, self.carol.pk),
+            ],
+        )
+
+    def test_urgent_tasks_are_handed_out_first(self):
+        urgent = self.create_task("Urgent", "CRITICAL", self.project, 4)
+
+        plan = dict(scheduling.plan_assignments(self.project))
+        # Due the same day as Task 4, it goes first, to the least loaded
+        # member; Task 4 is left for Alice.
+        self.assertEqual(plan[urgent.pk], self.carol.pk)
+        self.assertEqual(plan[self.tasks[3].pk], self.alice.pk)
+
+    def test_dry_run_writes_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = scheduling.assign_tasks(self.project, dry_run=True)
+
+        self.assertEqual(result["assigned"], 4)
+        self.assertEqual(
+            set(map(tuple, self.assignees().values())), {()}
+        )
+
+    def test_assignment_settles_counters(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            scheduling.assign_tasks(self.project)
+
+        self.assertEqual(
+            self.assignees(),
+            {
+                "Task 1": ["bob"],
+                "Task 2": ["carol"],
+                "Task 3": ["bob"],
+                "Task 4": ["carol"],
+            },
+        )
+        self.bob.refresh_from_db()
+        self.assertEqual(self.bob.open_task_count, 2)
+        self.assertEqual(
+            set(Task.objects.filter(project=self.project).values_list(
+                "assignee_count", flat=True
+            )),
+            {1},
+        )
+        self.assertEqual(scheduling.plan_assignments(self.project), [])
+
+    def task_form(self, **data):
+        tag = Tag.objects.create(name=f"tag{Tag.objects.count()}")
+        return {
+            "name": "Fresh",
+            "description": "x",
+            "deadline": "2030-01-01",
+            "priority": "LOW",
+            "task_type": self.task_type.pk,
+            "tags": [tag.pk],
+            **data,
+        }
+
+    def test_new_tasks_without_assignees_are_assigned(self):
+        self.client.force_login(self.alice)
+
+        self.client.post(
+            reverse("task_manager:task-create"),
+            self.task_form(project=self.project.pk),
+        )
+
+        self.assertEqual(self.assignees()["Fresh"], ["bob"])
+        self.assertEqual(self.assignees()["Task 1"], [])
+
+    def test_assignees_are_required_unless_a_team_can_take_the_task(self):
+        lonely = Project.objects.create(name="Lonely", budget=1)
+
+        for data in ({}, {"project": lonely.pk}):
+            with self.subTest(data):
+                self.assertIn(
+                    "assignees", TaskForm(self.task_form(**data)).errors
+                )
+        self.assertTrue(
+            TaskForm(self.task_form(project=self.project.pk)).is_valid()
+        )
+        edited = TaskForm(
+            self.task_form(project=self.project.pk), instance=self.tasks[0]
+        )
+        self.assertIn("assignees", edited.errors)
+
+    def test_failed_assignment_rolls_back_the_new_task(self):
+        self.client.force_login(self.alice)
+
+        with mock.patch.object(
+            scheduling, "assign_tasks", side_effect=RuntimeError
+        ), self.assertRaises(RuntimeError):
+            self.client.post(
+                reverse("task_manager:task-create"),
+                self.task_form(project=self.project.pk),
+            )
+
+        self.assertFalse(Task.objects.filter(name="Fresh").exists())
+
+    def test_endpoint_and_command(self):
+        self.client.force_login(self.alice)
+        url = reverse("task_manager:project-assign", args=[self.project.pk])
+
+        data = self.client.post(url, {"dry_run": "1"}).json()
+        self.assertEqual((data["dry_run"], data["assigned"]), (True, 4))
+        self.assertEqual(self.assignees()["Task 1"], [])
+
+        output = io.StringIO()
+        call_command("assign_tasks", stdout=output)
+        self.assertIn("Assigned 4 tasks.", output.getvalue())
+        self.assertEqual(self.assignees()["Task 1"], ["bob"])
+
+    def test_benchmark_leaves_no_rows(self):
+        tasks = Task.objects.count()
+
+        report = benchmark.run_assignment_benchmark(tasks=50, workers=5)
+
+        self.assertEqual(report["assigned"], 50)
+        self.assertLessEqual(
+            report["load_after"]["stdev"], report["load_before"]["stdev"]
+        )
+        self.assertEqual(Task.objects.count(), tasks)
+
+
+class StaticPipelineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.static_root.cleanup)
+        storages = {
+            **settings.STORAGES,
+            "staticfiles": {
+                "BACKEND": "task_manager.assets.PipelineStaticFilesStorage",
+            },
+        }
+        with override_settings(
+            STATIC_ROOT=cls.static_root.name, STORAGES=storages
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+        cls.manifest = json.loads(
+            (Path(cls.static_root.name) / "staticfiles.json").read_text()
+        )["paths"]
+
+    def setUp(self):
+        overrides = self.settings(STATIC_ROOT=self.static_root.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.middleware = assets.StaticAssetMiddleware(
+            lambda request: HttpResponse(status=404)
+        )
+
+    def get(self, name, **headers):
+        request = RequestFactory().get(settings.STATIC_URL + name, **headers)
+        return self.middleware(request)
+
+    def test_minify_css(self):
+        self.assertEqual(
+            assets.minify_css(
+                '/* note */\n.a ,\n.b > p {\n  content: "a  ;  b";\n'
+                "  color: red;\n}\n"
+            ),
+            '.a,.b>p{content:"a  ;  b";color:red}',
+        )
+
+    def test_bundle_tag_follows_the_pipeline_setting(self):
+        template = Template(
+            '{% load bundles %}{% bundle "assets/js/app.bundle.js" %}'
+        )
+
+        with self.settings(STATIC_PIPELINE=False):
+            html = template.render(Context())
+        sources = assets.BUNDLES["assets/js/app.bundle.js"]
+        self.assertEqual(html.count("<script"), len(sources))
+        with self.settings(STATIC_PIPELINE=True):
+            html = template.render(Context())
+        self.assertEqual(html.count("<script"), 1)
+        self.assertIn("app.bundle.js", html)
+
+    def test_bundles_are_built_and_precompressed(self):
+        hashed = self.manifest["assets/css/app.bundle.css"]
+        root = Path(self.static_root.name)
+        source = (root / "assets/css/material-dashboard.css").stat().st_size
+
+        self.assertLess((root / hashed).stat().st_size, source)
+        self.assertLess(
+            (root / f"{hashed}.gz").stat().st_size,
+            (root / hashed).stat().st_size / 4,
+        )
+        script = (root / self.manifest["assets/js/app.bundle.js"]).read_text()
+        self.assertNotIn("sourceMappingURL", script)
+
+    def test_hashed_files_are_immutable_and_precompressed(self):
+        hashed = self.manifest["assets/js/app.bundle.js"]
+
+        response = self.get(hashed, HTTP_ACCEPT_ENCODING="br;q=0, gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Cache-Control"], assets.IMMUTABLE_CACHE_CONTROL
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["Content-Type"], "text/javascript")
+        response.close()
+
+        response = self.get(hashed)
+        self.assertNotIn("Content-Encoding", response)
+        response.close()
+
+        response = self.get(hashed, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_unhashed_names_revalidate(self):
+        response = self.get("assets/js/app.bundle.js")
+
+        self.assertEqual(
+            response["Cache-Control"], assets.REVALIDATE_CACHE_CONTROL
+        )
+        response.close()
+        self.assertEqual(self.get("assets/missing.js").status_code, 404)
@@ -0,0 +1,405 @@
+"""
+Streaming task import/export in CSV and NDJSON.
+
+A task record is flat: related objects are referenced by name (task type,
+project, tags) or username (assignees), so files move between instances
+whose primary keys differ.  Both directions work in fixed-size batches, so
+memory use does not depend on the size of the file or the table.
+"""
+
+import csv
+import datetime
+import io
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.db import connection, transaction
+
+from task_manager import search, stats
+from task_manager.caching import invalidate_pending_tasks
+from task_manager.models import Project, Tag, Task, TaskType, Worker
+
+
+FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+FIELDS = (
+    "name",
+    "description",
+    "deadline",
+    "is_completed",
+    "priority",
+    "task_type",
+    "project",
+    "assignees",
+    "tags",
+)
+# Separator for the multi-valued columns in CSV.
+LIST_SEPARATOR = "|"
+DEFAULT_BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 50
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def guess_format(filename, default="csv"):
+    suffix = str(filename).rsplit(".", 1)[-1].lower()
+    if suffix in ("ndjson", "jsonl"):
+        return "ndjson"
+    if suffix == "csv":
+        return "csv"
+    return default
+
+
+# Export
+
+
+def iter_task_records(chunk_size=DEFAULT_BATCH_SIZE):
+    """Yield every task as a plain dict, ``chunk_size`` rows at a time."""
+    rows = Task.objects.order_by("pk").values_list(
+        "pk",
+        "name",
+        "description",
+        "deadline",
+        "is_completed",
+        "priority",
+        "task_type__name",
+        "project__name",
+    ).iterator(chunk_size=chunk_size)
+
+    for chunk in batched(rows, chunk_size):
+        ids = [row[0] for row in chunk]
+        assignees = _group(
+            Task.assignees.through.objects.filter(task_id__in=ids)
+            .values_list("task_id", "worker__username")
+        )
+        tags = _group(
+            Task.tags.through.objects.filter(task_id__in=ids)
+            .values_list("task_id", "tag__name")
+        )
+        for pk, *values in chunk:
+            record = dict(zip(FIELDS[:7], values))
+            record["assignees"] = assignees.get(pk, [])
+            record["tags"] = tags.get(pk, [])
+            yield record
+
+
+def _group(pairs):
+    grouped = defaultdict(list)
+    for key, value in pairs:
+        grouped[key].append(value)
+    return grouped
+
+
+class _LineBuffer:
+    """File-like object whose ``write`` returns what it was given."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(records):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(FIELDS)
+    for record in records:
+        yield writer.writerow([
+            record["name"],
+            record["description"],
+            record["deadline"].isoformat(),
+            "true" if record["is_completed"] else "false",
+            record["priority"],
+            record["task_type"],
+            record["project"] or "",
+            LIST_SEPARATOR.join(record["assignees"]),
+            LIST_SEPARATOR.join(record["tags"]),
+        ])
+
+
+def iter_ndjson(records):
+    for record in records:
+        record["deadline"] = record["deadline"].isoformat()
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def iter_export(file_format, chunk_size=DEFAULT_BATCH_SIZE):
+    """Yield the serialized export, one line at a time."""
+    records = iter_task_records(chunk_size)
+    if file_format == "ndjson":
+        return iter_ndjson(records)
+    return iter_csv(records)
+
+
+# Import
+
+
+class RecordError(ValueError):
+    pass
+
+
+def read_records(stream, file_format):
+    """
+    Yield ``(line number, record)`` from a binary or text stream.
+
+    The stream is read lazily, line by line.
+    """
+    if isinstance(stream.read(0), bytes):
+        stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if file_format == "ndjson":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield line_number, RecordError(f"invalid JSON: {error}")
+                continue
+            if not isinstance(record, dict):
+                record = RecordError("expected a JSON object")
+            yield line_number, record
+        return
+
+    reader = csv.DictReader(stream)
+    for record in reader:
+        for key in ("assignees", "tags"):
+            value = record.get(key) or ""
+            record[key] = [
+                item for item in value.split(LIST_SEPARATOR) if item
+            ]
+        yield reader.line_num, record
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    normalized = str(value).strip().lower()
+    if normalized in ("1", "true", "yes", "y"):
+        return True
+    if normalized in ("0", "false", "no", "n", ""):
+        return False
+    raise RecordError(f"is_completed: {value!r} is not a boolean")
+
+
+def _text(record, field):
+    value = record.get(field)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise RecordError(f"{field}: {value!r} is not a string")
+    return value
+
+
+def _names(record, field):
+    value = record.get(field) or []
+    if not isinstance(value, list) or not all(
+        isinstance(item, str) for item in value
+    ):
+        raise RecordError(f"{field} must be a list of strings")
+    return value
+
+
+def clean_record(record):
+    """Validate one raw record; returns a normalized copy."""
+    if isinstance(record, RecordError):
+        raise record
+    if not isinstance(record, dict):
+        raise RecordError("expected a JSON object")
+    name = _text(record, "name").strip()
+    task_type = _text(record, "task_type").strip()
+    if not name:
+        raise RecordError("name is required")
+    if not task_type:
+        raise RecordError("task_type is required")
+    try:
+        deadline = datetime.date.fromisoformat(str(record.get("deadline")))
+    except ValueError:
+        raise RecordError(
+            f"deadline: {record.get('deadline')!r} is not a YYYY-MM-DD date"
+        )
+    priority = _text(record, "priority") or "MEDIUM"
+    if priority not in dict(Task.PRIORITY_CHOICES):
+        raise RecordError(f"priority: {priority!r} is not a valid choice")
+
+    return {
+        "name": name[:255],
+        "description": _text(record, "description"),
+        "deadline": deadline,
+        "is_completed": _parse_bool(record.get("is_completed", False)),
+        "priority": priority,
+        "task_type": task_type,
+        "project": _text(record, "project").strip(),
+        "assignees": _names(record, "assignees"),
+        "tags": _names(record, "tags"),
+    }
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+        self.unknown_assignees = set()
+
+    def add_error(self, line_number, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line_number}: {message}")
+
+    def add_unknown_assignee(self, username):
+        if len(self.unknown_assignees) < MAX_REPORTED_ERRORS:
+            self.unknown_assignees.add(username)
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "unknown_assignees": sorted(self.unknown_assignees),
+        }
+
+
+class _NameCache:
+    """Name -> pk lookups, creating missing rows in one bulk insert."""
+
+    def __init__(self, model, field="name", create=True, defaults=None):
+        self.model = model
+        self.field = field
+        self.create = create
+        self.defaults = defaults or {}
+        self.ids = {}
+
+    def resolve(self, names) -> int:
+        """Look up ``names``; returns how many rows had to be created."""
+        missing = {name for name in names if name not in self.ids}
+        if not missing:
+            return 0
+        for pk, name in self.model.objects.filter(
+            **{f"{self.field}__in": missing}
+        ).order_by("pk").values_list("pk", self.field):
+            self.ids.setdefault(name, pk)
+        missing -= self.ids.keys()
+        if not missing or not self.create:
+            return 0
+        created = self.model.objects.bulk_create([
+            self.model(**{self.field: name}, **self.defaults)
+            for name in sorted(missing)
+        ])
+        for obj in created:
+            self.ids[getattr(obj, self.field)] = obj.pk
+        return len(created)
+
+
+def import_tasks(
+    stream, file_format, batch_size=DEFAULT_BATCH_SIZE, on_batch=None
+):
+    """
+    Import tasks from ``stream``; returns an ``ImportResult``.
+
+    Task types, tags and projects that do not exist yet are created
+    (projects with a zero budget).  Unknown assignee usernames are
+    reported and skipped.  Each batch commits in its own transaction,
+    after which ``on_batch`` is called with the result so far.
+    """
+    if not connection.features.can_return_rows_from_bulk_insert:
+        raise NotImplementedError(
+            "Bulk task import needs a database backend that returns primary "
+            "keys from bulk inserts."
+        )
+
+    result = ImportResult()
+    caches = {
+        "task_type": _NameCache(TaskType),
+        "project": _NameCache(Project, defaults={"budget": 0}),
+        "tags": _NameCache(Tag),
+        "assignees": _NameCache(Worker, field="username", create=False),
+    }
+
+    for batch in batched(read_records(stream, file_format), batch_size):
+        cleaned = []
+        for line_number, record in batch:
+            try:
+                cleaned.append(clean_record(record))
+            except RecordError as error:
+                result.add_error(line_number, error)
+        if cleaned:
+            with transaction.atomic():
+                _import_batch(cleaned, caches, result)
+        if on_batch is not None:
+            on_batch(result)
+
+    return result
+
+
+def _import_batch(records, caches, result):
+    caches["task_type"].resolve({r["task_type"] for r in records})
+    new_projects = caches["project"].resolve(
+        {r["project"] for r in records if r["project"]}
+    )
+    caches["tags"].resolve({tag for r in records for tag in r["tags"]})
+    caches["assignees"].resolve(
+        {username for r in records for username in r["assignees"]}
+    )
+    worker_ids = caches["assignees"].ids
+    tag_ids = caches["tags"].ids
+
+    tasks = []
+    for record in records:
+        assignees = {
+            worker_ids[username]
+            for username in record["assignees"]
+            if username in worker_ids
+        }
+        for username in record["assignees"]:
+            if username not in worker_ids:
+                result.add_unknown_assignee(username)
+        record["assignee_ids"] = assignees
+        record["tag_ids"] = {tag_ids[tag] for tag in record["tags"]}
+        tasks.append(Task(
+            name=record["name"],
+            description=record["description"],
+            deadline=record["deadline"],
+            is_completed=record["is_completed"],
+            priority=record["priority"],
+            task_type_id=caches["task_type"].ids[record["task_type"]],
+            project_id=caches["project"].ids.get(record["project"]),
+            assignee_count=len(assignees),
+            tag_count=len(record["tag_ids"]),
+        ))
+
+    Task.objects.bulk_create(tasks)
+
+    assignment_model = Task.assignees.through
+    tagging_model = Task.tags.through
+    assignment_model.objects.bulk_create([
+        assignment_model(task_id=task.pk, worker_id=worker_id)
+        for task, record in zip(tasks, records)
+        for worker_id in record["assignee_ids"]
+    ], batch_size=DEFAULT_BATCH_SIZE)
+    tagging_model.objects.bulk_create([
+        tagging_model(task_id=task.pk, tag_id=tag_id)
+        for task, record in zip(tasks, records)
+        for tag_id in record["tag_ids"]
+    ], batch_size=DEFAULT_BATCH_SIZE)
+
+    # bulk_create skips the signal handlers, so settle counters and the
+    # search index here.
+    touched_workers = set().union(*(r["assignee_ids"] for r in records))
+    stats.increment(stats.ACTIVE_PROJECTS, new_projects)
+    stats.increment(
+        stats.TASKS_IN_PROCESS,
+        sum(not task.is_completed for task in tasks),
+    )
+    stats.refresh_counts(Worker, touched_workers)
+    stats.refresh_counts(Project, {task.project_id for task in tasks})
+    invalidate_pending_tasks(touched_workers)
+    search.index_objects(Task, [task.pk for task in tasks])
+    # Project documents list the names of their tasks.
+    search.index_objects(Project, {task.project_id for task in tasks})
+    result.created += len(tasks)
@@ -2,8 +2,14 @@ from django.urls import path
 from task_manager.views import (
     index,
     TaskListView,
+    ArchivedTaskListView,
     TaskDeleteView,
     TaskCreateView,
+    TaskBulkActionView,
+    TaskExportView,
+    TaskImportView,
+    JobDetailView,
+    WorkloadView,
     TagListView,
     TagDeleteView,
     TagUpdateView,
@@ -24,6 +30,7 @@ from task_manager.views import (
     TeamCreateView,
     WorkerListView,
     WorkerDetailView,
+    WorkerTaskListView,
     WorkerCreateView,
     WorkerUpdateView,
     WorkerDeleteView,
@@ -32,17 +39,32 @@ from task_manager.views import (
     ProjectUpdateView,
     ProjectDeleteView,
     ProjectDetailView,
+    ProjectAssignView,
+    SearchView,
+    ChoiceLookupView,
 )
 from task_manager.views import TaskUpdateView
+from task_manager.api import (
+    TaskApiView,
+    ProjectApiView,
+    TeamApiView,
+    WorkerApiView,
+)
 
 
 urlpatterns = [
     path("", index, name="index"),
     path("tasks/", TaskListView.as_view(), name="task-list"),
+    path("tasks/archive/", ArchivedTaskListView.as_view(), name="task-archive"),
     path("tasks/<int:pk>/update/", TaskUpdateView.as_view(), name="task-update"),
     path("tasks/<int:pk>/delete/", TaskDeleteView.as_view(), name="task-delete"),
     path("tasks/<int:pk>/detail/", TaskDetailView.as_view(), name="task-detail"),
     path("tasks/create/", TaskCreateView.as_view(), name="task-create"),
+    path("tasks/bulk/", TaskBulkActionView.as_view(), name="task-bulk"),
+    path("tasks/export/", TaskExportView.as_view(), name="task-export"),
+    path("tasks/import/", TaskImportView.as_view(), name="task-import"),
+    path("jobs/<int:pk>/", JobDetailView.as_view(), name="job-detail"),
+    path("workload/", WorkloadView.as_view(), name="workload"),
     path("tags/", TagListView.as_view(), name="tag-list"),
     path("tags/<int:pk>/delete/", TagDeleteView.as_view(), name="tag-delete"),
     path("tags/<int:pk>/update/", TagUpdateView.as_view(), name="tag-update"),
@@ -62,6 +84,7 @@ urlpatterns = [
     path("teams/create/", TeamCreateView.as_view(), name="team-create"),
     path("workers/", WorkerListView.as_view(), name="worker-list"),
     path("workers/<int:pk>/detail/", WorkerDetailView.as_view(), name="worker-detail"),
+    path("workers/<int:pk>/tasks/<str:status>/", WorkerTaskListView.as_view(), name="worker-tasks"),
     path("workers/create/", WorkerCreateView.as_view(), name="worker-create"),
     path("workers/<int:pk>/update/", WorkerUpdateView.as_view(), name="worker-update"),
     path("workers/<int:pk>/delete/", WorkerDeleteView.as_view(), name="worker-delete"),
@@ -69,7 +92,18 @@ urlpatterns = [
     path("projects/<int:pk>/detail/", ProjectDetailView.as_view(), name="project-detail"),
     path("projects/create/", ProjectCreateView.as_view(), name="project-create"),
     path("projects/<int:pk>/update", ProjectUpdateView.as_view(), name="project-update"),
-    path("projects/<int:pk>/delete/", ProjectDeleteView.as_view(), name="project-delete")
+    path("projects/<int:pk>/delete/", ProjectDeleteView.as_view(), name="project-delete"),
+    path("projects/<int:pk>/assign/", ProjectAssignView.as_view(), name="project-assign"),
+    path("search/", SearchView.as_view(), name="search"),
+    path("lookup/<str:kind>/", ChoiceLookupView.as_view(), name="lookup"),
+    path("api/v1/tasks/", TaskApiView.as_view(), name="api-task-list"),
+    path("api/v1/tasks/<int:pk>/", TaskApiView.as_view(), name="api-task-detail"),
+    path("api/v1/projects/", ProjectApiView.as_view(), name="api-project-list"),
+    path("api/v1/projects/<int:pk>/", ProjectApiView.as_view(), name="api-project-detail"),
+    path("api/v1/teams/", TeamApiView.as_view(), name="api-team-list"),
+    path("api/v1/teams/<int:pk>/", TeamApiView.as_view(), name="api-team-detail"),
+    path("api/v1/workers/", WorkerApiView.as_view(), name="api-worker-list"),
+    path("api/v1/workers/<int:pk>/", WorkerApiView.as_view(), name="api-worker-detail"),
 ]
 
 app_name = "task_manager"
\ No newline at end of file
@@ -4,7 +4,10 @@ Copyright (c) 2019 - present AppSeed.us
 """
 
 import datetime
+import functools
 import json
+
+from django.db.models import F
 from django.template import Context
 from django.utils import translation
 
@@ -30,6 +33,8 @@ from django.contrib.admin.options import IncorrectLookupParameters
 from django.contrib import admin
 from django.utils.text import slugify
 
+from task_manager.models import DashboardCounter
+
 try:
     from django.utils.translation import ugettext_lazy as _
 except ImportError:
@@ -67,96 +72,178 @@ class JsonResponse(HttpResponse):
         super(JsonResponse, self).__init__(content=data, **kwargs)
 
 
+# Admin menu memoization
+#
+# The URL layout of an admin site only changes on deploy, so it is built
+# once per process.  Which entries a user may see is cached in their
+# session, stamped with a version that the handlers in
+# ``task_manager.signals`` bump whenever permissions or groups change.  The
+# version is a ``DashboardCounter`` row bumped in the changing transaction,
+# so every process sees it once the change commits.
+
+ADMIN_PERMS_SESSION_KEY = "task_manager:admin_perms"
+ADMIN_PERMS_VERSION = "admin_perms_version"
+
+_admin_sites = {}
+
+
+@functools.lru_cache(maxsize=None)
+def get_admin_structure(admin_site):
+    """Menu entries of every model registered with ``admin_site``."""
+    structure = []
+    for model, model_admin in admin_site._registry.items():
+        opts = model._meta
+        app_label = opts.app_label
+        entry = {
+            "label": opts.label_lower,
+            "model_admin": model_admin,
+            "app_label": app_label,
+            "app_name": opts.app_config.verbose_name,
+            "app_url": reverse(
+                "admin:app_list",
+                kwargs={"app_label": app_label},
+                current_app=admin_site.name,
+            ),
+            "icon": (
+                getattr(opts.app_config, "icon", None)
+                or default_apps_icon.get(app_label)
+            ),
+            "name": capfirst(opts.verbose_name_plural),
+            "object_name": opts.object_name,
+            "model_name": opts.model_name,
+        }
+        for key, view in (("admin_url", "changelist"), ("add_url", "add")):
+            try:
+                entry[key] = reverse(
+                    "admin:%s_%s_%s" % (app_label, opts.model_name, view),
+                    current_app=admin_site.name,
+                )
+            except NoReverseMatch:
+                pass
+        structure.append(entry)
+    return structure
+
+
+def get_admin_permissions(request, admin_site):
+    """
+    Return ``{model label: perms}`` for the models ``request.user`` may see.
+    """
+    version = DashboardCounter.objects.filter(
+        name=ADMIN_PERMS_VERSION
+    ).values_list("value", flat=True).first()
+    stamp = [version, admin_site.name, request.user.pk]
+    session = getattr(request, "session", None)
+    cached = None
+    if session is not None:
+        cached = session.get(ADMIN_PERMS_SESSION_KEY)
+    if cached and cached["stamp"] == stamp:
+        return cached["perms"]
+
+    perms = {}
+    for entry in get_admin_structure(admin_site):
+        model_admin = entry["model_admin"]
+        if not model_admin.has_module_permission(request):
+            continue
+        model_perms = model_admin.get_model_perms(request)
+        if True in model_perms.values():
+            perms[entry["label"]] = model_perms
+    if session is not None:
+        session[ADMIN_PERMS_SESSION_KEY] = {"stamp": stamp, "perms": perms}
+    return perms
+
+
+def invalidate_admin_permissions():
+    """Make every session recompute its menu permissions after commit."""
+    updated = DashboardCounter.objects.filter(
+        name=ADMIN_PERMS_VERSION
+    ).update(value=F("value") + 1)
+    if not updated:
+        DashboardCounter.objects.get_or_create(
+            name=ADMIN_PERMS_VERSION, defaults={"value": 1}
+        )
+
+
+def clear_menu_cache():
+    """Forget the per-process admin sites and URLs, e.g. after reloading."""
+    _admin_sites.clear()
+    get_admin_structure.cache_clear()
+
+
 def get_app_list(context, order=True):
     admin_site = get_admin_site(context)
-    request = context['request']
+    perms = get_admin_permissions(context["request"], admin_site)
 
     app_dict = {}
-    for model, model_admin in admin_site._registry.items():
-
-        app_icon = model._meta.app_config.icon if hasattr(model._meta.app_config, 'icon') else None
-        app_label = model._meta.app_label
-        try:
-            has_module_perms = model_admin.has_module_permission(request)
-        except AttributeError:
-            has_module_perms = request.user.has_module_perms(app_label)  # Fix Django < 1.8 issue
-
-        if has_module_perms:
-            perms = model_admin.get_model_perms(request)
-
-            # Check whether user has any perm for this module.
-            # If so, add the module to the model_list.
-            if True in perms.values():
-                info = (app_label, model._meta.model_name)
-                model_dict = {
-                    'name': capfirst(model._meta.verbose_name_plural),
-                    'object_name': model._meta.object_name,
-                    'perms': perms,
-                    'model_name': model._meta.model_name
-                }
-                if perms.get('change', False) or perms.get("view", False):
-                    try:
-                        model_dict['admin_url'] = reverse('admin:%s_%s_changelist' % info, current_app=admin_site.name)
-                    except NoReverseMatch:
-                        pass
-                if perms.get('add', False):
-                    try:
-                        model_dict['add_url'] = reverse('admin:%s_%s_add' % info, current_app=admin_site.name)
-                    except NoReverseMatch:
-                        pass
-                if app_label in app_dict:
-                    app_dict[app_label]['models'].append(model_dict)
-                else:
-                    try:
-                        name = apps.get_app_config(app_label).verbose_name
-                    except NameError:
-                        name = app_label.title()
-                    app_dict[app_label] = {
-                        'name': name,
-                        'app_label': app_label,
-                        'app_url': reverse(
-                            'admin:app_list',
-                            kwargs={'app_label': app_label},
-                            current_app=admin_site.name,
-                        ),
-                        'has_module_perms': has_module_perms,
-                        'models': [model_dict],
-                    }
-
-                if not app_icon:
-                    app_icon = default_apps_icon[app_label] if app_label in default_apps_icon else None
-                app_dict[app_label]['icon'] = app_icon
+    for entry in get_admin_structure(admin_site):
+        model_perms = perms.get(entry["label"])
+        if model_perms is None:
+            continue
+        model_dict = {
+            "name": entry["name"],
+            "object_name": entry["object_name"],
+            "perms": model_perms,
+            "model_name": entry["model_name"],
+        }
+        if model_perms.get("change") or model_perms.get("view"):
+            if "admin_url" in entry:
+                model_dict["admin_url"] = entry["admin_url"]
+        if model_perms.get("add") and "add_url" in entry:
+            model_dict["add_url"] = entry["add_url"]
+        app = app_dict.setdefault(entry["app_label"], {
+            "name": entry["app_name"],
+            "app_label": entry["app_label"],
+            "app_url": entry["app_url"],
+            "has_module_perms": True,
+            "icon": entry["icon"],
+            "models": [],
+        })
+        app["models"].append(model_dict)
 
     # Sort the apps alphabetically.
     app_list = list(app_dict.values())
 
     if order:
-        app_list.sort(key=lambda x: x['name'].lower())
+        app_list.sort(key=lambda x: x["name"].lower())
 
         # Sort the models alphabetically within each app.
         for app in app_list:
-            app['models'].sort(key=lambda x: x['name'])
+            app["models"].sort(key=lambda x: x["name"])
 
     return app_list
 
 
-def get_admin_site(context):
+def _find_admin_site(namespace):
     try:
-        current_resolver = resolve(context.get('request').path)
-        index_resolver = resolve(reverse('%s:index' % current_resolver.namespaces[0]))
+        index_resolver = resolve(reverse("%s:index" % namespace))
 
-        if hasattr(index_resolver.func, 'admin_site'):
+        if hasattr(index_resolver.func, "admin_site"):
             return index_resolver.func.admin_site
 
         for func_closure in index_resolver.func.__closure__:
             if isinstance(func_closure.cell_contents, AdminSite):
                 return func_closure.cell_contents
-    except:
+    except Exception:
         pass
 
     return admin.site
 
 
+def get_admin_site(context):
+    request = context.get("request")
+    try:
+        # The handler has already resolved the request; reuse its match.
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            match = resolve(request.path)
+        namespace = match.namespaces[0]
+    except Exception:
+        return admin.site
+
+    if namespace not in _admin_sites:
+        _admin_sites[namespace] = _find_admin_site(namespace)
+    return _admin_sites[namespace]
+
+
 def get_admin_site_name(context):
     return get_admin_site(context).name
 
@@ -1,19 +1,45 @@
-from django.contrib.auth import get_user_model
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models.aggregates import Count
-from django.http import HttpRequest
-from django.shortcuts import render
-from django.urls import reverse_lazy
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, prefetch_related_objects
+from django.http import (
+    HttpRequest,
+    Http404,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse, reverse_lazy
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.views import generic
 
+from task_manager.bulk_actions import apply_bulk_action
 from task_manager.forms import (
     TaskForm,
+    TaskBulkActionForm,
     TeamForm,
     WorkerCreationForm,
     WorkerUpdateForm,
     ProjectForm
 )
+from task_manager import (
+    activity,
+    jobs,
+    scheduling,
+    search,
+    stats,
+    transfer,
+    workload,
+)
+from task_manager.caching import attach_versions, uncached
+from task_manager.freshness import ConditionalDetailMixin
+from task_manager.pagination import KeysetPaginationMixin, KeysetPaginator
+from task_manager.routers import replica_reads
 from task_manager.models import (
+    ArchivedTask,
+    Job,
     Task,
     Project,
     Team,
@@ -24,40 +50,85 @@ from task_manager.models import (
 )
 
 
-def index(request: HttpRequest):
-    total_tasks_in_process = Task.objects.filter(is_completed=False).count()
-    total_projects = Project.objects.filter(status="IN_PROCESS").count()
-    total_workers = get_user_model().objects.count()
-    total_teams = Team.objects.count()
-    teams =  Team.objects.prefetch_related("workers")
-    visit_times = request.session.get("visit_times", 0) + 1
-    request.session["visit_times"] = visit_times
-
-    context = {
-        "total_tasks_in_process": total_tasks_in_process,
-        "total_projects": total_projects,
-        "total_workers": total_workers,
-        "total_teams": total_teams,
+def get_dashboard_teams():
+    return Team.objects.select_related("team_lead").order_by(
+        "name", "pk"
+    )[:stats.DASHBOARD_TEAMS_LIMIT]
+
+
+def get_dashboard_projects():
+    return Project.objects.filter(
+        status="IN_PROCESS"
+    ).order_by("name", "pk")[:stats.DASHBOARD_PROJECTS_LIMIT]
+
+
+def get_dashboard_context(counters, teams, projects, visit_times) -> dict:
+    return {
+        "total_tasks_in_process": counters[stats.TASKS_IN_PROCESS],
+        "total_projects": counters[stats.ACTIVE_PROJECTS],
+        "total_workers": counters[stats.WORKERS],
+        "total_teams": counters[stats.TEAMS],
         "segment": "dashboard",
-        "projects": Project.objects.annotate(
-            total_tasks=Count("tasks", distinct=True),
-            total_teams=Count("teams", distinct=True)
-        ).filter(status="IN_PROCESS"),
+        "projects": projects,
         "visit_times": visit_times,
         "teams": teams
     }
 
+
+def get_workload():
+    """The latest workload snapshot, queuing a refresh once it is stale."""
+    snapshot = workload.get_workload()
+    # One request per process and period queues it; enqueue also drops
+    # duplicates queued by other processes.
+    if workload.is_stale(snapshot) and cache.add(
+        workload.REFRESH_KEY, True, workload.get_cache_timeout()
+    ):
+        jobs.enqueue("workload")
+    return snapshot
+
+
+def get_busiest_workers():
+    """The panel rows, or ``None`` until the first snapshot exists."""
+    snapshot = get_workload()
+    if snapshot is None:
+        return None
+    busy = [row for row in snapshot["workers"] if row["load"]]
+    return busy[:workload.PANEL_SIZE]
+
+
+@replica_reads
+def index(request: HttpRequest):
+    visit_times = None
+    busiest_workers = []
+    if request.user.is_authenticated:
+        key = activity.visits_key(request.user)
+        activity.record(key)
+        visit_times = activity.get_count(key)
+        busiest_workers = get_busiest_workers()
+
+    context = get_dashboard_context(
+        stats.get_counters(),
+        get_dashboard_teams(),
+        get_dashboard_projects(),
+        visit_times,
+    )
+    context["busiest_workers"] = busiest_workers
+
     return render(request, template_name="task_manager/index.html", context=context)
 
 
-class TaskListView(LoginRequiredMixin, generic.ListView):
+class TaskListView(
+    LoginRequiredMixin, KeysetPaginationMixin, generic.ListView
+):
     model = Task
+    keyset_ordering = ("deadline", "pk")
 
     def get_context_data(
         self, *, object_list = ..., **kwargs
     ):
         context = super().get_context_data(**kwargs)
         context["segment"] = "tasks"
+        context["bulk_form"] = TaskBulkActionForm()
 
         return context
 
@@ -68,6 +139,26 @@ class TaskListView(LoginRequiredMixin, generic.ListView):
         return queryset
 
 
+class ArchivedTaskListView(
+    LoginRequiredMixin, KeysetPaginationMixin, generic.ListView
+):
+    model = ArchivedTask
+    template_name = "task_manager/archived_task_list.html"
+    context_object_name = "archived_task_list"
+    keyset_ordering = ("-deadline", "-pk")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["segment"] = "task archive"
+
+        return context
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            "task_type", "project"
+        ).prefetch_related("assignees", "tags")
+
+
 class TaskUpdateView(LoginRequiredMixin, generic.UpdateView):
     model = Task
     form_class = TaskForm
@@ -88,7 +179,9 @@ class TaskUpdateView(LoginRequiredMixin, generic.UpdateView):
 
 
 
-class TaskDetailView(LoginRequiredMixin, generic.DetailView):
+class TaskDetailView(
+    LoginRequiredMixin, ConditionalDetailMixin, generic.DetailView
+):
     model = Task
 
     def get_context_data(self, **kwargs):
@@ -126,6 +219,116 @@ class TaskCreateView(LoginRequiredMixin, generic.CreateView):
 
         return context
 
+    def form_valid(self, form):
+        # The task is never committed without the assignee it is given.
+        with transaction.atomic():
+            response = super().form_valid(form)
+            if self.object.project and not form.cleaned_data["assignees"]:
+                scheduling.assign_tasks(self.object.project, [self.object.pk])
+
+        return response
+
+
+class TaskExportView(LoginRequiredMixin, generic.View):
+    def get(self, request):
+        file_format = request.GET.get("format", "csv")
+        if file_format not in transfer.FORMATS:
+            return HttpResponseBadRequest("Unknown export format")
+
+        response = StreamingHttpResponse(
+            transfer.iter_export(file_format),
+            content_type=transfer.CONTENT_TYPES[file_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="tasks.{file_format}"'
+        )
+
+        return response
+
+
+class TaskImportView(LoginRequiredMixin, generic.View):
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return JsonResponse({"detail": "No file uploaded."}, status=400)
+        file_format = request.POST.get("format") or transfer.guess_format(
+            upload.name
+        )
+        if file_format not in transfer.FORMATS:
+            return JsonResponse(
+                {"detail": "Unknown import format."}, status=400
+            )
+
+        if upload.size > jobs.get_inline_import_bytes():
+            path = jobs.get_file_storage().save(
+                f"imports/{upload.name}", upload
+            )
+            # A retried import would create the committed batches again.
+            job = jobs.enqueue(
+                "import_tasks",
+                max_attempts=1,
+                path=path,
+                file_format=file_format,
+            )
+            return JsonResponse(
+                {
+                    "job": job.pk,
+                    "status_url": reverse(
+                        "task_manager:job-detail", args=[job.pk]
+                    ),
+                },
+                status=202,
+            )
+
+        result = transfer.import_tasks(upload.file, file_format)
+
+        return JsonResponse(result.as_dict())
+
+
+class JobDetailView(LoginRequiredMixin, generic.View):
+    def get(self, request, pk):
+        return JsonResponse(get_object_or_404(Job, pk=pk).as_dict())
+
+
+class WorkloadView(LoginRequiredMixin, generic.View):
+    def get(self, request):
+        snapshot = get_workload()
+        if snapshot is None:
+            return JsonResponse(
+                {"detail": "The workload is being computed."}, status=202
+            )
+        return JsonResponse(snapshot)
+
+
+class TaskBulkActionView(LoginRequiredMixin, generic.FormView):
+    form_class = TaskBulkActionForm
+    http_method_names = ["post"]
+
+    def form_valid(self, form):
+        changed = apply_bulk_action(
+            form.cleaned_data["tasks"].values_list("pk", flat=True),
+            form.cleaned_data["action"],
+            form.get_value(),
+        )
+        messages.success(self.request, f"Updated {changed} task(s).")
+
+        return redirect(self.get_success_url())
+
+    def form_invalid(self, form):
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(self.request, error)
+
+        return redirect(self.get_success_url())
+
+    def get_success_url(self):
+        next_url = self.request.POST.get("next")
+        if next_url and url_has_allowed_host_and_scheme(
+            next_url, allowed_hosts={self.request.get_host()}
+        ):
+            return next_url
+        return reverse_lazy("task_manager:task-list")
+
 
 class TagListView(LoginRequiredMixin, generic.ListView):
     model = Tag
@@ -184,11 +387,40 @@ class TaskTypeListView(LoginRequiredMixin, generic.ListView):
         return context
 
 
-class TaskTypeDeleteView(LoginRequiredMixin, generic.DeleteView):
+class BackgroundDeleteMixin:
+    """
+    Leave deletions with a large cascade to the ``delete_job`` job.
+
+    Objects whose ``get_cascade_size()`` is within the inline limit are
+    deleted in the request as before.
+    """
+
+    delete_job = None
+
+    def get_cascade_size(self) -> int:
+        raise NotImplementedError
+
+    def form_valid(self, form):
+        if self.get_cascade_size() <= jobs.get_inline_delete_limit():
+            return super().form_valid(form)
+        jobs.enqueue(self.delete_job, pk=self.object.pk)
+        messages.info(
+            self.request, f"{self.object} is being deleted in the background."
+        )
+        return redirect(self.get_success_url())
+
+
+class TaskTypeDeleteView(
+    LoginRequiredMixin, BackgroundDeleteMixin, generic.DeleteView
+):
     model = TaskType
     template_name = "task_manager/task_type_confirm_delete.html"
     context_object_name = "task_type"
     success_url = reverse_lazy("task_manager:task-type-list")
+    delete_job = "delete_task_type"
+
+    def get_cascade_size(self) -> int:
+        return self.object.tasks.count()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -268,19 +500,27 @@ class PositionCreateView(LoginRequiredMixin, generic.CreateView):
         return context
 
 
-class TeamListView(LoginRequiredMixin, generic.ListView):
+class TeamListView(
+    LoginRequiredMixin, KeysetPaginationMixin, generic.ListView
+):
     model = Team
+    keyset_ordering = ("name", "pk")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["segment"] = "teams"
+        prefetch_related_objects(
+            uncached("team-row", attach_versions(context["team_list"])),
+            "workers",
+            "projects",
+        )
 
         return context
 
     def get_queryset(self):
         queryset = super().get_queryset()
 
-        queryset = queryset.select_related("team_lead").prefetch_related("workers", "projects")
+        queryset = queryset.select_related("team_lead")
 
         return queryset
 
@@ -303,7 +543,9 @@ class TeamUpdateView(LoginRequiredMixin, generic.UpdateView):
             return reverse_lazy("task_manager:team-list")
 
 
-class TeamDetailView(LoginRequiredMixin, generic.DetailView):
+class TeamDetailView(
+    LoginRequiredMixin, ConditionalDetailMixin, generic.DetailView
+):
     model = Team
 
     def get_context_data(self, **kwargs):
@@ -319,9 +561,15 @@ class TeamDetailView(LoginRequiredMixin, generic.DetailView):
         return queryset
 
 
-class TeamDeleteView(LoginRequiredMixin, generic.DeleteView):
+class TeamDeleteView(
+    LoginRequiredMixin, BackgroundDeleteMixin, generic.DeleteView
+):
     model = Team
     success_url = reverse_lazy("task_manager:team-list")
+    delete_job = "delete_team"
+
+    def get_cascade_size(self) -> int:
+        return self.object.worker_count + self.object.project_count
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
@@ -343,40 +591,109 @@ class TeamCreateView(LoginRequiredMixin, generic.CreateView):
         return context
 
 
-class WorkerListView(LoginRequiredMixin, generic.ListView):
+class WorkerListView(
+    LoginRequiredMixin, KeysetPaginationMixin, generic.ListView
+):
     model = Worker
+    keyset_ordering = ("username", "pk")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["segment"] = "workers"
+        prefetch_related_objects(
+            uncached("worker-row", attach_versions(context["worker_list"])),
+            "teams_team_lead",
+            "teams",
+        )
 
         return context
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        queryset = queryset.prefetch_related("teams_team_lead", "teams", "tasks").select_related("position")
+        queryset = queryset.select_related("position")
 
         return queryset
 
 
-class WorkerDetailView(LoginRequiredMixin, generic.DetailView):
+WORKER_TASK_SEGMENTS = {
+    # status: (is_completed, keyset ordering)
+    "open": (False, ("deadline", "pk")),
+    "done": (True, ("-deadline", "-pk")),
+}
+WORKER_TASK_SEGMENT_SIZE = 10
+
+
+def get_worker_tasks(worker_pk, status: str):
+    is_completed, ordering = WORKER_TASK_SEGMENTS[status]
+    return Task.objects.filter(
+        assignees=worker_pk, is_completed=is_completed
+    ).select_related("task_type").order_by(*ordering)
+
+
+class WorkerDetailView(
+    LoginRequiredMixin, ConditionalDetailMixin, generic.DetailView
+):
     model = Worker
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["segment"] = "worker details"
-        context["undone_tasks"] = Task.objects.filter(is_completed=False, assignees=self.request.user).order_by("deadline")
-        context["done_tasks"] = Task.objects.filter(is_completed=True, assignees=self.request.user).order_by("deadline")
+        worker = self.object
+        for status, (_, ordering) in WORKER_TASK_SEGMENTS.items():
+            context[f"{status}_tasks_page"] = KeysetPaginator(
+                get_worker_tasks(worker.pk, status),
+                ordering,
+                WORKER_TASK_SEGMENT_SIZE,
+            ).page()
+        context["open_tasks_count"] = worker.open_task_count
+        context["done_tasks_count"] = (
+            worker.task_count - worker.open_task_count
+        )
 
         return context
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        queryset = queryset.prefetch_related("teams__workers", "teams__team_lead").select_related("position")
+        queryset = queryset.prefetch_related(
+            "teams__team_lead"
+        ).select_related("position")
 
         return queryset
 
 
+class WorkerTaskListView(
+    LoginRequiredMixin, KeysetPaginationMixin, generic.ListView
+):
+    """
+    One "load more" segment of a worker's open or completed tasks.
+
+    Renders only the list items, which the worker detail page appends.
+    """
+
+    model = Task
+    paginate_by = WORKER_TASK_SEGMENT_SIZE
+
+    def dispatch(self, request, *args, **kwargs):
+        if kwargs["status"] not in WORKER_TASK_SEGMENTS:
+            raise Http404("Unknown task status")
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_keyset_ordering(self):
+        return WORKER_TASK_SEGMENTS[self.kwargs["status"]][1]
+
+    def get_template_names(self):
+        return [f"includes/worker_{self.kwargs['status']}_tasks.html"]
+
+    def get_queryset(self):
+        return get_worker_tasks(self.kwargs["pk"], self.kwargs["status"])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["worker_pk"] = self.kwargs["pk"]
+
+        return context
+
+
 class WorkerCreateView(LoginRequiredMixin, generic.CreateView):
     model = Worker
     form_class = WorkerCreationForm
@@ -417,36 +734,53 @@ class WorkerDeleteView(LoginRequiredMixin, generic.DeleteView):
         return context
 
 
-class ProjectListView(LoginRequiredMixin, generic.ListView):
+class ProjectListView(
+    LoginRequiredMixin, KeysetPaginationMixin, generic.ListView
+):
     model = Project
+    keyset_ordering = ("name", "pk")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["segment"] = "projects"
+        prefetch_related_objects(
+            uncached("project-row", attach_versions(context["project_list"])),
+            "teams",
+        )
 
         return context
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        queryset = queryset.prefetch_related("teams", "tasks")
-
-        return queryset
-
 
-class ProjectDetailView(LoginRequiredMixin, generic.DetailView):
+class ProjectDetailView(
+    LoginRequiredMixin, ConditionalDetailMixin, generic.DetailView
+):
     model = Project
 
+    # Cached sections of the page and the relations each one renders.
+    fragments = {
+        "project-tasks": ("tasks",),
+        "project-teams": ("teams", "teams__team_lead"),
+    }
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["segment"] = "detail project"
+        attach_versions([self.object])
+        for fragment, lookups in self.fragments.items():
+            if uncached(fragment, [self.object]):
+                prefetch_related_objects([self.object], *lookups)
 
         return context
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        queryset = queryset.prefetch_related("tasks", "teams", "teams__team_lead", "teams__workers")
 
-        return queryset
+class ProjectAssignView(LoginRequiredMixin, generic.View):
+    """Assign the project's unassigned tasks; ``dry_run`` only plans."""
+
+    def post(self, request, pk):
+        project = get_object_or_404(Project, pk=pk)
+        dry_run = request.POST.get("dry_run") in ("1", "true", "on")
+
+        return JsonResponse(scheduling.assign_tasks(project, dry_run=dry_run))
 
 
 class ProjectUpdateView(LoginRequiredMixin, generic.UpdateView):
@@ -479,11 +813,77 @@ class ProjectCreateView(LoginRequiredMixin, generic.CreateView):
         return context
 
 
-class ProjectDeleteView(LoginRequiredMixin, generic.DeleteView):
+class ProjectDeleteView(
+    LoginRequiredMixin, BackgroundDeleteMixin, generic.DeleteView
+):
     model = Project
+    success_url = reverse_lazy("task_manager:project-list")
+    delete_job = "delete_project"
+
+    def get_cascade_size(self) -> int:
+        return self.object.task_count + self.object.team_count
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["segment"] = "delete project"
 
         return context
+
+
+class SearchView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "task_manager/search.html"
+    replica_reads = True
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get("q", "").strip()
+        results = {kind: [] for kind in search.DOCUMENTS}
+        for hit, obj in search.search(query):
+            results[hit.kind].append(obj)
+        context["segment"] = "search"
+        context["query"] = query
+        context["task_results"] = results["task"]
+        context["project_results"] = results["project"]
+        context["worker_results"] = results["worker"]
+
+        return context
+
+
+# Typeahead lookups: model, keyset ordering, columns a query is matched on.
+LOOKUPS = {
+    "workers": (
+        Worker,
+        ("username", "pk"),
+        ("username", "first_name", "last_name"),
+    ),
+    "tags": (Tag, ("name", "pk"), ("name",)),
+    "projects": (Project, ("name", "pk"), ("name",)),
+}
+LOOKUP_PAGE_SIZE = 20
+
+
+class ChoiceLookupView(LoginRequiredMixin, generic.View):
+    """One page of ``{"id", "text"}`` choices for the typeahead widgets."""
+
+    def get(self, request, kind):
+        if kind not in LOOKUPS:
+            raise Http404("Unknown lookup")
+        model, ordering, columns = LOOKUPS[kind]
+        queryset = model.objects.only(*{"pk", *columns})
+        query = request.GET.get("q", "").strip()
+        if query:
+            condition = Q()
+            for column in columns:
+                condition |= Q(**{f"{column}__istartswith": query})
+            queryset = queryset.filter(condition)
+
+        page = KeysetPaginator(queryset, ordering, LOOKUP_PAGE_SIZE).page(
+            request.GET.get("cursor")
+        )
+
+        return JsonResponse({
+            "results": [
+                {"id": obj.pk, "text": str(obj)} for obj in page.object_list
+            ],
+            "next": page.next_cursor,
+        })
@@ -0,0 +1,228 @@
+"""
+Workload of open tasks per worker, team and position.
+
+``compute_workload`` reads the assignee links of the open tasks in one
+columnar query, each with its task's priority weight and overdue flag
+computed in SQL.  A task's weight is split evenly between its assignees,
+so a worker's load is the sum of their shares; teams and positions add up
+the load of their members.
+
+The per-worker pass over the links is the heavy part.  With NumPy
+installed it is vectorized (``bincount`` over the link columns);
+otherwise a plain loop computes the same figures.
+
+Requests never compute it: the dashboard panel and the JSON endpoint read
+the latest snapshot, which the ``workload`` job of ``task_manager.jobs``
+stores as its result.  A snapshot older than ``CACHE_TIMEOUT`` seconds
+queues the next run for ``run_jobs``.
+"""
+
+import datetime
+import time
+from collections import Counter, defaultdict
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    BooleanField,
+    Case,
+    ExpressionWrapper,
+    IntegerField,
+    Q,
+    Value,
+    When,
+)
+from django.utils import timezone
+
+from task_manager.models import Job, Position, Task, Team, Worker
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+PRIORITY_WEIGHTS = {"CRITICAL": 8, "HIGH": 4, "MEDIUM": 2, "LOW": 1}
+CACHE_TIMEOUT = 60
+# Seconds a process reuses the snapshot it read from the database.
+SNAPSHOT_CACHE_TIMEOUT = 10
+# Busiest workers listed on the dashboard.
+PANEL_SIZE = 5
+
+CACHE_KEY = "task_manager:workload"
+REFRESH_KEY = "task_manager:workload:refresh"
+
+
+def get_cache_timeout() -> int:
+    return getattr(settings, "WORKLOAD_CACHE_TIMEOUT", CACHE_TIMEOUT)
+
+
+def priority_weight(field="priority"):
+    """SQL expression for the weight of the task priority in ``field``."""
+    return Case(
+        *(
+            When(**{field: priority}, then=Value(value))
+            for priority, value in PRIORITY_WEIGHTS.items()
+        ),
+        default=Value(PRIORITY_WEIGHTS["MEDIUM"]),
+        output_field=IntegerField(),
+    )
+
+
+def load_links(today) -> list:
+    """
+    Return ``(task_id, worker_id, weight, is_overdue)`` rows, one per
+    assignee link of an open task.
+    """
+    weight = priority_weight("task__priority")
+    overdue = ExpressionWrapper(
+        Q(task__deadline__lt=today), output_field=BooleanField()
+    )
+    # A single statement, so each link comes with its own task's columns
+    # whatever changes between reads.
+    return list(
+        Task.assignees.through.objects.filter(task__is_completed=False)
+        .values_list("task_id", "worker_id", weight, overdue)
+    )
+
+
+def _array(rows, width):
+    return numpy.fromiter(
+        chain.from_iterable(rows), dtype=numpy.int64, count=len(rows) * width
+    ).reshape(-1, width)
+
+
+def _per_worker_numpy(links) -> dict:
+    if not links:
+        return {}
+    task_ids, worker_ids, weight, overdue = _array(links, 4).T
+    # Assignees per task, looked up densely by primary key.
+    share = weight / numpy.bincount(task_ids)[task_ids]
+    open_tasks = numpy.bincount(worker_ids)
+    overdue_tasks = numpy.bincount(worker_ids, weights=overdue)
+    load = numpy.bincount(worker_ids, weights=share)
+    workers = numpy.flatnonzero(open_tasks)
+    return {
+        worker: (count, int(late), total)
+        for worker, count, late, total in zip(
+            workers.tolist(),
+            open_tasks[workers].tolist(),
+            overdue_tasks[workers].tolist(),
+            load[workers].tolist(),
+        )
+    }
+
+
+def _per_worker_python(links) -> dict:
+    assignees = Counter(task_id for task_id, *_ in links)
+    totals = defaultdict(lambda: [0, 0, 0.0])
+    for task_id, worker_id, weight, overdue in links:
+        row = totals[worker_id]
+        row[0] += 1
+        row[1] += int(overdue)
+        row[2] += weight / assignees[task_id]
+    return {worker: tuple(row) for worker, row in totals.items()}
+
+
+def per_worker(links) -> dict:
+    """Map worker ids to ``(open tasks, overdue tasks, load)``."""
+    if numpy is not None:
+        return _per_worker_numpy(links)
+    return _per_worker_python(links)
+
+
+def _row(pk, name, open_tasks, overdue, load, **extra) -> dict:
+    return {
+        "id": pk,
+        "name": name,
+        **extra,
+        "open_tasks": open_tasks,
+        "overdue_tasks": overdue,
+        "overdue_ratio": round(overdue / open_tasks, 3) if open_tasks else 0,
+        "load": round(load, 2),
+    }
+
+
+def _rollup(groups, names, totals) -> list:
+    """Add up ``totals`` of the members of each ``{group: [worker ids]}``."""
+    rows = []
+    for pk, name in names.items():
+        members = groups.get(pk, ())
+        sums = [0, 0, 0.0]
+        for worker in members:
+            for i, value in enumerate(totals.get(worker, (0, 0, 0.0))):
+                sums[i] += value
+        rows.append(_row(pk, name, *sums, members=len(members)))
+    return rows
+
+
+def _by_load(rows) -> list:
+    return sorted(rows, key=lambda row: (-row["load"], row["name"]))
+
+
+def compute_workload(today=None) -> dict:
+    today = today or timezone.localdate()
+    started = time.perf_counter()
+    links = load_links(today)
+    loaded = time.perf_counter()
+    totals = per_worker(links)
+    aggregated = time.perf_counter()
+
+    workers = Worker.objects.values_list("pk", "username", "position_id")
+    team_members = defaultdict(list)
+    for team_id, worker_id in Team.workers.through.objects.values_list(
+        "team_id", "worker_id"
+    ):
+        team_members[team_id].append(worker_id)
+    position_members = defaultdict(list)
+    worker_rows = []
+    for pk, username, position_id in workers:
+        position_members[position_id].append(pk)
+        worker_rows.append(_row(
+            pk, username, *totals.get(pk, (0, 0, 0.0)), position=position_id
+        ))
+
+    return {
+        "date": today.isoformat(),
+        "computed_at": timezone.now().isoformat(),
+        "engine": "numpy" if numpy is not None else "python",
+        "weights": PRIORITY_WEIGHTS,
+        "assignments": len(links),
+        "timings_ms": {
+            "load": round((loaded - started) * 1000, 1),
+            "aggregate": round((aggregated - loaded) * 1000, 1),
+        },
+        "workers": _by_load(worker_rows),
+        "teams": _by_load(_rollup(
+            team_members, dict(Team.objects.values_list("pk", "name")), totals
+        )),
+        "positions": _by_load(_rollup(
+            position_members,
+            dict(Position.objects.values_list("pk", "name")),
+            totals,
+        )),
+    }
+
+
+def get_workload():
+    """
+    The latest snapshot computed by the ``workload`` job, or ``None``
+    before the first run has finished.
+    """
+    workload = cache.get(CACHE_KEY)
+    if workload is None:
+        workload = Job.objects.filter(
+            name="workload", status="DONE"
+        ).order_by("-finished_at").values_list("result", flat=True).first()
+        if workload is not None:
+            cache.set(CACHE_KEY, workload, SNAPSHOT_CACHE_TIMEOUT)
+    return workload
+
+
+def is_stale(workload) -> bool:
+    if workload is None:
+        return True
+    computed_at = datetime.datetime.fromisoformat(workload["computed_at"])
+    age = timezone.now() - computed_at
+    return age.total_seconds() >= get_cache_timeout()